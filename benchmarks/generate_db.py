@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic SQLite database with the schema and shape of the
+SciSciNet VT-CS subset (docs/dataset_card.md), at a configurable scale.
+
+Scale 1 matches the real subset: ~40k papers, ~425k citation links,
+~42k authors, 39 CS fields on ~26% of papers. Citations follow preferential
+attachment to earlier papers, so in-degrees are heavy-tailed; author
+productivity and field popularity are Zipf-like.
+
+Usage:
+    uv run python benchmarks/generate_db.py --scale 10 --output benchmarks/data/scale-10.db
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+# Per-year paper counts of the real subset (docs/dataset_card.md)
+YEAR_COUNTS = {
+    2013: 3453, 2014: 3776, 2015: 4190, 2016: 4193, 2017: 4495,
+    2018: 4439, 2019: 4845, 2020: 5096, 2021: 5307, 2022: 109,
+}
+LINKS_PER_PAPER = 424_616 / 39_903
+AUTHORS_PER_PAPER = 193_408 / 39_903
+AUTHOR_POOL_PER_PAPER = 42_152 / 39_903
+CS_PAPER_FRACTION = 10_293 / 39_903
+FIELDS_PER_CS_PAPER = 18_047 / 10_293
+PATENT_PAPER_FRACTION = 1_016 / 39_903
+N_FIELDS = 39
+VT_AFFILIATION_ID = 859038795
+FIRST_FIELD_ID = 41008148  # 'Computer science'
+
+CHUNK_ROWS = 500_000
+
+SCHEMA = """
+CREATE TABLE papers(paper_id INTEGER PRIMARY KEY, title TEXT, year INTEGER, citation_count INTEGER, patent_count INTEGER);
+CREATE TABLE paper_details(paper_id INTEGER, abstract TEXT);
+CREATE TABLE paper_references(paper_id INTEGER, reference_id INTEGER);
+CREATE TABLE paper_author_affiliations(paper_id INTEGER, author_id INTEGER, affiliation_id INTEGER);
+CREATE TABLE paper_fields(paper_id INTEGER, field_id INTEGER);
+CREATE TABLE affiliations(affiliation_id INTEGER, affiliation_name TEXT);
+CREATE TABLE fields(field_id INTEGER, field_name TEXT);
+"""
+
+INDEXES = """
+CREATE INDEX idx_papers_year ON papers(year);
+CREATE INDEX idx_papers_id ON papers(paper_id);
+CREATE INDEX idx_paa_paper ON paper_author_affiliations(paper_id);
+CREATE INDEX idx_paa_author ON paper_author_affiliations(author_id);
+CREATE INDEX idx_paa_affil ON paper_author_affiliations(affiliation_id);
+CREATE INDEX idx_pf_paper ON paper_fields(paper_id);
+CREATE INDEX idx_pf_field ON paper_fields(field_id);
+CREATE INDEX idx_pr_paper ON paper_references(paper_id);
+CREATE INDEX idx_pr_ref ON paper_references(reference_id);
+CREATE INDEX idx_pd_paper ON paper_details(paper_id);
+"""
+
+
+def _zipf_weights(n: int, exponent: float, rng: np.random.Generator):
+    """Shuffled Zipf weights, normalized to sum to 1."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def _insert(conn: sqlite3.Connection, table: str, columns: list[np.ndarray]):
+    placeholders = ",".join("?" * len(columns))
+    for start in range(0, len(columns[0]), CHUNK_ROWS):
+        rows = zip(*(column[start:start + CHUNK_ROWS].tolist() for column in columns))
+        conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+
+
+def generate(path: str, scale: float = 1.0, seed: int = 42):
+    """Write a synthetic database to `path` and return row counts per table."""
+    rng = np.random.default_rng(seed)
+
+    # Papers, ordered by year so earlier papers have lower positions
+    years = np.repeat(
+        np.array(list(YEAR_COUNTS), dtype=np.int64),
+        [max(1, round(count * scale)) for count in YEAR_COUNTS.values()],
+    )
+    n = len(years)
+    paper_ids = 1_000_000 + np.cumsum(rng.integers(1, 50, size=n))
+
+    # Citations: each paper cites papers published up to its own year, picked
+    # in proportion to a heavy-tailed fitness (preferential attachment)
+    out_degree = rng.poisson(rng.lognormal(np.log(LINKS_PER_PAPER) - 0.5, 1.0, size=n))
+    fitness = rng.pareto(2.5, size=n) + 1.0
+    cumulative = np.cumsum(fitness)
+    year_end = np.searchsorted(years, years, side="right")
+    citing = np.repeat(np.arange(n), out_degree)
+    cited = np.searchsorted(cumulative, rng.random(len(citing)) * cumulative[year_end[citing] - 1])
+    cited = np.minimum(cited, n - 1)
+    keep = cited != citing
+    citing, cited = citing[keep], cited[keep]
+
+    in_degree = np.bincount(cited, minlength=n)
+    # Citations from outside the subset make the stored count exceed in-degree
+    citation_count = in_degree + rng.poisson(in_degree * 0.8 + rng.exponential(2.0, size=n))
+    patent_count = np.where(
+        rng.random(n) < PATENT_PAPER_FRACTION,
+        np.minimum(rng.geometric(0.45, size=n), 34),
+        0,
+    )
+
+    # Authors: Zipf-distributed productivity over a pool proportional to papers
+    n_authors = max(1, round(n * AUTHOR_POOL_PER_PAPER))
+    author_ids = 2_000_000_000 + np.cumsum(rng.integers(1, 10, size=n_authors))
+    authors_per_paper = 1 + rng.poisson(AUTHORS_PER_PAPER - 1, size=n)
+    authored = np.repeat(np.arange(n), authors_per_paper)
+    author_of = rng.choice(n_authors, size=len(authored), p=_zipf_weights(n_authors, 0.6, rng))
+    pairs = np.unique(np.stack([authored, author_of], axis=1), axis=0)
+
+    # Fields on the CS share of papers
+    field_ids = FIRST_FIELD_ID + np.arange(N_FIELDS) * 1009
+    cs_papers = np.flatnonzero(rng.random(n) < CS_PAPER_FRACTION)
+    fields_per_paper = 1 + rng.poisson(FIELDS_PER_CS_PAPER - 1, size=len(cs_papers))
+    field_paper = np.repeat(cs_papers, fields_per_paper)
+    field_of = rng.choice(N_FIELDS, size=len(field_paper), p=_zipf_weights(N_FIELDS, 1.1, rng))
+    field_pairs = np.unique(np.stack([field_paper, field_of], axis=1), axis=0)
+
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + SCHEMA)
+
+    titles = np.array([f"Synthetic paper {i}" for i in range(n)], dtype=object)
+    _insert(conn, "papers", [paper_ids, titles, years, citation_count, patent_count])
+    _insert(conn, "paper_details", [paper_ids[cs_papers], np.full(len(cs_papers), "Synthetic abstract.", dtype=object)])
+    _insert(conn, "paper_references", [paper_ids[citing], paper_ids[cited]])
+    _insert(conn, "paper_author_affiliations", [
+        paper_ids[pairs[:, 0]], author_ids[pairs[:, 1]], np.full(len(pairs), VT_AFFILIATION_ID),
+    ])
+    _insert(conn, "paper_fields", [paper_ids[field_pairs[:, 0]], field_ids[field_pairs[:, 1]]])
+    conn.execute("INSERT INTO affiliations VALUES (?, ?)", (VT_AFFILIATION_ID, "Virginia Tech"))
+    _insert(conn, "fields", [
+        field_ids, np.array(["Computer science"] + [f"Field {i}" for i in range(1, N_FIELDS)], dtype=object),
+    ])
+    conn.executescript(INDEXES)
+    conn.commit()
+    conn.close()
+
+    return {
+        "papers": n,
+        "paper_references": len(citing),
+        "paper_author_affiliations": len(pairs),
+        "authors": int(len(np.unique(pairs[:, 1]))),
+        "paper_fields": len(field_pairs),
+        "max_in_degree": int(in_degree.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="Size relative to the VT-CS subset (default 1)")
+    parser.add_argument("--output", help="Database path (default benchmarks/data/scale-{scale}.db)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    output = args.output or f"benchmarks/data/scale-{args.scale:g}.db"
+    print(f"Generating scale {args.scale:g} database at {output}...")
+    start = time.perf_counter()
+    counts = generate(output, args.scale, args.seed)
+    for table, count in counts.items():
+        print(f"  {table}: {count:,}")
+    print(f"  Done in {time.perf_counter() - start:.1f}s ({os.path.getsize(output) / 1024 ** 2:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test: virtual users replay a weighted request mix and the
+run reports throughput, p50/p95/p99 latency, status codes and error rates.
+
+Targets:
+    --url http://localhost:8000   a running server (any cache backend)
+    (default)                     the app in-process over ASGI, with the
+                                  in-memory cache backend standing in for
+                                  Redis; client and server then share one
+                                  event loop and CPU
+
+Usage:
+    uv run python benchmarks/load_test.py --users 50 --duration 30
+    uv run python benchmarks/load_test.py --url http://localhost:8000 --mix mix.json --output load.json
+
+A mix file is a JSON list of {"name", "path", "weight"}. Paths may contain
+{year}, {year_start} and {year_end}, filled with a random year or year range
+per request, so a mix can cover both cached and uncached ranges.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+YEARS = list(range(2013, 2023))
+
+DEFAULT_MIX = [
+    {"name": "timeline", "path": "/api/v1/timeline/papers-by-year", "weight": 20},
+    {"name": "aggregate", "path": "/api/v1/timeline/aggregate?group_by=year,field&metric=citations", "weight": 10},
+    {"name": "patents", "path": "/api/v1/data/patents-by-year?year={year}", "weight": 15},
+    {"name": "patents-batch", "path": "/api/v1/data/patents-by-year/batch", "weight": 5},
+    {"name": "hierarchical-cached", "path": "/api/v1/network/hierarchical-citation?year_start=2020&year_end=2022", "weight": 25},
+    {"name": "hierarchical-random", "path": "/api/v1/network/hierarchical-citation?year_start={year_start}&year_end={year_end}", "weight": 5},
+    {"name": "metrics-random", "path": "/api/v1/metrics/top?year_start={year_start}&year_end={year_end}", "weight": 5},
+    {"name": "citation", "path": "/api/v1/network/citation", "weight": 10},
+    {"name": "ready", "path": "/ready", "weight": 5},
+]
+
+
+def _fill(path: str, rng: random.Random):
+    year_start, year_end = sorted(rng.sample(YEARS, 2))
+    return path.format(year=rng.choice(YEARS), year_start=year_start, year_end=year_end)
+
+
+def _percentiles(latencies_ms: list[float]):
+    if not latencies_ms:
+        return {}
+    samples = np.array(latencies_ms)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(samples.max()), 2),
+    }
+
+
+class LoadTest:
+    """Runs virtual users against a client and records each request."""
+
+    def __init__(self, client, mix: list[dict], users: int, duration: float, warmup: float, think: float, seed: int):
+        self.client = client
+        self.mix = mix
+        self.weights = [entry["weight"] for entry in mix]
+        self.users = users
+        self.duration = duration
+        self.warmup = warmup
+        self.think = think
+        self.seed = seed
+        self.records = []  # (name, status, latency_ms); status None on exceptions
+
+    async def _user(self, user_id: int, start: float):
+        rng = random.Random(self.seed + user_id)
+        measure_from = start + self.warmup
+        end = measure_from + self.duration
+        while (now := time.perf_counter()) < end:
+            entry = rng.choices(self.mix, weights=self.weights)[0]
+            path = _fill(entry["path"], rng)
+            try:
+                response = await self.client.get(path)
+                status = response.status_code
+            except Exception:
+                status = None
+            if now >= measure_from:
+                self.records.append((entry["name"], status, (time.perf_counter() - now) * 1000))
+            if self.think:
+                await asyncio.sleep(rng.expovariate(1 / self.think))
+
+    async def run(self):
+        start = time.perf_counter()
+        await asyncio.gather(*(self._user(i, start) for i in range(self.users)))
+        return self.report()
+
+    def report(self):
+        def summarize(records):
+            statuses = {}
+            for _, status, _ in records:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+            errors = sum(1 for _, status, _ in records if status is None or status >= 500)
+            return {
+                "requests": len(records),
+                "throughput_rps": round(len(records) / self.duration, 2),
+                "error_rate": round(errors / len(records), 4) if records else 0.0,
+                "statuses": statuses,
+                **_percentiles([latency for _, _, latency in records]),
+            }
+
+        return {
+            "users": self.users,
+            "duration_s": self.duration,
+            "overall": summarize(self.records),
+            "by_request": {
+                entry["name"]: summarize([r for r in self.records if r[0] == entry["name"]])
+                for entry in self.mix
+            },
+        }
+
+
+def print_report(report: dict):
+    overall = report["overall"]
+    print(f"\n{report['users']} users for {report['duration_s']:g}s: "
+          f"{overall['requests']} requests, {overall['throughput_rps']} req/s, "
+          f"error rate {overall['error_rate']:.2%}")
+    print(f"  {'request':<22}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  statuses")
+    for name, stats in [("overall", overall), *report["by_request"].items()]:
+        if not stats["requests"]:
+            continue
+        print(f"  {name:<22}{stats['requests']:>8}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}  {stats['statuses']}")
+
+
+async def run(args, mix):
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+            return await LoadTest(client, mix, args.users, args.duration, args.warmup, args.think, args.seed).run()
+
+    from src.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", limits=limits, timeout=timeout) as client:
+            print("Waiting for the startup cache rebuild...")
+            while (await client.get("/ready")).json()["status"] != "ready":
+                await asyncio.sleep(0.5)
+            return await LoadTest(client, mix, args.users, args.duration, args.warmup, args.think, args.seed).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server; default runs the app in-process")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="Seconds of unmeasured load first")
+    parser.add_argument("--think", type=float, default=0.0, help="Mean pause between a user's requests (s)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout (s)")
+    parser.add_argument("--mix", help="JSON request mix file (default: built-in mix)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    mix = DEFAULT_MIX
+    if args.mix:
+        with open(args.mix) as f:
+            mix = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.url:
+            os.environ.setdefault("CACHE_BACKEND", "memory")
+            os.environ.setdefault("METRICS_DIR", os.path.join(tmp, "metrics"))
+            os.environ.setdefault("SLOW_REQUEST_MS", "1e12")
+        report = asyncio.run(run(args, mix))
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
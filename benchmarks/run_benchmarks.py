@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Benchmark compute functions, cache round trips and endpoint latency
+against a synthetic database, and save the results as JSON so runs on
+different commits can be compared.
+
+Usage:
+    uv run python benchmarks/run_benchmarks.py --scale 1
+    uv run python benchmarks/run_benchmarks.py --scale 10 --snapshot --only hierarchical
+    uv run python benchmarks/run_benchmarks.py --compare benchmarks/results/<earlier run>.json
+
+The database is generated on first use (benchmarks/generate_db.py). The
+in-process cache backend is used unless --cache-backend says otherwise, so
+no Redis server is needed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+RESULTS_DIR = "benchmarks/results"
+REGRESSION_RATIO = 1.2
+
+HIERARCHICAL_RANGES = [(2022, 2022), (2020, 2022), (2018, 2022), (2013, 2022)]
+ENDPOINTS = [
+    "/",
+    "/ready",
+    "/api/v1/timeline/papers-by-year",
+    "/api/v1/timeline/aggregate?group_by=year,field&metric=citations",
+    "/api/v1/data/patents-by-year?year=2020",
+    "/api/v1/data/patents-by-year/batch?years=2013,2016,2019,2022",
+    "/api/v1/network/citation",
+    "/api/v1/network/collaboration",
+    "/api/v1/network/hierarchical-citation?year_start=2020&year_end=2022",
+    "/api/v1/metrics/top?year_start=2020&year_end=2022&limit=20",
+]
+CACHE_PAYLOAD_SIZES = [1_000, 100_000, 1_000_000, 10_000_000]
+
+
+def _configure_environment(args):
+    """Point the app at the benchmark database before anything imports src."""
+    os.environ["DB_PATH"] = args.db
+    os.environ["CACHE_BACKEND"] = args.cache_backend
+    os.environ.setdefault("CACHE_DISK_PATH", os.path.join(args.tmp, "cache.db"))
+    os.environ["SNAPSHOT_PATH"] = args.snapshot_path if args.snapshot else os.path.join(args.tmp, "no-snapshot.bin")
+    os.environ["METRICS_DIR"] = os.path.join(args.tmp, "metrics")
+    os.environ["SLOW_REQUEST_MS"] = "1e12"
+
+
+def _stats(samples_ms: list[float]):
+    samples = np.array(samples_ms)
+    return {
+        "repeat": len(samples),
+        "min_ms": round(float(samples.min()), 3),
+        "median_ms": round(float(np.median(samples)), 3),
+        "mean_ms": round(float(samples.mean()), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "max_ms": round(float(samples.max()), 3),
+    }
+
+
+class Runner:
+    """Collects timings for named benchmarks, filtered by --only."""
+
+    def __init__(self, repeat: int, only: str | None):
+        self.repeat = repeat
+        self.only = re.compile(only) if only else None
+        self.results = {}
+
+    def wanted(self, name: str):
+        return self.only is None or bool(self.only.search(name))
+
+    async def time(self, name: str, func, **extra):
+        if not self.wanted(name):
+            return
+        samples = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            await func()
+            samples.append((time.perf_counter() - start) * 1000)
+        self.results[name] = {**_stats(samples), **extra}
+        print(f"  {name:<72} median {self.results[name]['median_ms']:>10.2f} ms")
+
+
+async def bench_compute(runner: Runner):
+    from src.services import processing
+
+    print("Compute functions:")
+    await runner.time("compute.papers_by_year", processing.compute_papers_by_year)
+    await runner.time("compute.patents_for_year", lambda: processing.compute_patents_for_year(2020))
+    await runner.time("compute.patent_summary_for_year", lambda: processing.compute_patent_summary_for_year(2020))
+    await runner.time("compute.analytics_cube", processing.compute_analytics_cube)
+    await runner.time("compute.citation_flows", processing.compute_citation_flows)
+    await runner.time("compute.citation_network", processing.compute_citation_network)
+    await runner.time("compute.collaboration_network", processing.compute_collaboration_network)
+    await runner.time("compute.community_network", processing.compute_community_network)
+    for year_start, year_end in HIERARCHICAL_RANGES:
+        await runner.time(
+            f"compute.centrality_metrics:{year_start}-{year_end}",
+            lambda: processing.compute_centrality_metrics(year_start, year_end),
+        )
+        await runner.time(
+            f"compute.hierarchical_citation_network:{year_start}-{year_end}",
+            lambda: processing.compute_hierarchical_citation_network(year_start, year_end),
+        )
+
+
+async def bench_cache(runner: Runner):
+    from src.cache import cache_json, delete_keys, get_cached_json
+
+    print("Cache round trips:")
+    for size in CACHE_PAYLOAD_SIZES:
+        # A list of small records serializes like the network payloads do
+        payload = [{"id": str(i), "value": i} for i in range(size // 24)]
+        key = f"bench:payload:{size}"
+        await runner.time(f"cache.set:{size}", lambda: cache_json(key, payload), bytes=size)
+        await runner.time(f"cache.get:{size}", lambda: get_cached_json(key), bytes=size)
+        await delete_keys([key])
+
+
+async def bench_endpoints(runner: Runner):
+    import httpx
+    from src.main import app
+
+    print("Endpoints (in-process ASGI, cache pre-filled):")
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            # The startup healer fills the required keys; wait for it
+            while (await client.get("/ready")).json()["status"] != "ready":
+                await asyncio.sleep(0.5)
+
+            for path in ENDPOINTS:
+                response = await client.get(path)
+
+                async def request(path=path):
+                    response = await client.get(path)
+                    response.raise_for_status()
+
+                await runner.time(
+                    f"endpoint:{path}", request,
+                    status=response.status_code, bytes=len(response.content),
+                )
+
+
+def _git_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def compare(current: dict, baseline_path: str):
+    """Print median ratios against an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nComparison with {baseline_path} ({((baseline['meta'].get('git') or {}).get('commit') or '?')[:10]}):")
+    regressions = 0
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        ratio = result["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+        flag = "  REGRESSION" if ratio > REGRESSION_RATIO else ""
+        regressions += bool(flag)
+        print(f"  {name:<72} {before['median_ms']:>10.2f} -> {result['median_ms']:>10.2f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+async def run(args):
+    from src.database import DB_PATH
+
+    runner = Runner(args.repeat, args.only)
+    if "compute" in args.groups:
+        await bench_compute(runner)
+    if "cache" in args.groups:
+        await bench_cache(runner)
+    if "endpoints" in args.groups:
+        await bench_endpoints(runner)
+
+    from src.cache import close_cache_backend
+    await close_cache_backend()
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": _git_info(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "db_path": DB_PATH,
+            "db_bytes": os.path.getsize(DB_PATH),
+            "cache_backend": args.cache_backend,
+            "snapshot": args.snapshot,
+            "repeat": args.repeat,
+        },
+        "results": runner.results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="Synthetic database scale (default 1)")
+    parser.add_argument("--db", help="Use this database instead of a generated one")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="Regex selecting benchmark names")
+    parser.add_argument("--groups", default="compute,cache,endpoints", help="Comma-separated groups to run")
+    parser.add_argument("--cache-backend", default="memory", choices=["memory", "disk", "redis"])
+    parser.add_argument("--snapshot", action="store_true", help="Build and use the mmap snapshot")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare medians against")
+    args = parser.parse_args()
+
+    args.groups = args.groups.split(",")
+    if args.db is None:
+        args.db = f"benchmarks/data/scale-{args.scale:g}.db"
+        if not os.path.exists(args.db):
+            from generate_db import generate
+            print(f"Generating {args.db}...")
+            generate(args.db, args.scale)
+    args.snapshot_path = f"{os.path.splitext(args.db)[0]}.snapshot.bin"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.tmp = tmp
+        _configure_environment(args)
+
+        if args.snapshot:
+            from src.snapshot import build_snapshot_arrays, write_snapshot
+            print(f"Building snapshot {args.snapshot_path}...")
+            write_snapshot(asyncio.run(build_snapshot_arrays()), args.snapshot_path)
+
+        results = asyncio.run(run(args))
+
+    git = results["meta"]["git"]
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{(git['commit'] or 'nogit')[:10]}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved {len(results['results'])} results to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Add a cohort (a set of affiliations and fields) to an existing database.
+
+The steps are those of pipeline.py, restricted to what the database does not
+hold yet:
+    1. Author rows, only for affiliations no existing cohort covers for the year range
+    2. Papers not in any cohort yet
+    3. Field rows of new papers, plus fields no existing cohort extracted for papers already present
+    4/5. References and abstracts of CS papers not already covered by a cohort
+
+Rows shared with existing cohorts are not rewritten (INSERT OR IGNORE), and
+existing cohorts keep their own papers, affiliations and fields, so their API
+results do not change. A database built before cohorts existed is first
+tagged as the default cohort.
+
+With --parquet-dir (see parquet_staging.py) every step is a pushdown scan of
+the staged columns; without it the TSVs are scanned in parallel.
+
+Usage:
+    python preprocessing/extract_cohort.py --db data/sciscinet_vt_cs_2013_2022.db \\
+        --parquet-dir data/parquet --cohort mit-cs --name "MIT CS" --affiliations 63966007
+Then pre-compute its cache keys:
+    uv run python src/scripts/pre_cache.py --cohort mit-cs
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pipeline import (  # noqa: E402
+    BLOCK_SIZE_MB, DEFAULT_COHORT, PART_SIZE_MB, load_lookup_tables, register_cohort, run_parquet_step, run_step,
+)
+from validation_config import CS_FIELD_IDS, VT_AFFILIATION_IDS  # noqa: E402
+
+COHORT_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+
+def _ids(conn: sqlite3.Connection, sql: str, params=()):
+    """Sorted unique integers of the first column of a query."""
+    return np.unique(np.array([row[0] for row in conn.execute(sql, params)], dtype=np.int64))
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+def ensure_cohort_tables(conn: sqlite3.Connection):
+    """Tag every paper of a database built before cohorts as the default cohort."""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'paper_cohorts'").fetchone():
+        return
+    year_start, year_end = conn.execute("SELECT MIN(year), MAX(year) FROM papers").fetchone()
+    paper_ids = _ids(conn, "SELECT paper_id FROM papers")
+    print(f"Tagging {len(paper_ids):,} existing papers as cohort {DEFAULT_COHORT}")
+    register_cohort(conn, DEFAULT_COHORT, "Virginia Tech CS", VT_AFFILIATION_IDS, CS_FIELD_IDS,
+                    (year_start, year_end), paper_ids)
+
+
+def extract(db_path: str, data_dir: str, cohort_id: str, name: str, affiliation_ids: list[int],
+            field_ids: list[int], start_year: int, end_year: int, parquet_dir: str | None = None,
+            workers: int = os.cpu_count()):
+    """Extract a cohort into the database at `db_path`. Returns its paper count."""
+    if not COHORT_ID_PATTERN.match(cohort_id):
+        raise ValueError(f"Cohort id must match {COHORT_ID_PATTERN.pattern}: {cohort_id}")
+
+    conn = sqlite3.connect(db_path)
+    ensure_cohort_tables(conn)
+    if conn.execute("SELECT 1 FROM cohorts WHERE cohort_id = ?", (cohort_id,)).fetchone():
+        raise ValueError(f"Cohort {cohort_id} already exists in {db_path}")
+
+    years = (start_year, end_year)
+    affiliations = np.unique(np.array(affiliation_ids, dtype=np.int64))
+    fields = np.unique(np.array(field_ids, dtype=np.int64))
+    total_start = time.perf_counter()
+
+    def step(table, **ids):
+        if parquet_dir:
+            return run_parquet_step(conn, parquet_dir, table, ids, years)
+        return run_step(conn, data_dir, table, ids, years, workers,
+                        PART_SIZE_MB * 1024 ** 2, BLOCK_SIZE_MB * 1024 ** 2)
+
+    load_lookup_tables(conn, data_dir, affiliations.tolist(), fields.tolist())
+
+    # Only papers tagged with a cohort count as present: rows left by an
+    # interrupted run are extracted again (INSERT OR IGNORE keeps them single)
+    tagged = _ids(conn, "SELECT DISTINCT paper_id FROM paper_cohorts")
+    fielded = np.intersect1d(_ids(conn, "SELECT DISTINCT paper_id FROM paper_fields"), tagged)
+
+    # 1. Author rows of affiliations not covered for this year range
+    covered = _ids(
+        conn,
+        """
+        SELECT ca.affiliation_id FROM cohort_affiliations ca
+        JOIN cohorts c ON c.cohort_id = ca.cohort_id
+        WHERE c.year_start <= ? AND c.year_end >= ?
+        """,
+        years,
+    )
+    new_affiliations = np.setdiff1d(affiliations, covered)
+    if len(new_affiliations):
+        step("paper_author_affiliations", affiliations=new_affiliations)
+    candidates = _ids(
+        conn,
+        f"SELECT DISTINCT paper_id FROM paper_author_affiliations WHERE affiliation_id IN ({_placeholders(affiliations)})",
+        affiliations.tolist(),
+    )
+    print(f"  Cohort candidate papers (all years): {len(candidates):,}")
+
+    # 2. Papers no cohort holds yet
+    missing = np.setdiff1d(candidates, tagged)
+    if len(missing):
+        step("papers", papers=missing)
+    in_range = _ids(conn, "SELECT paper_id FROM papers WHERE year >= ? AND year <= ?", years)
+    cohort_papers = np.intersect1d(candidates, in_range)
+    new_papers = np.setdiff1d(cohort_papers, tagged)
+    print(f"  Cohort papers {start_year}-{end_year}: {len(cohort_papers):,} ({len(new_papers):,} new)")
+
+    # 3. Fields: every cohort field for new papers. Papers already present
+    # have the fields of their cohorts, which include the fields common to
+    # every existing cohort; the other fields are extracted for them.
+    if len(new_papers):
+        step("paper_fields", papers=new_papers, fields=fields)
+    common_fields = None
+    for (existing,) in conn.execute("SELECT cohort_id FROM cohorts").fetchall():
+        existing_fields = _ids(conn, "SELECT field_id FROM cohort_fields WHERE cohort_id = ?", (existing,))
+        common_fields = existing_fields if common_fields is None else np.intersect1d(common_fields, existing_fields)
+    extra_fields = np.setdiff1d(fields, common_fields if common_fields is not None else [])
+    old_papers = np.intersect1d(cohort_papers, tagged)
+    if len(old_papers) and len(extra_fields):
+        step("paper_fields", papers=old_papers, fields=extra_fields)
+
+    # 4/5. References and abstracts of cohort CS papers. Papers that had
+    # field rows were CS papers of an earlier cohort and already have both.
+    cs_papers = np.intersect1d(
+        _ids(conn, f"SELECT DISTINCT paper_id FROM paper_fields WHERE field_id IN ({_placeholders(fields)})",
+             fields.tolist()),
+        cohort_papers,
+    )
+    delta = np.setdiff1d(cs_papers, fielded)
+    print(f"  Cohort CS papers: {len(cs_papers):,} ({len(delta):,} need references and abstracts)")
+    if len(delta):
+        step("paper_references", papers=delta)
+        step("paper_details", papers=delta)
+
+    # Author rows were collected for every year; keep those of papers in the database
+    if len(new_affiliations):
+        with conn:
+            conn.execute(
+                f"""
+                DELETE FROM paper_author_affiliations
+                WHERE affiliation_id IN ({_placeholders(new_affiliations)})
+                AND paper_id NOT IN (SELECT paper_id FROM papers)
+                """,
+                new_affiliations.tolist(),
+            )
+    register_cohort(conn, cohort_id, name, affiliations.tolist(), fields.tolist(), years, cohort_papers)
+    conn.execute("ANALYZE")
+    conn.close()
+    print(f"\nAdded cohort {cohort_id} ({len(cohort_papers):,} papers) in {time.perf_counter() - total_start:.1f}s")
+    return len(cohort_papers)
+
+
+def _int_list(value: str):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="Existing database to add the cohort to")
+    parser.add_argument("--cohort", required=True, help="Cohort id (lowercase letters, digits, - and _)")
+    parser.add_argument("--name", help="Display name (default: the cohort id)")
+    parser.add_argument("--affiliations", type=_int_list, required=True, help="Comma-separated affiliation ids")
+    parser.add_argument("--fields", type=_int_list, default=CS_FIELD_IDS,
+                        help="Comma-separated field ids (default: the CS fields of validation_config.py)")
+    parser.add_argument("--start-year", type=int, default=2013)
+    parser.add_argument("--end-year", type=int, default=2022)
+    parser.add_argument("--data-dir", default="data", help="Directory with the SciSciNet TSV files")
+    parser.add_argument("--parquet-dir", help="Read Parquet staged by parquet_staging.py instead of the TSVs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes for TSV scans")
+    args = parser.parse_args()
+
+    try:
+        extract(args.db, args.data_dir, args.cohort, args.name or args.cohort, args.affiliations, args.fields,
+                args.start_year, args.end_year, args.parquet_dir, args.workers)
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
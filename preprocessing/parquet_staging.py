@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+One-time conversion of the SciSciNet TSVs to typed, columnar Parquet.
+
+Only the columns the preprocessing steps use are kept, renamed to the
+database column names and stored with integer types. Papers are
+partitioned by year (hive layout, year=2013/...), so a year range reads
+only its partitions. All other tables are written as plain row groups.
+Later rebuilds read the staged data with `pipeline.py --parquet-dir`. That
+path projects only the needed columns and pushes the id and year filters
+down into the Parquet scan, so the text TSVs are parsed once in total.
+
+Requires pyarrow.
+
+Usage:
+    python preprocessing/parquet_staging.py --data-dir data --staging-dir data/parquet
+    python preprocessing/pipeline.py --parquet-dir data/parquet --start-year 2013 --end-year 2022
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pipeline import COLUMNS, SOURCES, resolve_columns  # noqa: E402
+
+BLOCK_SIZE_MB = 64
+ROWS_PER_GROUP = 1_000_000
+
+TYPES = {
+    "paper_id": pa.int64(),
+    "author_id": pa.int64(),
+    "affiliation_id": pa.int64(),
+    "field_id": pa.int64(),
+    "reference_id": pa.int64(),
+    "author_sequence": pa.int32(),
+    "year": pa.int16(),
+    "citation_count": pa.int32(),
+    "reference_count": pa.int32(),
+    "patent_count": pa.int32(),
+    "score": pa.float32(),
+    "title": pa.string(),
+    "abstract": pa.string(),
+}
+PARTITIONING = {"papers": ["year"]}
+
+
+def stage_table(data_dir: str, staging_dir: str, table: str, block_size: int = BLOCK_SIZE_MB * 1024 ** 2):
+    """Stream one TSV into `staging_dir/table` as Parquet. Returns the rows written."""
+    path = os.path.join(data_dir, SOURCES[table])
+    _, mapping = resolve_columns(path, table)
+    columns = list(mapping)
+    schema = pa.schema([(column, TYPES[column]) for column in columns])
+    reader = pv.open_csv(
+        path,
+        read_options=pv.ReadOptions(block_size=block_size),
+        parse_options=pv.ParseOptions(delimiter="\t", quote_char=False),
+        convert_options=pv.ConvertOptions(
+            include_columns=list(mapping.values()),
+            column_types={mapping[column]: TYPES[column] for column in columns},
+        ),
+    )
+    rows = 0
+
+    def batches():
+        nonlocal rows
+        for batch in reader:
+            batch = pa.RecordBatch.from_arrays([batch.column(mapping[column]) for column in columns], schema=schema)
+            rows += batch.num_rows
+            yield batch
+
+    output = os.path.join(staging_dir, table)
+    if os.path.exists(output):
+        shutil.rmtree(output)
+    partition_columns = PARTITIONING.get(table)
+    ds.write_dataset(
+        batches(), output, schema=schema, format="parquet",
+        partitioning=partition_columns, partitioning_flavor="hive" if partition_columns else None,
+        max_rows_per_group=ROWS_PER_GROUP, min_rows_per_group=ROWS_PER_GROUP // 4,
+        max_partitions=4096,
+    )
+    return rows
+
+
+def row_filter(table: str, ids: dict[str, np.ndarray], years: tuple[int, int]):
+    """The step filters of pipeline.py as a pushdown expression."""
+    def member(column, key):
+        return pc.field(column).isin(pa.array(ids[key], type=pa.int64()))
+
+    if table == "paper_author_affiliations":
+        return member("affiliation_id", "affiliations")
+    if table == "papers":
+        return member("paper_id", "papers") & (pc.field("year") >= years[0]) & (pc.field("year") <= years[1])
+    if table == "paper_fields":
+        return member("paper_id", "papers") & member("field_id", "fields")
+    if table == "paper_references":
+        return member("paper_id", "papers") | member("reference_id", "papers")
+    if table == "paper_details":
+        return member("paper_id", "papers")
+    raise ValueError(f"Unknown table {table}")
+
+
+def scan_table(staging_dir: str, table: str, ids: dict[str, np.ndarray], years: tuple[int, int]):
+    """Yield filtered record batches of a staged table, with its database columns."""
+    dataset = ds.dataset(
+        os.path.join(staging_dir, table), format="parquet",
+        partitioning="hive" if table in PARTITIONING else None,
+    )
+    columns = [column for column in COLUMNS[table] if column in dataset.schema.names]
+    yield from dataset.to_batches(columns=columns, filter=row_filter(table, ids, years))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="data", help="Directory with the SciSciNet TSV files")
+    parser.add_argument("--staging-dir", help="Parquet output directory (default <data-dir>/parquet)")
+    parser.add_argument("--tables", default=",".join(SOURCES), help="Comma-separated tables to stage")
+    args = parser.parse_args()
+
+    staging_dir = args.staging_dir or os.path.join(args.data_dir, "parquet")
+    for table in args.tables.split(","):
+        start = time.perf_counter()
+        print(f"Staging {SOURCES[table]} -> {os.path.join(staging_dir, table)}...")
+        rows = stage_table(args.data_dir, staging_dir, table)
+        print(f"  {rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
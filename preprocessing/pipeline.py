@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Scriptable, parallel version of 02_preprocessing.ipynb.
+
+Each SciSciNet TSV is split into byte ranges aligned to line boundaries.
+Worker processes parse their ranges with pandas (only the needed columns)
+and filter rows by sorted-array membership against the ID sets from earlier
+steps. The main process streams the surviving rows into SQLite in bulk
+transactions. Steps are the same as in the notebook:
+
+    1. PaperAuthorAffiliations: rows with a VT affiliation -> VT paper ids
+    2. Papers: VT papers published in [start_year, end_year]
+    3. PaperFields: CS fields of those papers -> CS paper ids
+    4. PaperReferences: citations where either side is a CS paper
+    5. PaperDetails: abstracts of CS papers
+
+Rows are assumed to be one per line (no quoted newlines), as in SciSciNet.
+
+Usage:
+    python preprocessing/pipeline.py --data-dir data --start-year 2013 --end-year 2022 --workers 16
+    python preprocessing/pipeline.py --data-dir data --parquet-dir data/parquet   # after parquet_staging.py
+"""
+import argparse
+import io
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from validation_config import (  # noqa: E402
+    AFFILIATION_ID_COL, AFFILIATION_NAME_COL, CS_FIELD_IDS, FIELD_ID_COL, FIELD_NAME_COL, VT_AFFILIATION_IDS,
+)
+
+PART_SIZE_MB = 256
+# Ranges are parsed in blocks of this size to bound worker memory
+BLOCK_SIZE_MB = 64
+
+SCHEMA = """
+CREATE TABLE affiliations (affiliation_id INTEGER PRIMARY KEY, affiliation_name TEXT);
+CREATE TABLE fields (field_id INTEGER PRIMARY KEY, field_name TEXT);
+CREATE TABLE papers (
+    paper_id INTEGER PRIMARY KEY, title TEXT, year INTEGER,
+    citation_count INTEGER, reference_count INTEGER, patent_count INTEGER
+);
+CREATE TABLE paper_details (paper_id INTEGER PRIMARY KEY, abstract TEXT);
+CREATE TABLE paper_author_affiliations (
+    paper_id INTEGER, author_id INTEGER, affiliation_id INTEGER, author_sequence INTEGER,
+    PRIMARY KEY (paper_id, author_id, affiliation_id)
+);
+CREATE TABLE paper_fields (paper_id INTEGER, field_id INTEGER, score REAL, PRIMARY KEY (paper_id, field_id));
+CREATE TABLE paper_references (paper_id INTEGER, reference_id INTEGER, PRIMARY KEY (paper_id, reference_id));
+"""
+
+# Cohorts tag which papers belong to which affiliation/field extraction
+# (see extract_cohort.py); the API filters every query by cohort
+DEFAULT_COHORT = "vt-cs"
+COHORT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cohorts (
+    cohort_id TEXT PRIMARY KEY, name TEXT, year_start INTEGER, year_end INTEGER, created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS cohort_affiliations (cohort_id TEXT, affiliation_id INTEGER, PRIMARY KEY (cohort_id, affiliation_id));
+CREATE TABLE IF NOT EXISTS cohort_fields (cohort_id TEXT, field_id INTEGER, PRIMARY KEY (cohort_id, field_id));
+CREATE TABLE IF NOT EXISTS paper_cohorts (cohort_id TEXT, paper_id INTEGER, PRIMARY KEY (cohort_id, paper_id));
+CREATE INDEX IF NOT EXISTS idx_pc_paper ON paper_cohorts(paper_id);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_papers_year ON papers(year);
+CREATE INDEX IF NOT EXISTS idx_papers_id ON papers(paper_id);
+CREATE INDEX IF NOT EXISTS idx_paa_paper ON paper_author_affiliations(paper_id);
+CREATE INDEX IF NOT EXISTS idx_paa_author ON paper_author_affiliations(author_id);
+CREATE INDEX IF NOT EXISTS idx_paa_affil ON paper_author_affiliations(affiliation_id);
+CREATE INDEX IF NOT EXISTS idx_pf_paper ON paper_fields(paper_id);
+CREATE INDEX IF NOT EXISTS idx_pf_field ON paper_fields(field_id);
+CREATE INDEX IF NOT EXISTS idx_pr_paper ON paper_references(paper_id);
+CREATE INDEX IF NOT EXISTS idx_pr_ref ON paper_references(reference_id);
+CREATE INDEX IF NOT EXISTS idx_pd_paper ON paper_details(paper_id);
+"""
+
+# Output column -> accepted TSV header names, compared ignoring case and underscores
+COLUMNS = {
+    "paper_author_affiliations": {
+        "paper_id": ["PaperID"],
+        "author_id": ["AuthorID"],
+        "affiliation_id": ["AffiliationID"],
+        "author_sequence": ["AuthorSequenceNumber", "SequenceNumber", "AuthorSequence"],
+    },
+    "papers": {
+        "paper_id": ["PaperID"],
+        "title": ["PaperTitle", "OriginalTitle", "Title"],
+        "year": ["Year", "PublicationYear"],
+        "citation_count": ["CitationCount", "Citations"],
+        "reference_count": ["ReferenceCount", "References"],
+        "patent_count": ["PatentCount"],
+    },
+    "paper_fields": {
+        "paper_id": ["PaperID"],
+        "field_id": ["FieldID"],
+        "score": ["Score"],
+    },
+    "paper_references": {
+        "paper_id": ["PaperID", "CitingPaperID"],
+        "reference_id": ["ReferenceID", "CitedPaperID", "ReferencePaperID"],
+    },
+    "paper_details": {
+        "paper_id": ["PaperID"],
+        "abstract": ["Abstract", "OriginalAbstract"],
+    },
+}
+REQUIRED = {"paper_id", "reference_id", "affiliation_id", "field_id", "year"}
+
+SOURCES = {
+    "paper_author_affiliations": "SciSciNet_PaperAuthorAffiliations.tsv",
+    "papers": "SciSciNet_Papers.tsv",
+    "paper_fields": "SciSciNet_PaperFields.tsv",
+    "paper_references": "SciSciNet_PaperReferences.tsv",
+    "paper_details": "SciSciNet_PaperDetails.tsv",
+}
+
+
+def is_member(values: np.ndarray, sorted_ids: np.ndarray):
+    """Vectorized membership test against a sorted unique id array."""
+    if len(sorted_ids) == 0:
+        return np.zeros(len(values), dtype=bool)
+    pos = np.minimum(np.searchsorted(sorted_ids, values), len(sorted_ids) - 1)
+    return sorted_ids[pos] == values
+
+
+def resolve_columns(path: str, table: str):
+    """Map output columns to TSV header names present in the file."""
+    with open(path, "rb") as f:
+        header = f.readline().decode("utf-8").rstrip("\r\n").split("\t")
+    normalized = {name.lower().replace("_", "").replace(" ", ""): name for name in header}
+    mapping = {}
+    for column, candidates in COLUMNS[table].items():
+        found = next((normalized[key] for key in (c.lower().replace("_", "") for c in candidates) if key in normalized), None)
+        if found:
+            mapping[column] = found
+        elif column in REQUIRED:
+            raise ValueError(f"{path}: none of {candidates} in header {header}")
+    return header, mapping
+
+
+def byte_ranges(path: str, part_size: int):
+    """Split a file after its header into (start, end) byte ranges of about part_size."""
+    with open(path, "rb") as f:
+        f.readline()
+        data_start = f.tell()
+    size = os.path.getsize(path)
+    bounds = list(range(data_start, size, part_size)) + [size]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _read_lines(path: str, start: int, end: int, block_size: int):
+    """
+    Yield blocks of whole lines for the lines that start within [start, end).
+    A line crossing `end` belongs to this range; a line crossing `start`
+    belongs to the previous one.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        if start > 0:
+            f.seek(start - 1)
+            if f.read(1) != b"\n":
+                f.readline()
+        while f.tell() < end:
+            block = f.read(min(block_size, end - f.tell()))
+            # Finish the last line, which may run past `end`. A block ending
+            # on a newline is complete; the next line may start at `end`.
+            if not block.endswith(b"\n"):
+                block += f.readline()
+            yield block
+
+
+def _filter_rows(table: str, frame: pd.DataFrame, ids: dict[str, np.ndarray], years: tuple[int, int]):
+    """Boolean mask of rows to keep for a step."""
+    if table == "paper_author_affiliations":
+        return is_member(frame["affiliation_id"].to_numpy(), ids["affiliations"])
+    if table == "papers":
+        year = frame["year"].to_numpy()
+        return is_member(frame["paper_id"].to_numpy(), ids["papers"]) & (year >= years[0]) & (year <= years[1])
+    if table == "paper_fields":
+        return is_member(frame["paper_id"].to_numpy(), ids["papers"]) & is_member(frame["field_id"].to_numpy(), ids["fields"])
+    if table == "paper_references":
+        return is_member(frame["paper_id"].to_numpy(), ids["papers"]) | is_member(frame["reference_id"].to_numpy(), ids["papers"])
+    if table == "paper_details":
+        return is_member(frame["paper_id"].to_numpy(), ids["papers"])
+    raise ValueError(f"Unknown table {table}")
+
+
+def filter_range(path: str, start: int, end: int, table: str, header: list[str], mapping: dict[str, str],
+                 ids: dict[str, np.ndarray], years: tuple[int, int], block_size: int):
+    """Worker: parse and filter one byte range. Returns (rows kept, rows scanned)."""
+    rename = {name: column for column, name in mapping.items()}
+    id_columns = [column for column in mapping if column.endswith("_id") or column == "year"]
+    kept = []
+    scanned = 0
+    for block in _read_lines(path, start, end, block_size):
+        frame = pd.read_csv(
+            io.BytesIO(block), sep="\t", header=None, names=header,
+            usecols=list(mapping.values()), dtype=str, na_filter=False, quoting=3,
+        ).rename(columns=rename)
+        scanned += len(frame)
+        for column in id_columns:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce").fillna(-1).astype(np.int64)
+        frame = frame[_filter_rows(table, frame, ids, years)]
+        if len(frame):
+            kept.append(frame)
+    rows = pd.concat(kept) if kept else pd.DataFrame(columns=list(mapping))
+    return rows[list(mapping)], scanned
+
+
+def run_step(conn: sqlite3.Connection, data_dir: str, table: str, ids: dict[str, np.ndarray],
+             years: tuple[int, int], workers: int, part_size: int, block_size: int):
+    """Filter one TSV in parallel into `table`. Returns the sorted unique paper ids kept."""
+    path = os.path.join(data_dir, SOURCES[table])
+    header, mapping = resolve_columns(path, table)
+    ranges = byte_ranges(path, part_size)
+    columns = list(mapping)
+    insert = f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    print(f"\n=== {table}: {SOURCES[table]} ({os.path.getsize(path) / 1024 ** 3:.2f} GB, "
+          f"{len(ranges)} parts, {workers} workers) ===")
+    print(f"  Columns: {mapping}")
+
+    start_time = time.perf_counter()
+    scanned = 0
+    kept = 0
+    paper_ids = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(filter_range, path, start, end, table, header, mapping, ids, years, block_size)
+            for start, end in ranges
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            rows, part_scanned = future.result()
+            scanned += part_scanned
+            kept += len(rows)
+            if len(rows):
+                paper_ids.append(rows["paper_id"].to_numpy())
+                # One transaction per part
+                with conn:
+                    conn.executemany(insert, rows.itertuples(index=False, name=None))
+            if done % max(1, len(ranges) // 20) == 0 or done == len(ranges):
+                elapsed = time.perf_counter() - start_time
+                print(f"  Part {done}/{len(ranges)}: {scanned:,} rows | {kept:,} kept | {scanned / elapsed:,.0f} rows/sec")
+
+    print(f"  Done in {time.perf_counter() - start_time:.1f}s")
+    return np.unique(np.concatenate(paper_ids)) if paper_ids else np.array([], dtype=np.int64)
+
+
+def run_parquet_step(conn: sqlite3.Connection, staging_dir: str, table: str, ids: dict[str, np.ndarray],
+                     years: tuple[int, int]):
+    """Like run_step, but reading the Parquet staged by parquet_staging.py."""
+    from parquet_staging import scan_table
+
+    print(f"\n=== {table}: {os.path.join(staging_dir, table)} (Parquet) ===")
+    start_time = time.perf_counter()
+    kept = 0
+    paper_ids = []
+    for batch in scan_table(staging_dir, table, ids, years):
+        if not batch.num_rows:
+            continue
+        columns = batch.schema.names
+        insert = f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        kept += batch.num_rows
+        paper_ids.append(batch.column("paper_id").to_numpy())
+        with conn:
+            conn.executemany(insert, zip(*(batch.column(column).to_pylist() for column in columns)))
+    print(f"  {kept:,} rows kept in {time.perf_counter() - start_time:.1f}s")
+    return np.unique(np.concatenate(paper_ids)) if paper_ids else np.array([], dtype=np.int64)
+
+
+def load_lookup_tables(conn: sqlite3.Connection, data_dir: str,
+                       affiliation_ids: list[int] = VT_AFFILIATION_IDS, field_ids: list[int] = CS_FIELD_IDS):
+    """Affiliations and fields are small; load the rows of the given ids directly."""
+    affiliations = pd.read_csv(os.path.join(data_dir, "SciSciNet_Affiliations.tsv"), sep="\t")
+    affiliations = affiliations[affiliations[AFFILIATION_ID_COL].isin(affiliation_ids)]
+    fields = pd.read_csv(os.path.join(data_dir, "SciSciNet_Fields.tsv"), sep="\t")
+    fields = fields[fields[FIELD_ID_COL].isin(field_ids)]
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO affiliations VALUES (?, ?)",
+            affiliations[[AFFILIATION_ID_COL, AFFILIATION_NAME_COL]].itertuples(index=False, name=None),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO fields VALUES (?, ?)",
+            fields[[FIELD_ID_COL, FIELD_NAME_COL]].itertuples(index=False, name=None),
+        )
+
+
+def register_cohort(conn: sqlite3.Connection, cohort_id: str, name: str, affiliation_ids: list[int],
+                    field_ids: list[int], years: tuple[int, int], paper_ids: np.ndarray):
+    """Record a cohort and tag its papers."""
+    conn.executescript(COHORT_SCHEMA)
+    with conn:
+        conn.execute(
+            "INSERT INTO cohorts VALUES (?, ?, ?, ?, ?)",
+            (cohort_id, name, years[0], years[1], time.strftime("%Y-%m-%dT%H:%M:%S")),
+        )
+        conn.executemany("INSERT INTO cohort_affiliations VALUES (?, ?)", [(cohort_id, int(i)) for i in affiliation_ids])
+        conn.executemany("INSERT INTO cohort_fields VALUES (?, ?)", [(cohort_id, int(i)) for i in field_ids])
+        conn.executemany("INSERT INTO paper_cohorts VALUES (?, ?)", ((cohort_id, int(i)) for i in paper_ids))
+
+
+def build(data_dir: str, output: str, start_year: int, end_year: int, workers: int,
+          part_size: int = PART_SIZE_MB * 1024 ** 2, block_size: int = BLOCK_SIZE_MB * 1024 ** 2,
+          parquet_dir: str | None = None):
+    """Run all steps and write the database to `output`, from the TSVs or from staged Parquet."""
+    if os.path.exists(output):
+        os.remove(output)
+    conn = sqlite3.connect(output)
+    conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF; PRAGMA cache_size=-1000000;" + SCHEMA)
+    years = (start_year, end_year)
+    total_start = time.perf_counter()
+
+    load_lookup_tables(conn, data_dir)
+
+    def step(table, **ids):
+        if parquet_dir:
+            return run_parquet_step(conn, parquet_dir, table, ids, years)
+        return run_step(conn, data_dir, table, ids, years, workers, part_size, block_size)
+
+    vt_papers = step("paper_author_affiliations", affiliations=np.unique(np.array(VT_AFFILIATION_IDS, dtype=np.int64)))
+    print(f"  VT papers (all years): {len(vt_papers):,}")
+    papers_in_range = step("papers", papers=vt_papers)
+    print(f"  VT papers {start_year}-{end_year}: {len(papers_in_range):,}")
+    cs_papers = step("paper_fields", papers=papers_in_range, fields=np.unique(np.array(CS_FIELD_IDS, dtype=np.int64)))
+    print(f"  VT CS papers: {len(cs_papers):,}")
+    step("paper_references", papers=cs_papers)
+    step("paper_details", papers=cs_papers)
+
+    register_cohort(conn, DEFAULT_COHORT, "Virginia Tech CS", VT_AFFILIATION_IDS, CS_FIELD_IDS, years, papers_in_range)
+    print("\nCreating indexes...")
+    conn.executescript(INDEXES)
+    conn.execute("ANALYZE")
+    conn.close()
+    print(f"\nBuilt {output} ({os.path.getsize(output) / 1024 ** 2:.1f} MB) "
+          f"in {time.perf_counter() - total_start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="data", help="Directory with the SciSciNet TSV files")
+    parser.add_argument("--start-year", type=int, default=2013)
+    parser.add_argument("--end-year", type=int, default=2022)
+    parser.add_argument("--output", help="Database path (default <data-dir>/sciscinet_vt_cs_<start>_<end>.db)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: all cores)")
+    parser.add_argument("--part-size-mb", type=int, default=PART_SIZE_MB, help="Byte range per task")
+    parser.add_argument("--parquet-dir", help="Read Parquet staged by parquet_staging.py instead of the TSVs")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(args.data_dir, f"sciscinet_vt_cs_{args.start_year}_{args.end_year}.db")
+    build(args.data_dir, output, args.start_year, args.end_year, args.workers, args.part_size_mb * 1024 ** 2,
+          parquet_dir=args.parquet_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,111 +1,667 @@
-from fastapi import APIRouter, HTTPException, Query
-from src.cache import get_cached_json
+import asyncio
+import time
+import json
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from src.cache import CACHE_TTL_SECONDS, cache_exists, get_cached_json, get_cached_json_many
+from src.cohorts import DEFAULT_COHORT, cohort_exists, cohort_key
 
 router = APIRouter(prefix="/api/v1")
 
+# Analytics cubes (one per cohort) kept in process memory; re-read from cache
+# periodically so a re-run of the pre-cache script is picked up without a restart
+ANALYTICS_CUBE_REFRESH_SECONDS = 300
+_analytics_cubes = {}  # cohort -> (cube, loaded_at)
+_citation_flows = {}  # cohort -> (flows, loaded_at)
+
+COHORT_DESCRIPTION = "Cohort id, see /cohorts"
+
+
+LAYOUT_OPTIONS = ("none", "force")
+PARTS_DESCRIPTION = "Comma-separated parts to return: summary, nodes, links"
+REBUILD_RETRY_AFTER_SECONDS = 30
+
+
+async def _cache_miss(key: str, detail: str):
+    """
+    Error for a missing pre-computed key: 503 with Retry-After while the
+    startup healer is rebuilding it, otherwise 404.
+    """
+    from src.services.warming import is_rebuilding
+
+    if await is_rebuilding(key):
+        return HTTPException(
+            status_code=503,
+            detail=f"{detail.split('.')[0]}. It is being rebuilt, retry shortly.",
+            headers={"Retry-After": str(REBUILD_RETRY_AFTER_SECONDS)},
+        )
+    return HTTPException(status_code=404, detail=detail)
+
+
+async def _check_cohort(cohort: str):
+    """404 for a cohort that is not in the database."""
+    if not await cohort_exists(cohort):
+        raise HTTPException(status_code=404, detail=f"Cohort {cohort} not found")
+
+
+def _cohort_query(cohort: str):
+    """Query string suffix carrying a non-default cohort into result URLs."""
+    return "" if cohort == DEFAULT_COHORT else f"&cohort={cohort}"
+
+
+@router.get("/cohorts")
+async def get_cohorts():
+    """List the cohorts in the database with their affiliations, fields and paper counts."""
+    from src.cohorts import list_cohorts
+
+    return {"default": DEFAULT_COHORT, "cohorts": await list_cohorts()}
+
+
+async def _attach_layout(data: dict, layout_key: str):
+    """
+    Add server-side force-directed x/y coordinates to each node.
+    Uses the cached layout when it matches the payload, else computes and caches it.
+    """
+    from src.cache import cache_json
+    from src.services.layout import network_layout
+
+    ids = [str(node["id"]) for node in data["nodes"]]
+    layout = await get_cached_json(layout_key)
+    if not layout or layout["ids"] != ids:
+        print(f"Computing force layout on-demand for {layout_key}...")
+        layout = await asyncio.to_thread(network_layout, data)
+        await cache_json(layout_key, layout, ttl=CACHE_TTL_SECONDS)
+
+    for node, x, y in zip(data["nodes"], layout["x"], layout["y"]):
+        node["x"] = x
+        node["y"] = y
+    return data
+
 
 @router.get("/network/citation")
-async def get_citation_network():
+async def get_citation_network(
+    layout: str = Query("none", description="Set to 'force' to include server-computed x/y coordinates"),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
+):
     """Get pre-computed citation network data."""
-    data = await get_cached_json("net:citation")
+    if layout not in LAYOUT_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"layout must be one of: {', '.join(LAYOUT_OPTIONS)}")
+    await _check_cohort(cohort)
+    key = cohort_key("net:citation", cohort)
+    data = await get_cached_json(key)
     if not data:
-        raise HTTPException(status_code=404, detail="Citation network data not found. Run pre-cache script.")
+        raise await _cache_miss(key, "Citation network data not found. Run pre-cache script.")
+    if layout == "force":
+        data = await _attach_layout(data, cohort_key("net:layout:citation", cohort))
     return data
 
 
 @router.get("/network/collaboration")
-async def get_collaboration_network():
+async def get_collaboration_network(
+    layout: str = Query("none", description="Set to 'force' to include server-computed x/y coordinates"),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
+):
     """Get pre-computed collaboration network data."""
-    data = await get_cached_json("net:collaboration")
+    if layout not in LAYOUT_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"layout must be one of: {', '.join(LAYOUT_OPTIONS)}")
+    await _check_cohort(cohort)
+    key = cohort_key("net:collaboration", cohort)
+    data = await get_cached_json(key)
     if not data:
-        raise HTTPException(status_code=404, detail="Collaboration network data not found. Run pre-cache script.")
+        raise await _cache_miss(key, "Collaboration network data not found. Run pre-cache script.")
+    if layout == "force":
+        data = await _attach_layout(data, cohort_key("net:layout:collaboration", cohort))
     return data
 
 
 @router.get("/network/citation-community")
-async def get_citation_community():
+async def get_citation_community(cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION)):
     """Get pre-computed community detection data."""
-    data = await get_cached_json("net:citation-community")
+    await _check_cohort(cohort)
+    key = cohort_key("net:citation-community", cohort)
+    data = await get_cached_json(key)
     if not data:
-        raise HTTPException(status_code=404, detail="Community data not found. Run pre-cache script.")
+        raise await _cache_miss(key, "Community data not found. Run pre-cache script.")
     return data
 
 
 @router.get("/timeline/papers-by-year")
-async def get_papers_by_year():
+async def get_papers_by_year(cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION)):
     """Get papers count by year."""
-    data = await get_cached_json("data:timeline")
+    await _check_cohort(cohort)
+    key = cohort_key("data:timeline", cohort)
+    data = await get_cached_json(key)
     if not data:
-        raise HTTPException(status_code=404, detail="Timeline data not found. Run pre-cache script.")
+        raise await _cache_miss(key, "Timeline data not found. Run pre-cache script.")
     return data
 
 
+async def _get_analytics_cube(cohort: str = DEFAULT_COHORT):
+    """Return the in-memory analytics cube of a cohort, loading it from cache when stale."""
+    from src.services.analytics import AnalyticsCube
+
+    cube, loaded_at = _analytics_cubes.get(cohort, (None, 0.0))
+    if cube is None or time.monotonic() - loaded_at > ANALYTICS_CUBE_REFRESH_SECONDS:
+        key = cohort_key("data:analytics-cube", cohort)
+        data = await get_cached_json(key)
+        if not data:
+            raise await _cache_miss(key, "Analytics cube not found. Run pre-cache script.")
+        cube = AnalyticsCube(data)
+        _analytics_cubes[cohort] = (cube, time.monotonic())
+    return cube
+
+
+@router.get("/timeline/aggregate")
+async def get_timeline_aggregate(
+    group_by: str = Query("year", description="One of: year, field, year,field"),
+    metric: str = Query("papers", description="One of: papers, citations, patents, authors"),
+    year_start: int = Query(2013, ge=2013, le=2022, description="Start year (inclusive)"),
+    year_end: int = Query(2022, ge=2013, le=2022, description="End year (inclusive)"),
+    field_id: int | None = Query(None, description="Restrict to one field"),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
+):
+    """
+    Get counts, sums and approximate percentiles from the pre-computed
+    year x field analytics cube.
+    """
+    from src.services.analytics import CUBE_METRICS, GROUP_BY_OPTIONS
+
+    if group_by not in GROUP_BY_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of: {', '.join(GROUP_BY_OPTIONS)}")
+    if metric != "papers" and metric not in CUBE_METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: papers, {', '.join(CUBE_METRICS)}")
+    if year_start > year_end:
+        raise HTTPException(status_code=400, detail="year_start must be <= year_end")
+
+    await _check_cohort(cohort)
+    cube = await _get_analytics_cube(cohort)
+    try:
+        rows = cube.aggregate(group_by, metric, year_start, year_end, field_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return {"group_by": group_by, "metric": metric, "rows": rows}
+
+
+async def _get_citation_flows(cohort: str = DEFAULT_COHORT):
+    """Return the in-memory citation flow tensors of a cohort, loading them from cache when stale."""
+    from src.services.flows import CitationFlows
+
+    flows, loaded_at = _citation_flows.get(cohort, (None, 0.0))
+    if flows is None or time.monotonic() - loaded_at > ANALYTICS_CUBE_REFRESH_SECONDS:
+        key = cohort_key("data:citation-flows", cohort)
+        data = await get_cached_json(key)
+        if not data:
+            raise await _cache_miss(key, "Citation flows not found. Run pre-cache script.")
+        flows = CitationFlows(data)
+        _citation_flows[cohort] = (flows, time.monotonic())
+    return flows
+
+
+@router.get("/flows")
+async def get_citation_flows(
+    kind: str = Query("field", description="One of: field, community"),
+    year_start: int = Query(2013, ge=2013, le=2022, description="Start year (inclusive)"),
+    year_end: int = Query(2022, ge=2013, le=2022, description="End year (inclusive)"),
+    by_year: bool = Query(False, description="Return one matrix per year instead of their sum"),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
+):
+    """
+    Get source x target citation counts between fields or between citation
+    communities over a year range, for chord and Sankey views.
+    """
+    from src.services.flows import FLOW_KINDS
+
+    if kind not in FLOW_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(FLOW_KINDS)}")
+    if year_start > year_end:
+        raise HTTPException(status_code=400, detail="year_start must be <= year_end")
+
+    await _check_cohort(cohort)
+    flows = await _get_citation_flows(cohort)
+    return flows.matrix(kind, year_start, year_end, by_year)
+
+
 @router.get("/data/patents-by-year")
-async def get_patents_by_year(year: int = Query(..., ge=2013, le=2022)):
+async def get_patents_by_year(
+    year: int = Query(..., ge=2013, le=2022),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
+):
     """Get patent counts for specific year."""
-    data = await get_cached_json(f"data:patents:{year}")
+    await _check_cohort(cohort)
+    key = cohort_key(f"data:patents:{year}", cohort)
+    data = await get_cached_json(key)
     if data is None:
-        raise HTTPException(status_code=404, detail=f"Patent data for year {year} not found. Run pre-cache script.")
+        raise await _cache_miss(key, f"Patent data for year {year} not found. Run pre-cache script.")
     return data
 
 
+def _parse_int_list(value: str, name: str):
+    """Parse a comma-separated list of integers from a query parameter."""
+    try:
+        return [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be a comma-separated list of integers")
+
+
+@router.get("/data/patents-by-year/batch")
+async def get_patent_histograms(
+    years: str = Query("2013,2014,2015,2016,2017,2018,2019,2020,2021,2022", description="Comma-separated years"),
+    bins: str | None = Query(None, description="Comma-separated increasing lower bin edges"),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
+):
+    """
+    Get patent count histograms and summary statistics for several years at once.
+    Default bins are served from pre-computed summaries; custom bins are
+    aggregated from the cached per-year counts.
+    """
+    from src.services.processing import DEFAULT_PATENT_BINS, summarize_patent_counts
+
+    year_list = _parse_int_list(years, "years")
+    if not year_list or any(year < 2013 or year > 2022 for year in year_list):
+        raise HTTPException(status_code=400, detail="years must be between 2013 and 2022")
+
+    bin_edges = _parse_int_list(bins, "bins") if bins else DEFAULT_PATENT_BINS
+    if not bin_edges or any(a >= b for a, b in zip(bin_edges, bin_edges[1:])):
+        raise HTTPException(status_code=400, detail="bins must be strictly increasing")
+    await _check_cohort(cohort)
+
+    if bin_edges == DEFAULT_PATENT_BINS:
+        summaries = await get_cached_json_many(
+            [cohort_key(f"data:patents-summary:{year}", cohort) for year in year_list]
+        )
+    else:
+        counts = await get_cached_json_many([cohort_key(f"data:patents:{year}", cohort) for year in year_list])
+        summaries = [
+            {"year": year, **summarize_patent_counts(year_counts, bin_edges)} if year_counts is not None else None
+            for year, year_counts in zip(year_list, counts)
+        ]
+
+    missing = [year for year, summary in zip(year_list, summaries) if summary is None]
+    if missing:
+        raise await _cache_miss(
+            cohort_key(f"data:patents-summary:{missing[0]}", cohort),
+            f"Patent data for years {missing} not found. Run pre-cache script."
+        )
+
+    return {"bins": bin_edges, "years": summaries}
+
+
+@router.get("/batch")
+async def get_batch(
+    resources: str = Query(
+        ...,
+        description="Comma-separated resources: timeline, citation, collaboration, community, flows, "
+                    "patents:<year>, patents-summary:<year>",
+    ),
+    stream: bool = Query(False, description="Stream one JSON line per resource as it becomes available"),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
+):
+    """
+    Get several pre-computed resources in one response. Cached ones are read
+    with a single multi-key cache read and embedded without re-encoding;
+    missing ones are computed and cached through the bounded job queue.
+    """
+    from src.services.batch import finish_batch, parse_descriptors, start_batch
+    from src.services.jobs import JobQueueFullError
+
+    try:
+        descriptors = parse_descriptors(resources)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await _check_cohort(cohort)
+
+    # Missing resources are admitted to the job queue before any output
+    try:
+        cached, jobs = await start_batch(descriptors, cohort)
+    except JobQueueFullError:
+        raise _queue_full()
+
+    def line(descriptor: str, text: str | None, error: str | None):
+        if error is not None:
+            return f'{{"resource": {json.dumps(descriptor)}, "error": {json.dumps(error)}}}'
+        return f'{{"resource": {json.dumps(descriptor)}, "data": {text}}}'
+
+    if stream:
+        async def lines():
+            for descriptor, text in cached:
+                yield line(descriptor, text, None) + "\n"
+            async for result in finish_batch(jobs, cohort):
+                yield line(*result) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    results = {descriptor: (text, None) for descriptor, text in cached}
+    results.update({descriptor: (text, error) async for descriptor, text, error in finish_batch(jobs, cohort)})
+    data = ", ".join(
+        f"{json.dumps(descriptor)}: {results[descriptor][0]}"
+        for descriptor in descriptors if results[descriptor][1] is None
+    )
+    errors = {descriptor: error for descriptor, (_, error) in results.items() if error is not None}
+    body = f'{{"cohort": {json.dumps(cohort)}, "results": {{{data}}}, "errors": {json.dumps(errors)}}}'
+    return Response(content=body, media_type="application/json")
+
+
+def _queue_full():
+    """503 with Retry-After for a computation the full job queue cannot admit."""
+    from src.services.jobs import RETRY_AFTER_SECONDS
+
+    return HTTPException(
+        status_code=503,
+        detail="Too many computations are running. Retry later.",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
+def _submit_job(submit, **kwargs):
+    """
+    Submit (or join) a background job with a job submit function.
+    Raises 503 with Retry-After when the job queue is full.
+    """
+    from src.services.jobs import JobQueueFullError
+
+    try:
+        return submit(**kwargs)
+    except JobQueueFullError:
+        raise _queue_full()
+
+
+def _result_gone(what: str):
+    """503 for a job result evicted from the cache before it could be read."""
+    from src.services.jobs import RETRY_AFTER_SECONDS
+
+    return HTTPException(
+        status_code=503,
+        detail=f"{what} was computed but is no longer cached. Retry later.",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
+def _submit_network_job(year_start: int, year_end: int, cohort: str = DEFAULT_COHORT):
+    """Submit (or join) the background job computing a hierarchical network."""
+    from src.services.jobs import submit_network_job
+
+    return _submit_job(submit_network_job, year_start=year_start, year_end=year_end, cohort=cohort)
+
+
+def _parse_parts(parts: str):
+    """Parse the comma-separated parts of a hierarchical network request."""
+    from src.services.network_sections import NETWORK_PARTS
+
+    part_list = [part.strip() for part in parts.split(",") if part.strip()]
+    if not part_list or any(part not in NETWORK_PARTS for part in part_list):
+        raise HTTPException(status_code=400, detail=f"parts must be a list of: {', '.join(NETWORK_PARTS)}")
+    return part_list
+
+
+async def _get_hierarchical_network(
+    year_start: int,
+    year_end: int,
+    cohort: str = DEFAULT_COHORT,
+    parts=None,
+    community: int | None = None,
+):
+    """
+    Get the hierarchical citation network for a year range, or only some
+    of its parts or one community's nodes and links.
+    Computes on-demand if not cached, through the bounded job queue.
+    """
+    from src.services.network_sections import NETWORK_PARTS, get_cached_network
+
+    async def read():
+        try:
+            return await get_cached_network(cache_key, parts or NETWORK_PARTS, community)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+    # Try to get cached data for this specific year range
+    cache_key = cohort_key(f"net:hierarchical-citation:{year_start}-{year_end}", cohort)
+    data = await read()
+
+    if not data:
+        print(f"Computing hierarchical network on-demand for {year_start}-{year_end} ({cohort})...")
+        job = _submit_network_job(year_start, year_end, cohort)
+        await job.done.wait()
+
+        if job.status == "failed":
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to compute network for {year_start}-{year_end} during '{job.stage}' stage: {job.error}"
+            )
+
+        data = await read()
+        if not data:
+            raise _result_gone(f"The network for {year_start}-{year_end}")
+        print(f"  Cached {year_start}-{year_end} network ({data['total_communities']} communities)")
+
+    return data
+
+
+@router.post("/jobs/network", status_code=202)
+async def create_network_job(
+    response: Response,
+    year_start: int = Query(2018, ge=2013, le=2022, description="Start year (inclusive)"),
+    year_end: int = Query(2022, ge=2013, le=2022, description="End year (inclusive)"),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
+):
+    """
+    Start computing a hierarchical citation network in the background.
+    Poll the returned status_url; when done, fetch result_url.
+    """
+    if year_start > year_end:
+        raise HTTPException(status_code=400, detail="year_start must be <= year_end")
+    await _check_cohort(cohort)
+
+    result_url = (
+        f"{router.prefix}/network/hierarchical-citation"
+        f"?year_start={year_start}&year_end={year_end}{_cohort_query(cohort)}"
+    )
+    if await cache_exists(cohort_key(f"net:hierarchical-citation:{year_start}-{year_end}", cohort)):
+        response.status_code = 200
+        return {"id": None, "status": "done", "progress": 1.0, "result_url": result_url}
+
+    job = _submit_network_job(year_start, year_end, cohort)
+    response.headers["Location"] = job.status_url
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get the status and stage progress of a background job."""
+    from src.services.jobs import job_manager
+
+    job = await job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
 @router.get("/network/hierarchical-citation")
 async def get_hierarchical_citation_network(
     year_start: int = Query(2018, ge=2013, le=2022, description="Start year (inclusive)"),
-    year_end: int = Query(2022, ge=2013, le=2022, description="End year (inclusive)")
+    year_end: int = Query(2022, ge=2013, le=2022, description="End year (inclusive)"),
+    layout: str = Query("none", description="Set to 'force' to include server-computed x/y coordinates"),
+    parts: str = Query("summary,nodes,links", description=PARTS_DESCRIPTION),
+    community: int | None = Query(None, ge=0, description="Only this community's nodes and the links leaving it"),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
 ):
     """
     Get hierarchical citation network for edge bundling visualization.
-    Supports filtering by year range for better scalability.
+    Supports filtering by year range for better scalability, and reading
+    only some parts or one community, which loads only those cached sections.
     Computes on-demand if not cached.
     """
     if year_start > year_end:
         raise HTTPException(status_code=400, detail="year_start must be <= year_end")
-    
-    # Try to get cached data for this specific year range
-    cache_key = f"net:hierarchical-citation:{year_start}-{year_end}"
+    if layout not in LAYOUT_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"layout must be one of: {', '.join(LAYOUT_OPTIONS)}")
+    part_list = _parse_parts(parts)
+    # The layout is computed from, and cached for, the whole network only
+    if layout == "force" and (community is not None or not {"nodes", "links"} <= set(part_list)):
+        raise HTTPException(status_code=400, detail="layout=force needs all nodes and links of the network")
+    await _check_cohort(cohort)
+
+    data = await _get_hierarchical_network(year_start, year_end, cohort, part_list, community)
+
+    if layout == "force":
+        data = await _attach_layout(
+            data, cohort_key(f"net:layout:hierarchical-citation:{year_start}-{year_end}", cohort)
+        )
+
+    return data
+
+
+@router.get("/network/hierarchical-citation/bundling")
+async def get_hierarchical_bundling_geometry(
+    year_start: int = Query(2018, ge=2013, le=2022, description="Start year (inclusive)"),
+    year_end: int = Query(2022, ge=2013, le=2022, description="End year (inclusive)"),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
+):
+    """
+    Get pre-computed radial node angles and bundled link control points
+    for the hierarchical citation network of a year range.
+    Computes on-demand if not cached.
+    """
+    if year_start > year_end:
+        raise HTTPException(status_code=400, detail="year_start must be <= year_end")
+    await _check_cohort(cohort)
+
+    cache_key = cohort_key(f"net:bundling:hierarchical-citation:{year_start}-{year_end}", cohort)
     data = await get_cached_json(cache_key)
-    
+
     if not data:
-        # Compute on-demand if not cached
-        from src.services.processing import compute_hierarchical_citation_network
+        from src.services.layout import edge_bundling_geometry
         from src.cache import cache_json
-        
-        try:
-            print(f"Computing hierarchical network on-demand for {year_start}-{year_end}...")
-            data = await compute_hierarchical_citation_network(year_start, year_end)
-            
-            # Cache it for future use
-            await cache_json(cache_key, data)
-            print(f"  Cached {len(data['nodes'])} nodes, {len(data['links'])} links")
-            
-        except Exception as e:
+
+        network = await _get_hierarchical_network(year_start, year_end, cohort)
+        print(f"Computing edge bundling on-demand for {year_start}-{year_end}...")
+        data = await asyncio.to_thread(edge_bundling_geometry, network)
+        await cache_json(cache_key, data, ttl=CACHE_TTL_SECONDS)
+
+    return data
+
+
+@router.get("/metrics/top")
+async def get_top_papers_by_metric(
+    metric: str = Query("pagerank", description="One of: pagerank, hub, authority, betweenness"),
+    year_start: int = Query(2018, ge=2013, le=2022, description="Start year (inclusive)"),
+    year_end: int = Query(2022, ge=2013, le=2022, description="End year (inclusive)"),
+    limit: int = Query(20, ge=1, le=200, description="Number of papers to return"),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
+):
+    """
+    Get the highest-ranked papers for a centrality metric in a year range.
+    Computes on-demand if not cached.
+    """
+    from src.services.centrality import METRIC_NAMES
+
+    if metric not in METRIC_NAMES:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(METRIC_NAMES)}")
+    if year_start > year_end:
+        raise HTTPException(status_code=400, detail="year_start must be <= year_end")
+    await _check_cohort(cohort)
+
+    cache_key = cohort_key(f"data:metrics:{year_start}-{year_end}", cohort)
+    data = await get_cached_json(cache_key)
+
+    if not data:
+        from src.services.jobs import job_manager
+        from src.services.processing import METRICS_STAGES, compute_centrality_metrics
+
+        print(f"Computing centrality metrics on-demand for {year_start}-{year_end}...")
+        job = _submit_job(
+            job_manager.submit,
+            cache_key=cache_key,
+            kind="metrics",
+            params={"year_start": year_start, "year_end": year_end, "cohort": cohort},
+            stages=METRICS_STAGES,
+            result_url=f"{router.prefix}/metrics/top"
+                       f"?year_start={year_start}&year_end={year_end}{_cohort_query(cohort)}",
+            compute=lambda progress: compute_centrality_metrics(year_start, year_end, cohort, progress=progress),
+            result_ttl=CACHE_TTL_SECONDS,
+        )
+        await job.done.wait()
+
+        if job.status == "failed":
             raise HTTPException(
-                status_code=500, 
-                detail=f"Failed to compute network for {year_start}-{year_end}: {str(e)}"
+                status_code=500,
+                detail=f"Failed to compute metrics for {year_start}-{year_end}: {job.error}"
             )
-    
+        data = await get_cached_json(cache_key)
+        if not data:
+            raise _result_gone(f"The metrics table for {year_start}-{year_end}")
+
+    return {
+        "metric": metric,
+        "year_range": data["year_range"],
+        "papers": data["top"][metric][:limit],
+    }
+
+
+@router.get("/authors/{author_id}")
+async def get_author(author_id: int, cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION)):
+    """Get an author's publication, citation and collaboration summary."""
+    from src.services.authors import author_profile, get_author_index
+
+    await _check_cohort(cohort)
+    profile = author_profile(await get_author_index(cohort), author_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Author {author_id} not found")
+    return profile
+
+
+@router.get("/authors/{author_id}/collaborators")
+async def get_author_collaborators(
+    author_id: int,
+    year_start: int = Query(2013, ge=2013, le=2022, description="Start year (inclusive)"),
+    year_end: int = Query(2022, ge=2013, le=2022, description="End year (inclusive)"),
+    limit: int = Query(20, ge=1, le=200, description="Number of collaborators to return"),
+    cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION),
+):
+    """Get an author's co-authors in a year range, ranked by shared papers."""
+    from src.services.authors import get_author_index, top_collaborators
+
+    if year_start > year_end:
+        raise HTTPException(status_code=400, detail="year_start must be <= year_end")
+    await _check_cohort(cohort)
+    data = top_collaborators(await get_author_index(cohort), author_id, year_start, year_end, limit)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"Author {author_id} not found")
     return data
 
 
 @router.get("/network/hierarchical-citation/available-ranges")
-async def get_available_year_ranges():
-    """Get list of available pre-cached year ranges for hierarchical citation network."""
+async def get_available_year_ranges(cohort: str = Query(DEFAULT_COHORT, description=COHORT_DESCRIPTION)):
+    """Get the year ranges whose hierarchical citation network is currently cached."""
+    from src.cache import scan_keys
+    from src.services.warming import parse_range_key
+
+    await _check_cohort(cohort)
+    prefix = cohort_key("", cohort)
+    cached = sorted(
+        year_range
+        for year_range in (
+            parse_range_key(key.removeprefix(prefix))
+            for key in await scan_keys(cohort_key("net:hierarchical-citation:????-????", cohort))
+        )
+        if year_range is not None
+    )
+
     # Individual years (small networks)
     individual_years = [
-        {"start": year, "end": year, "label": f"{year}", "type": "year"}
-        for year in [2018, 2019, 2020, 2021, 2022]
+        {"start": start, "end": end, "label": f"{start}", "type": "year"}
+        for start, end in cached if start == end
     ]
     
     # Multi-year ranges (larger networks)
     multi_year_ranges = [
-        {"start": 2018, "end": 2019, "label": "2018-2019", "type": "range"},
-        {"start": 2019, "end": 2020, "label": "2019-2020", "type": "range"},
-        {"start": 2020, "end": 2021, "label": "2020-2021", "type": "range"},
-        {"start": 2021, "end": 2022, "label": "2021-2022", "type": "range"},
-        {"start": 2018, "end": 2020, "label": "2018-2020 (3 Years)", "type": "range"},
-        {"start": 2020, "end": 2022, "label": "2020-2022 (3 Years)", "type": "range"},
-        {"start": 2018, "end": 2022, "label": "2018-2022 (Full 5 Years)", "type": "range"},
+        {
+            "start": start,
+            "end": end,
+            "label": f"{start}-{end} ({end - start + 1} Years)" if end - start >= 2 else f"{start}-{end}",
+            "type": "range",
+        }
+        for start, end in sorted(cached, key=lambda r: (r[1] - r[0], r[0])) if start != end
     ]
     
     return {
@@ -125,8 +681,10 @@ async def get_scalability_solution():
             "constructs the complete graph but returns only 'core' nodes meeting significance thresholds "
             "(citation count > 5 OR in-degree > 1 for citations; collaboration degree > 2 for authors). "
             "This reduces payload size by ~60% while preserving the network's essential structure and "
-            "communities. Nodes are then positioned using force-directed layout with fine-tuned parameters "
-            "to minimize edge crossings and reveal community clusters. The result is a performant, "
-            "readable visualization that users can interactively explore on any modern browser."
+            "communities. Nodes are positioned with a force-directed layout that the backend pre-computes "
+            "(Fruchterman-Reingold with grid-approximated repulsion, seeded by community so it is "
+            "deterministic) and caches next to each network, so clients can render coordinates "
+            "instantly instead of simulating thousands of nodes in the browser. The result is a "
+            "performant, readable visualization that users can interactively explore on any modern browser."
         )
     }
@@ -1,11 +1,37 @@
 import json
+import os
+import time
+import uuid
 from redis.asyncio import Redis, ConnectionPool
+from src.cache_backends import (
+    CacheBackend,
+    DiskBackend,
+    MemoryBackend,
+    RedisBackend,
+)
+from src.telemetry import record_cache_lookups
+from src.timing import span
 
-REDIS_HOST = "localhost"
-REDIS_PORT = 6379
-REDIS_DB = 0
+REDIS_HOST = os.environ.get("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.environ.get("REDIS_PORT", 6379))
+REDIS_DB = int(os.environ.get("REDIS_DB", 0))
+
+# Storage behind the cache helpers: "redis", "memory" (in-process) or
+# "disk" (memory-mapped SQLite file at CACHE_DISK_PATH)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "redis")
+CACHE_DISK_PATH = os.environ.get("CACHE_DISK_PATH", "data/cache.db")
+
+# Per-range keys (networks, layouts, metrics) are cached with a TTL, which
+# also makes them candidates for LFU eviction once the backend reaches its memory
+# budget. Core keys written by the pre-cache script without a TTL are never evicted.
+CACHE_TTL_SECONDS = int(os.environ.get("CACHE_TTL_SECONDS", 7 * 24 * 3600))
+CACHE_MAX_MEMORY = os.environ.get("CACHE_MAX_MEMORY", "1gb")
+CACHE_EVICTION_POLICY = "volatile-lfu"
+# Sections of a replaced sectioned value stay readable this long
+SECTION_GRACE_SECONDS = 60
 
 _pool = None
+_backend = None
 
 
 async def get_redis_pool():
@@ -35,16 +61,232 @@ async def close_redis_pool():
         _pool = None
 
 
-async def cache_json(key: str, data: dict | list):
-    """Cache data as JSON string."""
-    redis = await get_redis()
-    await redis.set(key, json.dumps(data))
-    await redis.close()
+async def get_cache_backend() -> CacheBackend:
+    """Get or create the configured cache backend."""
+    global _backend
+    if _backend is None:
+        if CACHE_BACKEND == "redis":
+            _backend = RedisBackend(await get_redis())
+        elif CACHE_BACKEND == "memory":
+            _backend = MemoryBackend()
+        elif CACHE_BACKEND == "disk":
+            _backend = DiskBackend(CACHE_DISK_PATH)
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND {CACHE_BACKEND!r}; use redis, memory or disk")
+    return _backend
+
+
+async def close_cache_backend():
+    """Close the cache backend (and the Redis pool if one was opened)."""
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
+    await close_redis_pool()
+
+
+async def configure_cache_limits():
+    """
+    Apply the memory budget and eviction policy to an in-process backend.
+    On Redis this only checks the server's policy; set it with
+    configure_cache_server.
+    """
+    backend = await get_cache_backend()
+    await backend.configure(CACHE_MAX_MEMORY, CACHE_EVICTION_POLICY)
+
+
+async def configure_cache_server():
+    """Set the memory budget and eviction policy on the Redis server (a deploy step)."""
+    backend = await get_cache_backend()
+    await backend.configure_server(CACHE_MAX_MEMORY, CACHE_EVICTION_POLICY)
+
+
+async def cache_json(key: str, data: dict | list, ttl: int | None = None):
+    """Cache data as JSON string, optionally expiring after `ttl` seconds."""
+    backend = await get_cache_backend()
+    with span("cache.encode"):
+        value = json.dumps(data)
+    with span("cache.set"):
+        await backend.set(key, value, ttl)
+
+
+async def cache_exists(key: str):
+    """Check whether a key is cached without fetching its value."""
+    backend = await get_cache_backend()
+    (exists,) = await backend.exists_many([key])
+    return exists
 
 
 async def get_cached_json(key: str):
-    """Get cached JSON data."""
-    redis = await get_redis()
-    data = await redis.get(key)
-    await redis.close()
-    return json.loads(data) if data else None
+    """Get cached JSON data, counting the read for access statistics."""
+    backend = await get_cache_backend()
+    with span("cache.get"):
+        (data,) = await backend.get_many([key], track=True)
+    record_cache_lookups([key], [data])
+    with span("cache.decode"):
+        return json.loads(data) if data else None
+
+
+async def get_cached_json_many(keys: list[str]):
+    """Get several cached JSON values in one round trip (MGET on Redis)."""
+    values = await get_cached_text_many(keys)
+    with span("cache.decode"):
+        return [json.loads(value) if value else None for value in values]
+
+
+async def get_cached_text_many(keys: list[str]):
+    """
+    Get several cached values as JSON text in one round trip, without
+    decoding them (for responses that embed the text as is).
+    """
+    if not keys:
+        return []
+    backend = await get_cache_backend()
+    with span("cache.get"):
+        values = await backend.get_many(keys, track=True)
+    record_cache_lookups(keys, values)
+    return values
+
+
+def _section_key(key: str, head: dict, name: str):
+    """Cache key of a section of the value whose head is `head`."""
+    generation = head.get("generation")
+    # Heads written before sections were versioned have no generation
+    return f"{key}:{generation}:{name}" if generation else f"{key}:{name}"
+
+
+async def cache_json_sections(key: str, head: dict, sections: dict[str, dict | list], ttl: int | None = None):
+    """
+    Cache a large value as separately readable JSON sections under a new
+    generation, "<key>:<generation>:<name>", then swap in `head` at `key`
+    with the generation and list of section names. A reader that finds a
+    head reads that head's sections, so it never mixes sections of two
+    values. Sections of the replaced value expire after
+    SECTION_GRACE_SECONDS, long enough for reads already under way.
+    """
+    backend = await get_cache_backend()
+    (old_head,) = await backend.get_many([key])
+    head = {**head, "generation": uuid.uuid4().hex[:12], "sections": list(sections)}
+    with span("cache.encode"):
+        values = {_section_key(key, head, name): json.dumps(value) for name, value in sections.items()}
+        values[key] = json.dumps(head)
+    with span("cache.set"):
+        await backend.set_many(values, ttl)
+    if old_head:
+        old_head = json.loads(old_head)
+        stale = [_section_key(key, old_head, name) for name in old_head.get("sections", [])]
+        await backend.expire_many(stale, SECTION_GRACE_SECONDS)
+
+
+async def get_cached_sections(key: str, head: dict, names: list[str]):
+    """
+    Get sections of a value cached with cache_json_sections in one round
+    trip (None for missing ones). `head` is the value's head, read with
+    get_cached_json; only that read counts for access statistics.
+    """
+    if not names:
+        return []
+    backend = await get_cache_backend()
+    with span("cache.get"):
+        values = await backend.get_many([_section_key(key, head, name) for name in names])
+    with span("cache.decode"):
+        return [json.loads(value) if value else None for value in values]
+
+
+async def refresh_sections_ttl(key: str, ttl: int = CACHE_TTL_SECONDS):
+    """Extend the expiry of a sectioned value. Returns False if the head or any section is gone."""
+    backend = await get_cache_backend()
+    (head,) = await backend.get_many([key])
+    if not head:
+        return False
+    head = json.loads(head)
+    keys = [key] + [_section_key(key, head, name) for name in head.get("sections", [])]
+    return all(await backend.expire_many(keys, ttl))
+
+
+async def delete_keys(keys: list[str]):
+    """Delete cached keys; returns how many existed."""
+    backend = await get_cache_backend()
+    return await backend.delete(keys)
+
+
+async def cache_exists_many(keys: list[str]):
+    """Check which of several keys are cached, in one pipelined round trip."""
+    if not keys:
+        return []
+    backend = await get_cache_backend()
+    return await backend.exists_many(keys)
+
+
+async def access_counts(keys: list[str]):
+    """Read counts recorded for each key (0 if never read)."""
+    if not keys:
+        return []
+    backend = await get_cache_backend()
+    return await backend.access_counts(keys)
+
+
+async def acquire_lock(name: str, ttl: int):
+    """
+    Take a cross-process lock held for at most `ttl` seconds. Returns the
+    holder's token for release_lock, or None if held elsewhere.
+
+    The lock key itself has no TTL, so volatile-lfu eviction never drops a
+    held lock; the value is the lease deadline plus a random token, and a
+    lock whose lease has run out is taken over with a compare-and-set.
+    """
+    backend = await get_cache_backend()
+    key = f"lock:{name}"
+    token = f"{time.time() + ttl:.6f}:{uuid.uuid4().hex[:12]}"
+    if await backend.set_if_absent(key, token):
+        return token
+    (current,) = await backend.get_many([key])
+    if current is None or _lease_deadline(current) > time.time():
+        return None
+    return token if await backend.compare_and_set(key, current, token) else None
+
+
+def _lease_deadline(value: str):
+    """Deadline of a lock value written by acquire_lock."""
+    return float(value.partition(":")[0])
+
+
+async def lock_held(name: str):
+    """True if a lock taken with acquire_lock is held and its lease has not run out."""
+    backend = await get_cache_backend()
+    (current,) = await backend.get_many([f"lock:{name}"])
+    return current is not None and _lease_deadline(current) > time.time()
+
+
+async def release_lock(name: str, token: str):
+    """
+    Release a lock taken with acquire_lock, unless its lease ran out and
+    another process has taken it over since.
+    """
+    backend = await get_cache_backend()
+    await backend.delete_if_equal(f"lock:{name}", token)
+
+
+async def scan_keys(pattern: str):
+    """List cached keys matching a glob pattern."""
+    backend = await get_cache_backend()
+    return await backend.scan(pattern)
+
+
+async def refresh_ttl(key: str, ttl: int = CACHE_TTL_SECONDS):
+    """Extend the expiry of a cached key. Returns False if the key is gone."""
+    backend = await get_cache_backend()
+    return await backend.expire(key, ttl)
+
+
+async def top_accessed_keys(prefix: str, limit: int | None):
+    """Most-read keys starting with `prefix`, most frequent first (all of them if `limit` is None)."""
+    backend = await get_cache_backend()
+    ranked = await backend.ranked_access()
+    return [(key, score) for key, score in ranked if key.startswith(prefix)][:limit]
+
+
+async def decay_access_stats(factor: float):
+    """Scale all access counts so old popularity fades over time."""
+    backend = await get_cache_backend()
+    await backend.decay_access(factor, floor=0.5)
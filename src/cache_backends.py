@@ -0,0 +1,515 @@
+import asyncio
+import fnmatch
+import time
+from abc import ABC, abstractmethod
+
+import aiosqlite
+from redis.asyncio import Redis
+
+# Sorted set (or table) of read counts per cache key
+ACCESS_STATS_KEY = "stats:key-hits"
+
+
+def parse_size(size: str):
+    """Parse a Redis-style memory size such as "512mb" or "1gb" into bytes."""
+    units = {"kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3, "b": 1}
+    size = size.strip().lower()
+    for suffix, factor in units.items():
+        if size.endswith(suffix):
+            return int(float(size[: -len(suffix)]) * factor)
+    return int(size)
+
+
+class CacheBackend(ABC):
+    """
+    Storage interface behind the JSON cache helpers in src.cache.
+
+    Values are strings. A ttl of None means the key never expires; keys
+    with a ttl are the only ones evicted when the memory budget is exceeded,
+    least-frequently-read first. Reads made with track=True are counted in
+    the access statistics.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def get_many(self, keys: list[str], track: bool = False) -> list[str | None]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: int | None = None):
+        ...
+
+    async def set_many(self, values: dict[str, str], ttl: int | None = None):
+        """Set several keys, in order, with the same ttl."""
+        for key, value in values.items():
+            await self.set(key, value, ttl)
+
+    @abstractmethod
+    async def set_if_absent(self, key: str, value: str, ttl: int | None = None) -> bool:
+        ...
+
+    @abstractmethod
+    async def compare_and_set(self, key: str, expected: str, value: str) -> bool:
+        """Replace the value of `key` only if it is still `expected`, keeping no ttl."""
+
+    @abstractmethod
+    async def delete(self, keys: list[str]) -> int:
+        ...
+
+    @abstractmethod
+    async def delete_if_equal(self, key: str, expected: str) -> bool:
+        """Delete `key` only if its value is still `expected`."""
+
+    @abstractmethod
+    async def exists_many(self, keys: list[str]) -> list[bool]:
+        ...
+
+    @abstractmethod
+    async def expire(self, key: str, ttl: int) -> bool:
+        ...
+
+    async def expire_many(self, keys: list[str], ttl: int) -> list[bool]:
+        return [await self.expire(key, ttl) for key in keys]
+
+    @abstractmethod
+    async def scan(self, pattern: str) -> list[str]:
+        ...
+
+    @abstractmethod
+    async def access_counts(self, keys: list[str]) -> list[float]:
+        ...
+
+    @abstractmethod
+    async def ranked_access(self) -> list[tuple[str, float]]:
+        ...
+
+    @abstractmethod
+    async def decay_access(self, factor: float, floor: float):
+        ...
+
+    async def configure(self, max_memory: str, policy: str):
+        """Apply a memory budget; only keys with a ttl are evicted to meet it."""
+
+    async def configure_server(self, max_memory: str, policy: str):
+        """Apply the memory budget to a shared server (a deploy step, not run by workers)."""
+        await self.configure(max_memory, policy)
+
+    async def close(self):
+        """Release connections or file handles."""
+
+
+class RedisBackend(CacheBackend):
+    """Redis server backend; one client shared over the connection pool."""
+
+    name = "redis"
+
+    COMPARE_AND_SET = """
+    if redis.call("GET", KEYS[1]) == ARGV[1] then
+        redis.call("SET", KEYS[1], ARGV[2])
+        return 1
+    end
+    return 0
+    """
+
+    DELETE_IF_EQUAL = """
+    if redis.call("GET", KEYS[1]) == ARGV[1] then
+        return redis.call("DEL", KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, client: Redis):
+        self.redis = client
+
+    async def get_many(self, keys, track=False):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.mget(keys)
+            if track:
+                for key in keys:
+                    pipe.zincrby(ACCESS_STATS_KEY, 1, key)
+            values, *_ = await pipe.execute()
+        return values
+
+    async def set(self, key, value, ttl=None):
+        await self.redis.set(key, value, ex=ttl)
+
+    async def set_many(self, values, ttl=None):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, value, ex=ttl)
+            await pipe.execute()
+
+    async def set_if_absent(self, key, value, ttl=None):
+        return bool(await self.redis.set(key, value, nx=True, ex=ttl))
+
+    async def compare_and_set(self, key, expected, value):
+        return bool(await self.redis.eval(self.COMPARE_AND_SET, 1, key, expected, value))
+
+    async def delete(self, keys):
+        return await self.redis.delete(*keys) if keys else 0
+
+    async def delete_if_equal(self, key, expected):
+        return bool(await self.redis.eval(self.DELETE_IF_EQUAL, 1, key, expected))
+
+    async def exists_many(self, keys):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.exists(key)
+            results = await pipe.execute()
+        return [bool(result) for result in results]
+
+    async def expire(self, key, ttl):
+        return bool(await self.redis.expire(key, ttl))
+
+    async def expire_many(self, keys, ttl):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.expire(key, ttl)
+            results = await pipe.execute()
+        return [bool(result) for result in results]
+
+    async def scan(self, pattern):
+        return [key async for key in self.redis.scan_iter(match=pattern, count=500)]
+
+    async def access_counts(self, keys):
+        scores = await self.redis.zmscore(ACCESS_STATS_KEY, keys)
+        return [score or 0.0 for score in scores]
+
+    async def ranked_access(self):
+        return await self.redis.zrevrange(ACCESS_STATS_KEY, 0, -1, withscores=True)
+
+    async def decay_access(self, factor, floor):
+        await self.redis.zunionstore(ACCESS_STATS_KEY, {ACCESS_STATS_KEY: factor})
+        await self.redis.zremrangebyscore(ACCESS_STATS_KEY, "-inf", floor)
+
+    async def configure(self, max_memory, policy):
+        # Server settings are shared by every worker and are applied once at
+        # deploy time (configure_server); here only report a mismatch
+        try:
+            current = (await self.redis.config_get("maxmemory-policy")).get("maxmemory-policy")
+        except Exception as e:
+            # Managed Redis services often disallow CONFIG commands
+            print(f"Could not read Redis eviction policy: {e}")
+            return
+        if current != policy:
+            print(f"Redis eviction policy is {current!r}, expected {policy!r}; "
+                  "run src/scripts/configure_redis.py")
+
+    async def configure_server(self, max_memory, policy):
+        await self.redis.config_set("maxmemory", max_memory)
+        await self.redis.config_set("maxmemory-policy", policy)
+
+    async def close(self):
+        await self.redis.close()
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process dictionary backend. Nothing is shared between worker
+    processes, so it suits tests, benchmarks and single-worker deployments.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._values: dict[str, str] = {}
+        self._expires: dict[str, float] = {}
+        self._hits: dict[str, float] = {}
+        self._size = 0
+        self._max_bytes = None
+
+    def _alive(self, key):
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.time():
+            self._remove(key)
+        return key in self._values
+
+    def _remove(self, key):
+        value = self._values.pop(key, None)
+        self._expires.pop(key, None)
+        if value is not None:
+            self._size -= len(value)
+        return value is not None
+
+    def _evict(self):
+        if self._max_bytes is None or self._size <= self._max_bytes:
+            return
+        candidates = sorted(self._expires, key=lambda key: self._hits.get(key, 0.0))
+        for key in candidates:
+            if self._size <= self._max_bytes:
+                break
+            self._remove(key)
+
+    async def get_many(self, keys, track=False):
+        if track:
+            for key in keys:
+                self._hits[key] = self._hits.get(key, 0.0) + 1
+        return [self._values[key] if self._alive(key) else None for key in keys]
+
+    async def set(self, key, value, ttl=None):
+        self._remove(key)
+        self._values[key] = value
+        self._size += len(value)
+        if ttl is not None:
+            self._expires[key] = time.time() + ttl
+        self._evict()
+
+    async def set_if_absent(self, key, value, ttl=None):
+        if self._alive(key):
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def compare_and_set(self, key, expected, value):
+        if not self._alive(key) or self._values[key] != expected:
+            return False
+        await self.set(key, value)
+        return True
+
+    async def delete(self, keys):
+        return sum(self._remove(key) for key in keys)
+
+    async def delete_if_equal(self, key, expected):
+        if not self._alive(key) or self._values[key] != expected:
+            return False
+        return self._remove(key)
+
+    async def exists_many(self, keys):
+        return [self._alive(key) for key in keys]
+
+    async def expire(self, key, ttl):
+        if not self._alive(key):
+            return False
+        self._expires[key] = time.time() + ttl
+        return True
+
+    async def scan(self, pattern):
+        return [key for key in list(self._values) if fnmatch.fnmatchcase(key, pattern) and self._alive(key)]
+
+    async def access_counts(self, keys):
+        return [self._hits.get(key, 0.0) for key in keys]
+
+    async def ranked_access(self):
+        return sorted(self._hits.items(), key=lambda item: -item[1])
+
+    async def decay_access(self, factor, floor):
+        self._hits = {key: hits * factor for key, hits in self._hits.items() if hits * factor > floor}
+
+    async def configure(self, max_memory, policy):
+        self._max_bytes = parse_size(max_memory)
+        self._evict()
+
+
+class DiskBackend(CacheBackend):
+    """
+    SQLite file backend with memory-mapped reads. The file can be shared by
+    all worker processes on one host and survives restarts.
+    """
+
+    name = "disk"
+
+    MMAP_SIZE = 1024 ** 3
+    # Read counts are summed in memory and written at most this often, so a
+    # tracked read costs no write transaction
+    ACCESS_FLUSH_SECONDS = 5.0
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = None
+        self._lock = asyncio.Lock()
+        self._max_bytes = None
+        self._pending_hits: dict[str, float] = {}
+        self._flushed_at = time.monotonic()
+
+    async def _conn(self):
+        if self._db is None:
+            self._db = await aiosqlite.connect(self.path)
+            await self._db.executescript(
+                f"""
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA mmap_size={self.MMAP_SIZE};
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, expires_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS access (key TEXT PRIMARY KEY, hits REAL NOT NULL);
+                """
+            )
+        return self._db
+
+    async def _live_rows(self, keys, columns):
+        db = await self._conn()
+        placeholders = ",".join("?" * len(keys))
+        cursor = await db.execute(
+            f"SELECT key, {columns} FROM cache WHERE key IN ({placeholders}) "
+            "AND (expires_at IS NULL OR expires_at > ?)",
+            (*keys, time.time()),
+        )
+        return {row[0]: row[1:] for row in await cursor.fetchall()}
+
+    async def get_many(self, keys, track=False):
+        if not keys:
+            return []
+        rows = await self._live_rows(keys, "value")
+        if track:
+            for key in keys:
+                self._pending_hits[key] = self._pending_hits.get(key, 0.0) + 1
+            if time.monotonic() - self._flushed_at >= self.ACCESS_FLUSH_SECONDS:
+                await self._flush_access()
+        return [rows[key][0] if key in rows else None for key in keys]
+
+    async def _flush_access(self):
+        """Add the read counts buffered since the last flush to the access table."""
+        self._flushed_at = time.monotonic()
+        if not self._pending_hits:
+            return
+        pending, self._pending_hits = self._pending_hits, {}
+        db = await self._conn()
+        async with self._lock:
+            await db.executemany(
+                "INSERT INTO access (key, hits) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET hits = hits + excluded.hits",
+                list(pending.items()),
+            )
+            await db.commit()
+
+    async def set(self, key, value, ttl=None):
+        db = await self._conn()
+        expires_at = time.time() + ttl if ttl is not None else None
+        async with self._lock:
+            await db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), expires_at),
+            )
+            await db.commit()
+        await self._evict()
+
+    async def set_if_absent(self, key, value, ttl=None):
+        db = await self._conn()
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        async with self._lock:
+            await db.execute("DELETE FROM cache WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = await db.execute(
+                "INSERT OR IGNORE INTO cache (key, value, size, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), expires_at),
+            )
+            await db.commit()
+        return cursor.rowcount == 1
+
+    async def compare_and_set(self, key, expected, value):
+        db = await self._conn()
+        now = time.time()
+        async with self._lock:
+            cursor = await db.execute(
+                "UPDATE cache SET value = ?, size = ?, expires_at = NULL "
+                "WHERE key = ? AND value = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (value, len(value), key, expected, now),
+            )
+            await db.commit()
+        return cursor.rowcount == 1
+
+    async def delete(self, keys):
+        if not keys:
+            return 0
+        db = await self._conn()
+        placeholders = ",".join("?" * len(keys))
+        async with self._lock:
+            cursor = await db.execute(f"DELETE FROM cache WHERE key IN ({placeholders})", keys)
+            await db.commit()
+        return cursor.rowcount
+
+    async def delete_if_equal(self, key, expected):
+        db = await self._conn()
+        async with self._lock:
+            cursor = await db.execute("DELETE FROM cache WHERE key = ? AND value = ?", (key, expected))
+            await db.commit()
+        return cursor.rowcount == 1
+
+    async def exists_many(self, keys):
+        if not keys:
+            return []
+        rows = await self._live_rows(keys, "1")
+        return [key in rows for key in keys]
+
+    async def expire(self, key, ttl):
+        db = await self._conn()
+        now = time.time()
+        async with self._lock:
+            cursor = await db.execute(
+                "UPDATE cache SET expires_at = ? WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (now + ttl, key, now),
+            )
+            await db.commit()
+        return cursor.rowcount == 1
+
+    async def scan(self, pattern):
+        db = await self._conn()
+        cursor = await db.execute(
+            "SELECT key FROM cache WHERE key GLOB ? AND (expires_at IS NULL OR expires_at > ?)",
+            (pattern, time.time()),
+        )
+        return [row[0] for row in await cursor.fetchall()]
+
+    async def access_counts(self, keys):
+        if not keys:
+            return []
+        await self._flush_access()
+        db = await self._conn()
+        placeholders = ",".join("?" * len(keys))
+        cursor = await db.execute(f"SELECT key, hits FROM access WHERE key IN ({placeholders})", keys)
+        hits = dict(await cursor.fetchall())
+        return [hits.get(key, 0.0) for key in keys]
+
+    async def ranked_access(self):
+        await self._flush_access()
+        db = await self._conn()
+        cursor = await db.execute("SELECT key, hits FROM access ORDER BY hits DESC")
+        return [tuple(row) for row in await cursor.fetchall()]
+
+    async def decay_access(self, factor, floor):
+        await self._flush_access()
+        db = await self._conn()
+        async with self._lock:
+            await db.execute("UPDATE access SET hits = hits * ?", (factor,))
+            await db.execute("DELETE FROM access WHERE hits <= ?", (floor,))
+            await db.commit()
+
+    async def configure(self, max_memory, policy):
+        self._max_bytes = parse_size(max_memory)
+        await self._evict()
+
+    async def _evict(self):
+        """Drop expired keys, then least-read TTL'd keys until within budget."""
+        if self._max_bytes is None:
+            return
+        await self._flush_access()
+        db = await self._conn()
+        async with self._lock:
+            await db.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            cursor = await db.execute("SELECT COALESCE(SUM(size), 0) FROM cache")
+            (size,) = await cursor.fetchone()
+            if size > self._max_bytes:
+                cursor = await db.execute(
+                    """
+                    SELECT c.key, c.size FROM cache c
+                    LEFT JOIN access a ON a.key = c.key
+                    WHERE c.expires_at IS NOT NULL
+                    ORDER BY COALESCE(a.hits, 0)
+                    """
+                )
+                victims = []
+                for key, length in await cursor.fetchall():
+                    if size <= self._max_bytes:
+                        break
+                    victims.append((key,))
+                    size -= length
+                await db.executemany("DELETE FROM cache WHERE key = ?", victims)
+            await db.commit()
+
+    async def close(self):
+        if self._db is not None:
+            await self._flush_access()
+            await self._db.close()
+            self._db = None
@@ -0,0 +1,136 @@
+import os
+import re
+import time
+
+from src.database import get_db
+
+# A cohort is the set of papers extracted for some affiliations and fields
+# (preprocessing/extract_cohort.py). Papers, references and authors of all
+# cohorts share the database tables; paper_cohorts tags which papers belong
+# to which cohort, and cohort_affiliations / cohort_fields restrict author
+# and field rows to the cohort's own. A database built before cohorts
+# existed has none of these tables and holds only the default cohort.
+DEFAULT_COHORT = os.environ.get("DEFAULT_COHORT", "vt-cs")
+COHORT_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+COHORTS_REFRESH_SECONDS = 60
+
+_known = {"cohorts": None, "loaded_at": 0.0}
+
+
+def cohort_key(key: str, cohort: str):
+    """Cache key of `key` for a cohort; the default cohort keeps the plain key."""
+    if cohort == DEFAULT_COHORT:
+        return key
+    return f"cohort:{cohort}:{key}"
+
+
+def split_cohort_key(key: str):
+    """Inverse of cohort_key: (cohort, plain key) of a cache key."""
+    if key.startswith("cohort:"):
+        cohort, _, plain = key.removeprefix("cohort:").partition(":")
+        if plain:
+            return cohort, plain
+    return DEFAULT_COHORT, key
+
+
+class CohortFilter:
+    """
+    SQL conditions restricting rows to one cohort. Each method returns a
+    fragment starting with " AND" and its parameters; both are empty when
+    the database has no cohort tables.
+    """
+
+    def __init__(self, cohort: str, enabled: bool):
+        self.cohort = cohort
+        self.enabled = enabled
+
+    def _condition(self, sql: str):
+        if not self.enabled:
+            return "", ()
+        return f" AND {sql}", (self.cohort,)
+
+    # Correlated EXISTS is one primary key lookup per row; an IN (subquery)
+    # list lets SQLite probe a join index with every list entry instead
+    def papers(self, alias: str):
+        return self._condition(
+            f"EXISTS (SELECT 1 FROM paper_cohorts c WHERE c.cohort_id = ? AND c.paper_id = {alias}.paper_id)"
+        )
+
+    def authors(self, alias: str):
+        return self._condition(
+            "EXISTS (SELECT 1 FROM cohort_affiliations c "
+            f"WHERE c.cohort_id = ? AND c.affiliation_id = {alias}.affiliation_id)"
+        )
+
+    def fields(self, alias: str):
+        return self._condition(
+            f"EXISTS (SELECT 1 FROM cohort_fields c WHERE c.cohort_id = ? AND c.field_id = {alias}.field_id)"
+        )
+
+
+async def _has_cohort_tables(db):
+    cursor = await db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'paper_cohorts'")
+    return await cursor.fetchone() is not None
+
+
+async def cohort_filter(db, cohort: str = DEFAULT_COHORT):
+    """Get the CohortFilter for a cohort on an open connection."""
+    return CohortFilter(cohort, await _has_cohort_tables(db))
+
+
+async def list_cohorts():
+    """Describe every cohort in the database (only the default one before any extraction)."""
+    db = await get_db()
+    try:
+        if not await _has_cohort_tables(db):
+            return [{"id": DEFAULT_COHORT, "name": DEFAULT_COHORT, "default": True}]
+
+        cursor = await db.execute(
+            """
+            SELECT c.cohort_id, c.name, c.year_start, c.year_end, c.created_at,
+                   (SELECT COUNT(*) FROM paper_cohorts pc WHERE pc.cohort_id = c.cohort_id) AS papers
+            FROM cohorts c
+            ORDER BY c.created_at
+            """
+        )
+        cohorts = [dict(row) for row in await cursor.fetchall()]
+        cursor = await db.execute("SELECT cohort_id, affiliation_id FROM cohort_affiliations")
+        affiliations = await cursor.fetchall()
+        cursor = await db.execute("SELECT cohort_id, field_id FROM cohort_fields")
+        fields = await cursor.fetchall()
+    finally:
+        await db.close()
+
+    return [
+        {
+            "id": cohort["cohort_id"],
+            "name": cohort["name"],
+            "default": cohort["cohort_id"] == DEFAULT_COHORT,
+            "year_range": {"start": cohort["year_start"], "end": cohort["year_end"]},
+            "papers": cohort["papers"],
+            "affiliation_ids": [row["affiliation_id"] for row in affiliations if row["cohort_id"] == cohort["cohort_id"]],
+            "field_ids": [row["field_id"] for row in fields if row["cohort_id"] == cohort["cohort_id"]],
+            "created_at": cohort["created_at"],
+        }
+        for cohort in cohorts
+    ]
+
+
+async def cohort_ids(refresh: bool = False):
+    """
+    Ids of every cohort, the default one first. The list is re-read every
+    COHORTS_REFRESH_SECONDS, or now with `refresh`.
+    """
+    if refresh or _known["cohorts"] is None or time.monotonic() - _known["loaded_at"] > COHORTS_REFRESH_SECONDS:
+        _known["cohorts"] = {entry["id"] for entry in await list_cohorts()}
+        _known["loaded_at"] = time.monotonic()
+    return [DEFAULT_COHORT] + sorted(_known["cohorts"] - {DEFAULT_COHORT})
+
+
+async def cohort_exists(cohort: str):
+    """True if `cohort` is known. The list is re-read every COHORTS_REFRESH_SECONDS."""
+    if cohort == DEFAULT_COHORT:
+        return True
+    if not COHORT_ID_PATTERN.match(cohort):
+        return False
+    return cohort in await cohort_ids(refresh=cohort not in (_known["cohorts"] or ()))
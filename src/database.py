@@ -1,6 +1,8 @@
+import os
+
 import aiosqlite
 
-DB_PATH = "data/sciscinet_vt_cs_2013_2022.db"
+DB_PATH = os.environ.get("DB_PATH", "data/sciscinet_vt_cs_2013_2022.db")
 
 
 async def get_db():
@@ -1,22 +1,51 @@
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.routes import router
-from src.cache import get_redis_pool, close_redis_pool
+from src.cache import CACHE_BACKEND, configure_cache_limits, get_cache_backend, close_cache_backend
+from src.snapshot import SNAPSHOT_PATH, get_snapshot
+from src.telemetry import collect, flush, record_request, run_metrics_flusher
+from src.timing import PROFILE_TOKEN, SLOW_REQUEST_MS, RequestProfile, log_timing, server_timing, start_spans
+from src.services.warming import cache_readiness, heal_missing_keys, run_cache_warmer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle startup and shutdown events."""
-    # Startup: Initialize Redis pool
-    await get_redis_pool()
-    print("Redis connection pool initialized")
+    # Startup: Initialize cache backend
+    await get_cache_backend()
+    print(f"Cache backend initialized ({CACHE_BACKEND})")
+    await configure_cache_limits()
+
+    # Map the precomputed snapshot (shared with other workers via the page cache)
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        print(f"Snapshot mapped ({SNAPSHOT_PATH}, {snapshot.n_papers} papers)")
+    else:
+        print(f"No snapshot at {SNAPSHOT_PATH}; reading from SQLite")
+
+    # Rebuild any missing pre-computed keys without delaying startup,
+    # and keep the most-requested year ranges cached
+    background = [
+        asyncio.create_task(heal_missing_keys()),
+        asyncio.create_task(run_cache_warmer()),
+        asyncio.create_task(run_metrics_flusher()),
+    ]
 
     yield
 
-    # Shutdown: Close Redis pool
-    await close_redis_pool()
-    print("Redis connection pool closed")
+    # Shutdown: Stop background tasks and close cache backend
+    for task in background:
+        task.cancel()
+    for task in background:
+        with suppress(asyncio.CancelledError):
+            await task
+    flush()
+    await close_cache_backend()
+    print("Cache backend closed")
 
 
 app = FastAPI(
@@ -35,6 +64,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    """
+    Report per-stage spans in a Server-Timing header, log slow requests as
+    JSON lines, and capture a cProfile when the X-Profile header matches
+    PROFILE_TOKEN.
+    """
+    spans = start_spans()
+    profile = None
+    if PROFILE_TOKEN and request.headers.get("X-Profile") == PROFILE_TOKEN:
+        profile = RequestProfile.start()
+
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        if profile:
+            profile.stop()
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    route = request.scope.get("route")
+    size = response.headers.get("content-length")
+    record_request(
+        request.method, route.path if route else "unmatched", response.status_code,
+        duration_ms / 1000, int(size) if size else None,
+    )
+    response.headers["Server-Timing"] = server_timing(spans, duration_ms)
+    if profile:
+        response.headers["X-Profile-File"] = profile.save(f"{request.method} {request.url.path}")
+    if duration_ms >= SLOW_REQUEST_MS or profile:
+        log_timing(
+            "request", duration_ms, spans,
+            method=request.method, path=request.url.path,
+            query=str(request.url.query), status=response.status_code,
+        )
+    return response
+
+
 # Include API routes
 app.include_router(router)
 
@@ -43,3 +111,27 @@ app.include_router(router)
 async def root():
     """Health check endpoint."""
     return {"status": "ok", "message": "SciSciNet Backend API"}
+
+
+@app.get("/live")
+async def live():
+    """Liveness endpoint: the process is up and serving, whatever the cache state."""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready(response: Response):
+    """
+    Readiness endpoint reporting how much of the pre-computed cache is warm.
+    Answers 503 until every required key (of every cohort) is cached.
+    """
+    readiness = await cache_readiness()
+    if readiness["status"] != "ready":
+        response.status_code = 503
+    return readiness
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics merged across all worker processes."""
+    return PlainTextResponse(await asyncio.to_thread(collect), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Build the memory-mapped snapshot (paper arrays, citation and author CSR,
+field bitsets) from the SQLite database.
+Run this after preprocessing and before starting the API server.
+"""
+import asyncio
+import time
+
+from src.snapshot import SNAPSHOT_PATH, Snapshot, build_snapshot_arrays, db_fingerprint, write_snapshot
+
+
+async def main():
+    print("Building snapshot...")
+    start = time.perf_counter()
+    fingerprint = db_fingerprint()
+    arrays = await build_snapshot_arrays()
+    size = write_snapshot(arrays, SNAPSHOT_PATH, fingerprint)
+
+    snapshot = Snapshot(SNAPSHOT_PATH)
+    print(f"  {snapshot.n_papers} papers, {len(snapshot.ref_indices)} references, "
+          f"{len(snapshot.author_ids)} authors, {len(snapshot.field_ids)} fields")
+    print(f"  Wrote {SNAPSHOT_PATH} ({size / 1024 ** 2:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
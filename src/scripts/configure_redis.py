@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Set the Redis memory budget (CACHE_MAX_MEMORY) and the volatile-lfu
+eviction policy on the server. Run this once per deployment, before
+starting the API server; the workers only check the policy.
+"""
+import asyncio
+
+from src.cache import CACHE_EVICTION_POLICY, CACHE_MAX_MEMORY, close_cache_backend, configure_cache_server
+
+
+async def main():
+    try:
+        await configure_cache_server()
+        print(f"Cache memory budget {CACHE_MAX_MEMORY} ({CACHE_EVICTION_POLICY})")
+    finally:
+        await close_cache_backend()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
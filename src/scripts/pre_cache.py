@@ -1,43 +1,54 @@
 #!/usr/bin/env python3
 """
-Pre-caching script to populate Redis with computed data.
+Pre-caching script to populate the cache (Redis by default) with computed data.
 Run this before starting the API server.
+
+Usage:
+    uv run python src/scripts/pre_cache.py                  # default cohort
+    uv run python src/scripts/pre_cache.py --cohort mit-cs  # a cohort added by extract_cohort.py
 """
+import argparse
 import asyncio
-from src.cache import get_redis, cache_json, close_redis_pool
+from src.cache import CACHE_TTL_SECONDS, cache_json, close_cache_backend, delete_keys, get_cached_json, scan_keys
+from src.cohorts import DEFAULT_COHORT, cohort_key
+from src.scripts.build_snapshot import main as build_snapshot
+from src.services.layout import edge_bundling_geometry, network_layout
+from src.services.network_sections import cache_network
 from src.services.processing import (
     compute_citation_network,
     compute_collaboration_network,
     compute_community_network,
     compute_papers_by_year,
     compute_patents_for_year,
+    summarize_patent_counts,
     compute_hierarchical_citation_network,
+    compute_centrality_metrics,
+    compute_analytics_cube,
+    compute_citation_flows,
 )
 
 
-async def main():
-    print("Starting pre-cache process...")
+async def main(cohort: str = DEFAULT_COHORT):
+    print(f"Starting pre-cache process for cohort {cohort}...")
+
+    def key(name: str):
+        return cohort_key(name, cohort)
+
+    # Build the snapshot first so the computations below read from it
+    # (it holds the default cohort only)
+    if cohort == DEFAULT_COHORT:
+        await build_snapshot()
 
     # Clear old keys
     print("Clearing old cache keys...")
-    redis = await get_redis()
     
-    # Use pattern matching to delete all hierarchical citation keys
+    # Use pattern matching to delete all per-range keys
     # This handles any previously cached year combination
-    pattern = "net:hierarchical-citation*"
-    cursor = 0
     deleted_count = 0
+    for pattern in ["net:hierarchical-citation*", "net:layout:*", "net:bundling:*", "data:metrics:*"]:
+        deleted_count += await delete_keys(await scan_keys(key(pattern)))
     
-    # Scan and delete all matching keys
-    while True:
-        cursor, keys = await redis.scan(cursor, match=pattern, count=100)
-        if keys:
-            await redis.delete(*keys)
-            deleted_count += len(keys)
-        if cursor == 0:
-            break
-    
-    print(f"  Deleted {deleted_count} old hierarchical network cache keys")
+    print(f"  Deleted {deleted_count} old per-range cache keys")
     
     # Delete other standard keys
     keys_to_delete = [
@@ -45,36 +56,42 @@ async def main():
         "net:collaboration",
         "net:citation-community",
         "data:timeline",
-    ] + [f"data:patents:{year}" for year in range(2013, 2023)]
+        "data:analytics-cube",
+        "data:citation-flows",
+    ] + [f"data:patents:{year}" for year in range(2013, 2023)] + [
+        f"data:patents-summary:{year}" for year in range(2013, 2023)
+    ]
 
-    for key in keys_to_delete:
-        await redis.delete(key)
-    
-    await redis.close()
+    await delete_keys([key(name) for name in keys_to_delete])
 
     # Compute and cache citation network
     print("Computing citation network...")
-    citation_data = await compute_citation_network()
-    await cache_json("net:citation", citation_data)
-    print(f"  Cached {len(citation_data['nodes'])} nodes, {len(citation_data['links'])} links")
+    citation_data = await compute_citation_network(cohort)
+    await cache_json(key("net:citation"), citation_data)
+    await cache_json(key("net:layout:citation"), network_layout(citation_data))
+    print(f"  Cached {len(citation_data['nodes'])} nodes, {len(citation_data['links'])} links (with layout)")
 
     # Compute and cache collaboration network
     print("Computing collaboration network...")
-    collaboration_data = await compute_collaboration_network()
-    await cache_json("net:collaboration", collaboration_data)
-    print(f"  Cached {len(collaboration_data['nodes'])} nodes, {len(collaboration_data['links'])} links")
+    collaboration_data = await compute_collaboration_network(cohort)
+    await cache_json(key("net:collaboration"), collaboration_data)
+    await cache_json(key("net:layout:collaboration"), network_layout(collaboration_data))
+    print(f"  Cached {len(collaboration_data['nodes'])} nodes, {len(collaboration_data['links'])} links (with layout)")
 
     # Compute and cache community network
     print("Computing community network...")
-    community_data = await compute_community_network()
-    await cache_json("net:citation-community", community_data)
+    community_data = await compute_community_network(cohort)
+    await cache_json(key("net:citation-community"), community_data)
     print(f"  Cached {len(community_data['children'])} communities")
 
     # Compute and cache hierarchical citation networks for ALL year combinations
     print("Computing hierarchical citation networks (for edge bundling)...")
     print("  This will cache all meaningful year combinations (2013-2022)...")
     
-    # Cache strategy: individual years + commonly used ranges
+    # Cache strategy: individual years + commonly used ranges. These are only
+    # an initial guess: they expire after CACHE_TTL_SECONDS unless the API's
+    # cache warmer sees them requested, and LFU eviction drops the least-used
+    # ones first when Redis hits its memory budget.
     year_ranges = []
     available_years = list(range(2013, 2023))  # 2013 to 2022
     
@@ -108,13 +125,28 @@ async def main():
     print(f"\n  Total combinations to cache: {len(year_ranges)}")
     print(f"  Starting computation...")
     
-    # Compute and cache each range
+    # Compute and cache each range (centrality metrics first, so the
+    # network payload can reuse them as node attributes)
     cached_count = 0
     for year_start, year_end, label in year_ranges:
         try:
-            hierarchical_data = await compute_hierarchical_citation_network(year_start, year_end)
-            cache_key = f"net:hierarchical-citation:{year_start}-{year_end}"
-            await cache_json(cache_key, hierarchical_data)
+            metrics_data = await compute_centrality_metrics(year_start, year_end, cohort)
+            await cache_json(key(f"data:metrics:{year_start}-{year_end}"), metrics_data, ttl=CACHE_TTL_SECONDS)
+            hierarchical_data = await compute_hierarchical_citation_network(
+                year_start, year_end, metrics_data, cohort=cohort
+            )
+            cache_key = key(f"net:hierarchical-citation:{year_start}-{year_end}")
+            await cache_network(cache_key, hierarchical_data, ttl=CACHE_TTL_SECONDS)
+            await cache_json(
+                key(f"net:layout:hierarchical-citation:{year_start}-{year_end}"),
+                network_layout(hierarchical_data),
+                ttl=CACHE_TTL_SECONDS,
+            )
+            await cache_json(
+                key(f"net:bundling:hierarchical-citation:{year_start}-{year_end}"),
+                edge_bundling_geometry(hierarchical_data),
+                ttl=CACHE_TTL_SECONDS,
+            )
             cached_count += 1
             print(f"  [{cached_count}/{len(year_ranges)}] {label}: ✓ {len(hierarchical_data['nodes'])} nodes, {len(hierarchical_data['links'])} links, {hierarchical_data['total_communities']} communities")
         except Exception as e:
@@ -122,29 +154,48 @@ async def main():
     
     # Also cache the default (for backward compatibility)
     print("\n  Caching default (2018-2022)...")
-    default_data = await compute_hierarchical_citation_network(2018, 2022)
-    await cache_json("net:hierarchical-citation", default_data)
+    default_metrics = await get_cached_json(key("data:metrics:2018-2022"))
+    default_data = await compute_hierarchical_citation_network(2018, 2022, default_metrics, cohort=cohort)
+    await cache_json(key("net:hierarchical-citation"), default_data)
     
     print(f"\n  Successfully cached {cached_count} year combinations!")
 
     # Compute and cache papers by year
     print("Computing papers by year...")
-    timeline_data = await compute_papers_by_year()
-    await cache_json("data:timeline", timeline_data)
+    timeline_data = await compute_papers_by_year(cohort)
+    await cache_json(key("data:timeline"), timeline_data)
     print(f"  Cached {len(timeline_data)} years")
 
+    # Compute and cache the year x field analytics cube
+    print("Computing analytics cube...")
+    cube_data = await compute_analytics_cube(cohort)
+    await cache_json(key("data:analytics-cube"), cube_data)
+    print(f"  Cached {len(cube_data['years'])} years x {len(cube_data['fields'])} fields")
+
+    # Compute and cache the field and community citation flow tensors
+    print("Computing citation flows...")
+    flows_data = await compute_citation_flows(cohort)
+    await cache_json(key("data:citation-flows"), flows_data)
+    print(f"  Cached {len(flows_data['field']['groups'])} fields x {len(flows_data['community']['groups'])} "
+          f"community groups over {len(flows_data['years'])} years")
+
     # Compute and cache patents for each year
     print("Computing patents by year...")
     for year in range(2013, 2023):
-        patents_data = await compute_patents_for_year(year)
-        await cache_json(f"data:patents:{year}", patents_data)
-        print(f"  Cached {len(patents_data)} patent counts for {year}")
+        patents_data = await compute_patents_for_year(year, cohort)
+        await cache_json(key(f"data:patents:{year}"), patents_data)
+        summary = {"year": year, **summarize_patent_counts(patents_data)}
+        await cache_json(key(f"data:patents-summary:{year}"), summary)
+        print(f"  Cached {len(patents_data)} patent counts for {year} (max {summary['stats']['max']})")
 
-    # Close Redis pool
-    await close_redis_pool()
+    # Close cache backend
+    await close_cache_backend()
 
     print("\nPre-caching complete!")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Populate the cache with computed data.")
+    parser.add_argument("--cohort", default=DEFAULT_COHORT, help=f"Cohort to pre-compute (default {DEFAULT_COHORT})")
+    args = parser.parse_args()
+    asyncio.run(main(args.cohort))
@@ -0,0 +1,182 @@
+import numpy as np
+
+CUBE_YEARS = list(range(2013, 2023))
+CUBE_METRICS = ("citations", "patents", "authors")
+
+# Quantile sketch: bucket 0 holds zeros, bucket b >= 1 holds values in
+# [2^((b-1)/4), 2^(b/4)), i.e. ~19% relative error per bucket
+SKETCH_BUCKETS_PER_OCTAVE = 4
+SKETCH_BUCKETS = 1 + SKETCH_BUCKETS_PER_OCTAVE * 16
+
+GROUP_BY_OPTIONS = ("year", "field", "year,field")
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _sketch_bucket(values: np.ndarray):
+    """Map non-negative values to log-scale sketch buckets."""
+    buckets = np.zeros(len(values), dtype=np.int64)
+    positive = values > 0
+    buckets[positive] = 1 + np.floor(SKETCH_BUCKETS_PER_OCTAVE * np.log2(values[positive])).astype(np.int64)
+    return np.minimum(buckets, SKETCH_BUCKETS - 1)
+
+
+def _sketch_quantiles(histogram: np.ndarray, quantiles=QUANTILES):
+    """
+    Estimate quantiles from sketch histograms along the last axis,
+    interpolating linearly inside the bucket that crosses each rank.
+    """
+    counts = histogram.sum(axis=-1, keepdims=True)
+    cumulative = np.cumsum(histogram, axis=-1)
+    lower = np.concatenate([[0.0], 2.0 ** (np.arange(SKETCH_BUCKETS - 1) / SKETCH_BUCKETS_PER_OCTAVE)])
+    upper = np.concatenate([[0.0], 2.0 ** (np.arange(1, SKETCH_BUCKETS) / SKETCH_BUCKETS_PER_OCTAVE)])
+
+    results = []
+    for q in quantiles:
+        rank = q * counts
+        bucket = np.minimum((cumulative < rank).sum(axis=-1, keepdims=True), SKETCH_BUCKETS - 1)
+        before = np.take_along_axis(cumulative - histogram, bucket, axis=-1)
+        inside = np.take_along_axis(histogram, bucket, axis=-1)
+        fraction = np.divide(rank - before, inside, out=np.zeros_like(rank, dtype=float), where=inside > 0)
+        value = lower[bucket] + fraction * (upper[bucket] - lower[bucket])
+        results.append(np.where(counts > 0, value, 0.0)[..., 0])
+    return results
+
+
+def build_analytics_cube(papers: np.ndarray, paper_fields: np.ndarray, field_ids: list[int]):
+    """
+    Aggregate papers into a year x field x metric cube.
+
+    Args:
+        papers: Array of rows (paper_id, year, citations, patents, authors)
+        paper_fields: Array of rows (paper_id, field_id)
+        field_ids: Field ids for the cube's field axis; slot 0 is "all fields"
+
+    Returns a JSON-serializable dict with paper counts, metric sums and
+    per-metric quantile sketches for every (year, field) cell.
+    """
+    papers = papers.reshape(-1, 2 + len(CUBE_METRICS)).astype(np.int64)
+    paper_fields = paper_fields.reshape(-1, 2).astype(np.int64)
+    years = np.asarray(CUBE_YEARS)
+    fields = np.unique(np.asarray(field_ids, dtype=np.int64))
+
+    papers = papers[(papers[:, 1] >= years[0]) & (papers[:, 1] <= years[-1])]
+    papers = papers[np.argsort(papers[:, 0])]
+
+    # Each paper contributes once to the "all fields" slot and once per field
+    row = np.searchsorted(papers[:, 0], paper_fields[:, 0])
+    slot = np.searchsorted(fields, paper_fields[:, 1])
+    valid = (row < len(papers)) & (slot < len(fields))
+    row, slot, paper_fields = row[valid], slot[valid], paper_fields[valid]
+    valid = (papers[row, 0] == paper_fields[:, 0]) & (fields[slot] == paper_fields[:, 1])
+
+    rows = np.concatenate([np.arange(len(papers)), row[valid]])
+    slots = np.concatenate([np.zeros(len(papers), dtype=np.int64), slot[valid] + 1])
+
+    n_years, n_fields = len(years), len(fields) + 1
+    cell = (papers[rows, 1] - years[0]) * n_fields + slots
+    n_cells = n_years * n_fields
+
+    count = np.bincount(cell, minlength=n_cells).reshape(n_years, n_fields)
+    sums = {}
+    sketches = {}
+    for m, metric in enumerate(CUBE_METRICS):
+        values = papers[rows, 2 + m]
+        sums[metric] = np.bincount(cell, weights=values, minlength=n_cells).reshape(n_years, n_fields)
+        sketch_cell = cell * SKETCH_BUCKETS + _sketch_bucket(values)
+        sketches[metric] = np.bincount(
+            sketch_cell, minlength=n_cells * SKETCH_BUCKETS
+        ).reshape(n_years, n_fields, SKETCH_BUCKETS)
+
+    return {
+        "years": years.tolist(),
+        "fields": fields.tolist(),
+        "metrics": list(CUBE_METRICS),
+        "count": count.tolist(),
+        "sum": {metric: sums[metric].astype(np.int64).tolist() for metric in CUBE_METRICS},
+        "sketch": {metric: sketches[metric].tolist() for metric in CUBE_METRICS},
+    }
+
+
+class AnalyticsCube:
+    """In-memory view of a cached analytics cube for fast slicing."""
+
+    def __init__(self, data: dict):
+        self.years = np.asarray(data["years"])
+        self.fields = np.asarray(data["fields"], dtype=np.int64)
+        self.count = np.asarray(data["count"], dtype=np.int64)
+        self.sum = {metric: np.asarray(data["sum"][metric], dtype=np.int64) for metric in CUBE_METRICS}
+        self.sketch = {metric: np.asarray(data["sketch"][metric], dtype=np.int64) for metric in CUBE_METRICS}
+
+    def aggregate(
+        self,
+        group_by: str,
+        metric: str,
+        year_start: int | None = None,
+        year_end: int | None = None,
+        field_id: int | None = None,
+    ):
+        """
+        Slice the cube and return one row per group.
+
+        Grouping by year alone uses the "all fields" slot, so papers with
+        several fields are counted once. Grouping by field counts a paper
+        under each of its fields.
+        """
+        year_mask = np.ones(len(self.years), dtype=bool)
+        if year_start is not None:
+            year_mask &= self.years >= year_start
+        if year_end is not None:
+            year_mask &= self.years <= year_end
+
+        if field_id is not None:
+            field_slots = np.flatnonzero(self.fields == field_id) + 1
+            if len(field_slots) == 0:
+                raise ValueError(f"Unknown field_id {field_id}")
+        elif group_by == "year":
+            field_slots = np.array([0])
+        else:
+            field_slots = np.arange(1, len(self.fields) + 1)
+
+        count = self.count[year_mask][:, field_slots]
+        if metric == "papers":
+            total = sketch = None
+        else:
+            total = self.sum[metric][year_mask][:, field_slots]
+            sketch = self.sketch[metric][year_mask][:, field_slots]
+
+        # Collapse the axis that is not part of the grouping
+        years = self.years[year_mask].tolist()
+        fields = self.fields[field_slots - 1].tolist() if field_slots[0] != 0 else [None]
+        if group_by == "year":
+            keys = [{"year": year} for year in years]
+            count = count.sum(axis=1)
+            if total is not None:
+                total, sketch = total.sum(axis=1), sketch.sum(axis=1)
+        elif group_by == "field":
+            keys = [{"field_id": field} for field in fields]
+            count = count.sum(axis=0)
+            if total is not None:
+                total, sketch = total.sum(axis=0), sketch.sum(axis=0)
+        else:
+            keys = [{"year": year, "field_id": field} for year in years for field in fields]
+            count = count.reshape(-1)
+            if total is not None:
+                total, sketch = total.reshape(-1), sketch.reshape(-1, SKETCH_BUCKETS)
+
+        if total is None:
+            return [{**key, "count": int(c)} for key, c in zip(keys, count)]
+
+        mean = np.divide(total, count, out=np.zeros(len(count)), where=count > 0)
+        p50, p90, p99 = _sketch_quantiles(sketch)
+        return [
+            {
+                **key,
+                "count": int(count[i]),
+                "sum": int(total[i]),
+                "mean": float(mean[i]),
+                "p50": float(p50[i]),
+                "p90": float(p90[i]),
+                "p99": float(p99[i]),
+            }
+            for i, key in enumerate(keys)
+        ]
@@ -0,0 +1,135 @@
+import asyncio
+
+import numpy as np
+from src.cohorts import DEFAULT_COHORT
+from src.snapshot import Snapshot, build_snapshot_arrays, get_snapshot
+
+# Author profiles and collaborators are read from the snapshot's paper <-> author
+# CSR indexes: an author's papers are one slice of author_paper_indices and a
+# paper's authors one slice of author_indices, so a request is a few array
+# slices and a bincount, with no SQL. Without a snapshot file (and for
+# non-default cohorts) the same arrays are built in memory on first use.
+AUTHOR_TOP_PAPERS = 5
+
+_indexes: dict[str, Snapshot] = {}
+_build_lock = asyncio.Lock()
+
+
+async def get_author_index(cohort: str = DEFAULT_COHORT):
+    """The snapshot holding a cohort's author CSR indexes."""
+    if cohort == DEFAULT_COHORT:
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            return snapshot
+
+    async with _build_lock:
+        if cohort not in _indexes:
+            print(f"Building in-memory author index for cohort {cohort}...")
+            _indexes[cohort] = Snapshot.from_arrays(await build_snapshot_arrays(cohort))
+    return _indexes[cohort]
+
+
+def _gather(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray):
+    """Concatenate the CSR slices of `rows`."""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[offsets + np.arange(lengths.sum())]
+
+
+def _author_position(index: Snapshot, author_id: int):
+    pos = int(np.searchsorted(index.author_ids, author_id))
+    if pos >= len(index.author_ids) or index.author_ids[pos] != author_id:
+        return None
+    return pos
+
+
+def _author_papers(index: Snapshot, pos: int):
+    return index.author_paper_indices[index.author_paper_indptr[pos]:index.author_paper_indptr[pos + 1]]
+
+
+def _coauthor_weights(index: Snapshot, pos: int, papers: np.ndarray):
+    """Co-author positions and the number of `papers` shared with each."""
+    coauthors = _gather(index.author_indptr, index.author_indices, papers)
+    counts = np.bincount(coauthors[coauthors != pos])
+    positions = np.flatnonzero(counts)
+    return positions, counts[positions]
+
+
+def author_profile(index: Snapshot, author_id: int):
+    """Publication and citation summary of an author, or None if unknown."""
+    pos = _author_position(index, author_id)
+    if pos is None:
+        return None
+
+    papers = _author_papers(index, pos)
+    years = index.years[papers]
+    citations = index.citation_counts[papers].astype(np.int64)
+
+    # h-index: largest h with h papers cited at least h times each
+    ranked = np.sort(citations)[::-1]
+    h_index = int(np.count_nonzero(ranked >= np.arange(1, len(ranked) + 1)))
+
+    by_year = []
+    for year in np.unique(years).tolist():
+        in_year = years == year
+        by_year.append({
+            "year": year,
+            "papers": int(np.count_nonzero(in_year)),
+            "citations": int(citations[in_year].sum()),
+        })
+
+    top = papers[np.argsort(-citations, kind="stable")[:AUTHOR_TOP_PAPERS]]
+    collaborators, _ = _coauthor_weights(index, pos, papers)
+
+    return {
+        "id": author_id,
+        "papers": len(papers),
+        "citations": int(citations.sum()),
+        "patents": int(index.patent_counts[papers].sum()),
+        "h_index": h_index,
+        "first_year": int(years.min()) if len(papers) else None,
+        "last_year": int(years.max()) if len(papers) else None,
+        "collaborators": len(collaborators),
+        "by_year": by_year,
+        "top_papers": [
+            {
+                "id": int(index.paper_ids[i]),
+                "title": index.title(i),
+                "year": int(index.years[i]),
+                "citation_count": int(index.citation_counts[i]),
+            }
+            for i in top.tolist()
+        ],
+    }
+
+
+def top_collaborators(index: Snapshot, author_id: int, year_start: int, year_end: int, limit: int):
+    """
+    Co-authors of an author on papers published in a year range, most
+    shared papers first, or None if the author is unknown.
+    """
+    pos = _author_position(index, author_id)
+    if pos is None:
+        return None
+
+    papers = _author_papers(index, pos)
+    papers = papers[(index.years[papers] >= year_start) & (index.years[papers] <= year_end)]
+    positions, weights = _coauthor_weights(index, pos, papers)
+    # Most shared papers first, ties by author id
+    order = np.lexsort((positions, -weights))[:limit]
+
+    return {
+        "id": author_id,
+        "year_range": {"start": year_start, "end": year_end},
+        "papers": len(papers),
+        "total_collaborators": len(positions),
+        "collaborators": [
+            {
+                "id": int(index.author_ids[positions[i]]),
+                "shared_papers": int(weights[i]),
+                "papers": int(index.author_paper_indptr[positions[i] + 1] - index.author_paper_indptr[positions[i]]),
+            }
+            for i in order.tolist()
+        ],
+    }
@@ -0,0 +1,121 @@
+import asyncio
+
+from src.cache import get_cached_text_many
+from src.cohorts import DEFAULT_COHORT, cohort_key
+from src.services import processing
+
+# Resources a batch request can name: name -> (cache key, builder, takes a
+# year). Year resources are written "name:year", e.g. "patents:2016".
+BATCH_RESOURCES = {
+    "timeline": ("data:timeline", processing.compute_papers_by_year, False),
+    "citation": ("net:citation", processing.compute_citation_network, False),
+    "collaboration": ("net:collaboration", processing.compute_collaboration_network, False),
+    "community": ("net:citation-community", processing.compute_community_network, False),
+    "flows": ("data:citation-flows", processing.compute_citation_flows, False),
+    "patents": ("data:patents:{year}", processing.compute_patents_for_year, True),
+    "patents-summary": (
+        "data:patents-summary:{year}",
+        lambda year, cohort: processing.compute_patent_summary_for_year(year, cohort=cohort),
+        True,
+    ),
+}
+BATCH_MAX_RESOURCES = 50
+BATCH_RESULT_URL = "/api/v1/batch?resources={resources}"
+
+
+def parse_descriptors(resources: str):
+    """
+    Parse a comma-separated list of resource descriptors, dropping repeats.
+
+    Raises:
+        ValueError: If a descriptor is unknown or its year is missing or out of range
+    """
+    descriptors = list(dict.fromkeys(item.strip() for item in resources.split(",") if item.strip()))
+    if not descriptors:
+        raise ValueError("resources must list at least one resource")
+    if len(descriptors) > BATCH_MAX_RESOURCES:
+        raise ValueError(f"At most {BATCH_MAX_RESOURCES} resources per batch")
+
+    for descriptor in descriptors:
+        name, _, year = descriptor.partition(":")
+        if name not in BATCH_RESOURCES:
+            raise ValueError(f"Unknown resource {name!r}; use one of: {', '.join(BATCH_RESOURCES)}")
+        if BATCH_RESOURCES[name][2]:
+            if not year.isdigit() or not 2013 <= int(year) <= 2022:
+                raise ValueError(f"{descriptor!r}: give a year between 2013 and 2022, e.g. {name}:2020")
+        elif year:
+            raise ValueError(f"{descriptor!r}: {name} takes no year")
+    return descriptors
+
+
+def _resource(descriptor: str, cohort: str):
+    """(cache key, zero-argument builder) of a parsed descriptor."""
+    name, _, year = descriptor.partition(":")
+    key, builder, takes_year = BATCH_RESOURCES[name]
+    if takes_year:
+        return cohort_key(key.format(year=year), cohort), lambda: builder(int(year), cohort)
+    return cohort_key(key, cohort), lambda: builder(cohort)
+
+
+def _submit(descriptor: str, cohort: str):
+    """Submit (or join) the job computing and caching a missing resource."""
+    from src.services.jobs import job_manager
+
+    key, builder = _resource(descriptor, cohort)
+
+    async def compute(progress):
+        progress("compute")
+        return await builder()
+
+    result_url = BATCH_RESULT_URL.format(resources=descriptor)
+    if cohort != DEFAULT_COHORT:
+        result_url += f"&cohort={cohort}"
+    job = job_manager.submit(
+        cache_key=key,
+        kind="batch",
+        params={"resource": descriptor, "cohort": cohort},
+        stages=("compute",),
+        result_url=result_url,
+        compute=compute,
+    )
+    print(f"Computing {key} on-demand for a batch request...")
+    return job
+
+
+async def start_batch(descriptors: list[str], cohort: str):
+    """
+    Read every cached resource with a single multi-key read and submit a
+    background job for each missing one.
+
+    Returns:
+        ([(descriptor, JSON text)] of cached resources, {descriptor: job} of missing ones)
+
+    Raises:
+        JobQueueFullError: If the job queue cannot admit a missing resource
+    """
+    keys = [_resource(descriptor, cohort)[0] for descriptor in descriptors]
+    values = await get_cached_text_many(keys)
+
+    cached, jobs = [], {}
+    for descriptor, value in zip(descriptors, values):
+        if value is not None:
+            cached.append((descriptor, value))
+        else:
+            jobs[descriptor] = _submit(descriptor, cohort)
+    return cached, jobs
+
+
+async def finish_batch(jobs: dict, cohort: str):
+    """Yield (descriptor, JSON text, error) for each job of start_batch as it finishes."""
+
+    async def result(descriptor: str, job):
+        await job.done.wait()
+        if job.status == "failed":
+            return descriptor, None, job.error
+        (text,) = await get_cached_text_many([_resource(descriptor, cohort)[0]])
+        if text is None:
+            return descriptor, None, "Computed but no longer cached; retry later"
+        return descriptor, text, None
+
+    for finished in asyncio.as_completed([result(descriptor, job) for descriptor, job in jobs.items()]):
+        yield await finished
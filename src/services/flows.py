@@ -0,0 +1,130 @@
+import networkx as nx
+import numpy as np
+
+FLOW_YEARS = list(range(2013, 2023))
+FLOW_KINDS = ("field", "community")
+# Communities beyond the largest FLOW_TOP_COMMUNITIES share one "other" group
+FLOW_TOP_COMMUNITIES = 20
+
+
+def _expand(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray):
+    """
+    Pair every entry of `rows` with each entry of its CSR slice. Returns the
+    index into `rows` of each pair and the gathered values.
+    """
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return owner, indices[offsets + np.arange(lengths.sum())]
+
+
+def flow_tensor(year_slot: np.ndarray, source: np.ndarray, target: np.ndarray, n_years: int, n_groups: int):
+    """Count (year, source group, target group) triples into a dense tensor."""
+    cell = (year_slot * n_groups + source) * n_groups + target
+    return np.bincount(cell, minlength=n_years * n_groups * n_groups).reshape(n_years, n_groups, n_groups)
+
+
+def _field_incidence(snapshot):
+    """CSR of paper position -> field slot, decoded from the field bitsets."""
+    bits = np.unpackbits(snapshot.field_bits.view(np.uint8), axis=1, bitorder="little")
+    papers, slots = np.nonzero(bits[:, :len(snapshot.field_ids)])
+    indptr = np.zeros(snapshot.n_papers + 1, dtype=np.int64)
+    np.cumsum(np.bincount(papers, minlength=snapshot.n_papers), out=indptr[1:])
+    return indptr, slots
+
+
+def _citation_communities(citing: np.ndarray, cited: np.ndarray):
+    """Louvain communities of the undirected citation graph, largest first."""
+    G = nx.Graph()
+    G.add_edges_from(zip(citing.tolist(), cited.tolist()))
+    return sorted(nx.algorithms.community.louvain_communities(G), key=len, reverse=True)
+
+
+def build_citation_flows(snapshot, field_names: dict[int, str], top_communities: int = FLOW_TOP_COMMUNITIES):
+    """
+    Count citations between fields and between citation communities, per
+    year of the citing paper (2013-2022).
+
+    A citation between papers with several fields counts once per (source
+    field, target field) pair. Communities are detected once on the citation
+    graph of the whole period, so a community means the same papers in every
+    year.
+    """
+    years = np.array(FLOW_YEARS)
+    citing, cited = snapshot.citation_links(snapshot.year_mask(years[0], years[-1]))
+    year_slot = snapshot.years[citing].astype(np.int64) - years[0]
+
+    # Field flows: expand each link by the citing paper's fields, then by the cited paper's
+    indptr, slots = _field_incidence(snapshot)
+    link, source = _expand(indptr, slots, citing)
+    pair, target = _expand(indptr, slots, cited[link])
+    field_flows = flow_tensor(year_slot[link[pair]], source[pair], target, len(years), len(snapshot.field_ids))
+
+    # Community flows: top communities keep their own group, the rest share the last one
+    communities = _citation_communities(citing, cited)
+    top = communities[:top_communities]
+    group = np.full(snapshot.n_papers, len(top), dtype=np.int64)
+    for community_id, community in enumerate(top):
+        group[list(community)] = community_id
+    n_groups = len(top) + 1
+    community_flows = flow_tensor(year_slot, group[citing], group[cited], len(years), n_groups)
+
+    community_groups = []
+    for community_id, community in enumerate(top):
+        members = np.fromiter(community, dtype=np.int64)
+        most_cited = int(members[np.argmax(snapshot.citation_counts[members])])
+        community_groups.append({
+            "id": community_id,
+            "name": f"Community {community_id + 1}",
+            "size": len(members),
+            "top_paper": snapshot.title(most_cited)[:50],
+        })
+    community_groups.append({
+        "id": "other",
+        "name": "Other communities",
+        "size": int(sum(len(community) for community in communities[top_communities:])),
+        "top_paper": None,
+    })
+
+    return {
+        "years": years.tolist(),
+        "citations": np.bincount(year_slot, minlength=len(years)).tolist(),
+        "field": {
+            "groups": [
+                {"id": field_id, "name": field_names.get(field_id, str(field_id))}
+                for field_id in snapshot.field_ids.tolist()
+            ],
+            "flows": field_flows.tolist(),
+        },
+        "community": {"groups": community_groups, "flows": community_flows.tolist()},
+    }
+
+
+class CitationFlows:
+    """In-memory view of cached citation flow tensors for fast slicing."""
+
+    def __init__(self, data: dict):
+        self.years = np.asarray(data["years"])
+        self.groups = {kind: data[kind]["groups"] for kind in FLOW_KINDS}
+        self.flows = {kind: np.asarray(data[kind]["flows"], dtype=np.int64) for kind in FLOW_KINDS}
+
+    def matrix(self, kind: str, year_start: int, year_end: int, by_year: bool = False):
+        """
+        Source x target citation counts of one kind over a year range,
+        summed or (by_year) one matrix per year.
+        """
+        year_mask = (self.years >= year_start) & (self.years <= year_end)
+        flows = self.flows[kind][year_mask]
+        result = {
+            "kind": kind,
+            "year_range": {"start": year_start, "end": year_end},
+            "groups": self.groups[kind],
+            "total": int(flows.sum()),
+        }
+        if by_year:
+            result["years"] = self.years[year_mask].tolist()
+            result["matrices"] = flows.tolist()
+        else:
+            result["matrix"] = flows.sum(axis=0).tolist()
+        return result
@@ -0,0 +1,245 @@
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from src.cache import CACHE_TTL_SECONDS, cache_json, get_cached_json
+from src.cohorts import DEFAULT_COHORT, cohort_key
+from src.telemetry import JOB_QUEUE_DEPTH, JOBS_RUNNING
+from src.timing import log_timing, start_spans, summarize
+
+# Admission limits are per worker process
+MAX_QUEUED_JOBS = 8  # queued + running
+MAX_CONCURRENT_JOBS = 2
+JOB_TTL_SECONDS = 3600
+RETRY_AFTER_SECONDS = 30
+# API paths put in job states (the router is mounted at /api/v1)
+JOB_STATUS_URL = "/api/v1/jobs/{job_id}"
+NETWORK_RESULT_URL = "/api/v1/network/hierarchical-citation?year_start={year_start}&year_end={year_end}"
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job cannot be admitted because the queue is full."""
+
+
+class Job:
+    """State of one background compute job."""
+
+    def __init__(self, kind: str, params: dict, stages: tuple[str, ...], status_url: str, result_url: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.stages = stages
+        self.status_url = status_url.format(job_id=self.id)
+        self.result_url = result_url
+        self.status = "queued"
+        self.stage = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.timings = {}
+        self.done = asyncio.Event()
+
+    @property
+    def progress(self):
+        if self.status == "done":
+            return 1.0
+        if self.stage not in self.stages:
+            return 0.0
+        return self.stages.index(self.stage) / len(self.stages)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "stage": self.stage,
+            "stages": list(self.stages),
+            "progress": round(self.progress, 3),
+            "error": self.error,
+            "status_url": self.status_url,
+            "result_url": self.result_url if self.status == "done" else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "timings_ms": self.timings,
+        }
+
+
+class JobManager:
+    """
+    Runs expensive computations as background jobs with bounded admission.
+
+    Jobs for the same cache key are deduplicated. Job state is mirrored to
+    the cache under job:{id} so any worker process can report it.
+    """
+
+    def __init__(self, max_queued: int = MAX_QUEUED_JOBS, max_concurrent: int = MAX_CONCURRENT_JOBS):
+        self.max_queued = max_queued
+        self.max_concurrent = max_concurrent
+        self._jobs: dict[str, Job] = {}
+        self._active: dict[str, Job] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._semaphore = None
+
+    @property
+    def depth(self):
+        """Number of queued or running jobs in this process."""
+        return len(self._active)
+
+    @property
+    def running(self):
+        return sum(1 for job in self._active.values() if job.status == "running")
+
+    def submit(
+        self,
+        cache_key: str,
+        kind: str,
+        params: dict,
+        stages: tuple[str, ...],
+        result_url: str,
+        compute: Callable[[Callable[[str], None]], Awaitable[dict | list]],
+        result_ttl: int | None = None,
+        store: Callable[[str, dict | list, int | None], Awaitable[None]] = cache_json,
+        status_url: str = JOB_STATUS_URL,
+    ):
+        """
+        Admit a job that computes a value and caches it under `cache_key`
+        (expiring after `result_ttl` seconds if given) with `store`.
+        Returns the already-active job for that key if there is one.
+
+        Raises:
+            JobQueueFullError: If MAX_QUEUED_JOBS jobs are already queued or running
+        """
+        if cache_key in self._active:
+            return self._active[cache_key]
+        if len(self._active) >= self.max_queued:
+            raise JobQueueFullError(f"{len(self._active)} jobs already queued or running")
+
+        self._prune()
+        job = Job(kind, params, stages, status_url, result_url)
+        self._jobs[job.id] = job
+        self._active[cache_key] = job
+
+        task = asyncio.create_task(self._run(job, cache_key, compute, result_ttl, store))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def get(self, job_id: str):
+        """Get job state, falling back to the cache for jobs run by other workers."""
+        job = self._jobs.get(job_id)
+        if job:
+            return job.to_dict()
+        return await get_cached_json(f"job:{job_id}")
+
+    async def _run(self, job: Job, cache_key: str, compute, result_ttl: int | None, store):
+        loop = asyncio.get_running_loop()
+
+        def progress(stage: str):
+            # May be called from a worker thread
+            loop.call_soon_threadsafe(self._advance, job, stage)
+
+        # Spans of this job, separate from the request that submitted it
+        spans = start_spans()
+        await self._persist(job)
+        try:
+            async with self._get_semaphore():
+                job.status = "running"
+                job.started_at = time.time()
+                await self._persist(job)
+
+                result = await compute(progress)
+                await store(cache_key, result, ttl=result_ttl)
+
+                job.status = "done"
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+            print(f"Job {job.id} ({job.kind} {job.params}) failed during '{job.stage}': {job.error}")
+        finally:
+            job.finished_at = time.time()
+            job.timings = summarize(spans)
+            if job.started_at is not None:
+                log_timing(
+                    "job", (job.finished_at - job.started_at) * 1000, spans,
+                    job_id=job.id, kind=job.kind, params=job.params, status=job.status,
+                )
+            self._active.pop(cache_key, None)
+            job.done.set()
+            await self._persist(job)
+
+    def _advance(self, job: Job, stage: str):
+        job.stage = stage
+        task = asyncio.create_task(self._persist(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _persist(self, job: Job):
+        try:
+            await cache_json(f"job:{job.id}", job.to_dict(), ttl=JOB_TTL_SECONDS)
+        except Exception as e:
+            print(f"Failed to persist state of job {job.id}: {e}")
+
+    def _get_semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    def _prune(self):
+        """Forget finished jobs older than JOB_TTL_SECONDS."""
+        cutoff = time.time() - JOB_TTL_SECONDS
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager()
+JOB_QUEUE_DEPTH.set_function(lambda: job_manager.depth)
+JOBS_RUNNING.set_function(lambda: job_manager.running)
+
+
+async def build_network(
+    year_start: int,
+    year_end: int,
+    cohort: str = DEFAULT_COHORT,
+    progress: Callable[[str], None] | None = None,
+):
+    """
+    Compute the hierarchical citation network of a year range, with the
+    centrality table of the range as node attributes if it is cached.
+    """
+    from src.services.processing import compute_hierarchical_citation_network
+
+    metrics = await get_cached_json(cohort_key(f"data:metrics:{year_start}-{year_end}", cohort))
+    return await compute_hierarchical_citation_network(year_start, year_end, metrics, progress=progress, cohort=cohort)
+
+
+def submit_network_job(year_start: int, year_end: int, cohort: str = DEFAULT_COHORT):
+    """
+    Submit (or join) the job computing and caching the hierarchical
+    citation network of a year range.
+
+    Raises:
+        JobQueueFullError: If the job queue is full
+    """
+    from src.services.network_sections import cache_network
+    from src.services.processing import HIERARCHICAL_STAGES
+
+    result_url = NETWORK_RESULT_URL.format(year_start=year_start, year_end=year_end)
+    if cohort != DEFAULT_COHORT:
+        result_url += f"&cohort={cohort}"
+    return job_manager.submit(
+        cache_key=cohort_key(f"net:hierarchical-citation:{year_start}-{year_end}", cohort),
+        kind="network",
+        params={"year_start": year_start, "year_end": year_end, "cohort": cohort},
+        stages=HIERARCHICAL_STAGES,
+        result_url=result_url,
+        compute=lambda progress: build_network(year_start, year_end, cohort, progress),
+        result_ttl=CACHE_TTL_SECONDS,
+        store=cache_network,
+    )
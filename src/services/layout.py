@@ -0,0 +1,261 @@
+import numpy as np
+
+LAYOUT_ITERATIONS = 60
+LAYOUT_SEED = 42
+# Repulsion is approximated through a grid of cell centroids (a one-level
+# Barnes-Hut scheme), so each iteration costs O(nodes x cells)
+LAYOUT_MAX_GRID = 24
+LAYOUT_CHUNK_SIZE = 2048
+
+
+def _initial_positions(communities: np.ndarray, rng: np.random.Generator):
+    """
+    Place community centers on a circle, largest community first, and
+    scatter each community's nodes around its center.
+    """
+    n = len(communities)
+    labels, sizes = np.unique(communities, return_counts=True)
+    order = labels[np.argsort(-sizes, kind="stable")]
+    slot = np.empty(labels.max() + 1, dtype=np.int64)
+    slot[order] = np.arange(len(order))
+
+    angle = 2 * np.pi * slot[communities] / max(len(order), 1)
+    radius = 0.0 if len(order) == 1 else 0.6
+    spread = np.sqrt(np.bincount(communities)[communities] / n)
+
+    positions = np.column_stack([radius * np.cos(angle), radius * np.sin(angle)])
+    positions += rng.normal(scale=0.3, size=(n, 2)) * spread[:, None]
+    return positions
+
+
+def _repulsion(positions: np.ndarray, k: float):
+    """
+    Approximate Fruchterman-Reingold repulsion: every node is pushed by the
+    centroid of each grid cell, weighted by the number of nodes in it.
+    """
+    n = len(positions)
+    grid = int(min(LAYOUT_MAX_GRID, max(1, np.sqrt(n) // 2)))
+    low = positions.min(axis=0)
+    span = np.maximum(positions.max(axis=0) - low, 1e-9)
+    cell_xy = np.minimum((grid * (positions - low) / span).astype(np.int64), grid - 1)
+    cell = cell_xy[:, 0] * grid + cell_xy[:, 1]
+
+    mass = np.bincount(cell, minlength=grid * grid).astype(float)
+    sum_x = np.bincount(cell, weights=positions[:, 0], minlength=grid * grid)
+    sum_y = np.bincount(cell, weights=positions[:, 1], minlength=grid * grid)
+    occupied = np.flatnonzero(mass)
+    mass, sum_x, sum_y = mass[occupied], sum_x[occupied], sum_y[occupied]
+    own = np.searchsorted(occupied, cell)
+
+    displacement = np.zeros_like(positions)
+    for start in range(0, n, LAYOUT_CHUNK_SIZE):
+        chunk = slice(start, start + LAYOUT_CHUNK_SIZE)
+        rows = np.arange(len(positions[chunk]))
+
+        # Remove each node from its own cell before using the centroid
+        cell_mass = np.broadcast_to(mass, (len(rows), len(mass))).copy()
+        cell_x = np.broadcast_to(sum_x, cell_mass.shape).copy()
+        cell_y = np.broadcast_to(sum_y, cell_mass.shape).copy()
+        cell_mass[rows, own[chunk]] -= 1
+        cell_x[rows, own[chunk]] -= positions[chunk, 0]
+        cell_y[rows, own[chunk]] -= positions[chunk, 1]
+
+        has_mass = cell_mass > 0
+        centroid_x = np.divide(cell_x, cell_mass, out=np.zeros_like(cell_x), where=has_mass)
+        centroid_y = np.divide(cell_y, cell_mass, out=np.zeros_like(cell_y), where=has_mass)
+        dx = positions[chunk, 0:1] - centroid_x
+        dy = positions[chunk, 1:2] - centroid_y
+        dist_sq = np.maximum(dx * dx + dy * dy, 1e-6)
+        strength = np.where(has_mass, k * k * cell_mass / dist_sq, 0.0)
+        displacement[chunk, 0] = (dx * strength).sum(axis=1)
+        displacement[chunk, 1] = (dy * strength).sum(axis=1)
+
+    return displacement
+
+
+def force_layout(communities: np.ndarray, sources: np.ndarray, targets: np.ndarray):
+    """
+    Fruchterman-Reingold layout with grid-approximated repulsion.
+
+    Args:
+        communities: Community id per node, used to seed positions
+        sources: Edge source node indices
+        targets: Edge target node indices
+
+    Returns an (n, 2) array scaled into [-1, 1]. The result depends only on
+    the inputs, so the same network always gets the same coordinates.
+    """
+    n = len(communities)
+    if n == 0:
+        return np.zeros((0, 2))
+
+    rng = np.random.default_rng(LAYOUT_SEED)
+    positions = _initial_positions(np.asarray(communities, dtype=np.int64), rng)
+    k = np.sqrt(4.0 / n)
+    temperature = 0.1
+
+    for step in range(LAYOUT_ITERATIONS):
+        displacement = _repulsion(positions, k)
+
+        # Attraction along edges: d^2 / k
+        delta = positions[sources] - positions[targets]
+        dist = np.maximum(np.sqrt((delta * delta).sum(axis=1)), 1e-9)
+        pull = delta * (dist / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] -= np.bincount(sources, weights=pull[:, axis], minlength=n)
+            displacement[:, axis] += np.bincount(targets, weights=pull[:, axis], minlength=n)
+
+        # Limit movement by the current temperature
+        length = np.maximum(np.sqrt((displacement * displacement).sum(axis=1)), 1e-9)
+        cooling = temperature * (1 - step / LAYOUT_ITERATIONS)
+        positions += displacement * (np.minimum(length, cooling) / length)[:, None]
+
+    positions -= positions.mean(axis=0)
+    scale = np.abs(positions).max()
+    return positions / scale if scale > 0 else positions
+
+
+def network_layout(network: dict):
+    """
+    Compute force-directed coordinates for a network payload with
+    "nodes" (id, community) and "links" (source, target).
+
+    Returns arrays aligned with the payload's node order.
+    """
+    ids = [str(node["id"]) for node in network["nodes"]]
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    communities = np.array([node.get("community", 0) for node in network["nodes"]], dtype=np.int64)
+
+    edges = np.array(
+        [
+            (index[str(link["source"])], index[str(link["target"])])
+            for link in network["links"]
+            if str(link["source"]) in index and str(link["target"]) in index
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+    positions = force_layout(communities, edges[:, 0], edges[:, 1])
+
+    return {
+        "ids": ids,
+        "x": np.round(positions[:, 0], 4).tolist(),
+        "y": np.round(positions[:, 1], 4).tolist(),
+    }
+
+
+# Radial layout for hierarchical edge bundling
+BUNDLING_STRENGTH = 0.85
+COMMUNITY_GAP = 0.02  # radians between neighbouring communities
+COMMUNITY_RADIUS = 0.6  # radius of community anchor points (leaves sit on 1.0)
+
+
+def _straighten(points: np.ndarray, beta: float):
+    """
+    Holten's bundling-strength adjustment: pull each control point of a
+    path toward the straight line between its endpoints by (1 - beta).
+    """
+    steps = points.shape[1] - 1
+    t = (np.arange(points.shape[1]) / steps)[None, :, None]
+    line = points[:, :1] + t * (points[:, -1:] - points[:, :1])
+    return beta * points + (1 - beta) * line
+
+
+def edge_bundling_geometry(network: dict, beta: float = BUNDLING_STRENGTH):
+    """
+    Compute radial node angles grouped by community and bundled spline
+    control points for every link of a hierarchical network payload.
+
+    Leaves sit on the unit circle, communities on an inner ring and the
+    root at the origin. A link inside one community bends through that
+    community's anchor; a link across communities runs leaf -> community
+    -> root -> community -> leaf.
+
+    Returns compact arrays: "angles" aligned with the payload's nodes,
+    full community membership via "order" + per-community offsets, and
+    each link's interior control points as a flat [x, y, ...] list sliced
+    by "link_offsets" (in points). Endpoints are implied by node angles.
+    """
+    nodes = network["nodes"]
+    n = len(nodes)
+    ids = [str(node["id"]) for node in nodes]
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    communities = np.array([node.get("community", 0) for node in nodes], dtype=np.int64)
+    citations = np.array([node.get("citation_count", 0) for node in nodes], dtype=np.int64)
+
+    # Order leaves by community, most-cited first inside each community
+    order = np.lexsort((-citations, communities))
+    labels, offsets, sizes = np.unique(communities[order], return_index=True, return_counts=True)
+
+    usable = 2 * np.pi - COMMUNITY_GAP * len(labels)
+    step = usable / max(n, 1)
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+    group = np.searchsorted(labels, communities)
+    angles = rank * step + group * COMMUNITY_GAP + step / 2
+
+    community_start = offsets * step + np.arange(len(labels)) * COMMUNITY_GAP
+    community_mid = community_start + sizes * step / 2
+    anchor = COMMUNITY_RADIUS * np.column_stack([np.cos(community_mid), np.sin(community_mid)])
+    leaf = np.column_stack([np.cos(angles), np.sin(angles)])
+
+    edges = np.array(
+        [
+            (index[str(link["source"])], index[str(link["target"])])
+            for link in network["links"]
+            if str(link["source"]) in index and str(link["target"]) in index
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    source_group, target_group = group[edges[:, 0]], group[edges[:, 1]]
+    same = source_group == target_group
+
+    # Same community: leaf -> anchor -> leaf
+    intra = np.stack([leaf[edges[same, 0]], anchor[source_group[same]], leaf[edges[same, 1]]], axis=1)
+    intra = _straighten(intra, beta)[:, 1:-1]
+
+    # Across communities: leaf -> anchor -> root -> anchor -> leaf
+    cross = ~same
+    root = np.zeros((int(cross.sum()), 2))
+    inter = np.stack(
+        [
+            leaf[edges[cross, 0]],
+            anchor[source_group[cross]],
+            root,
+            anchor[target_group[cross]],
+            leaf[edges[cross, 1]],
+        ],
+        axis=1,
+    )
+    inter = _straighten(inter, beta)[:, 1:-1]
+
+    # Interleave back into link order
+    point_counts = np.where(same, 1, 3)
+    link_offsets = np.zeros(len(edges) + 1, dtype=np.int64)
+    np.cumsum(point_counts, out=link_offsets[1:])
+    points = np.zeros((int(link_offsets[-1]), 2))
+    intra_at = link_offsets[:-1][same]
+    points[intra_at] = intra[:, 0]
+    inter_at = link_offsets[:-1][cross]
+    for j in range(3):
+        points[inter_at + j] = inter[:, j]
+
+    return {
+        "ids": ids,
+        "angles": np.round(angles, 5).tolist(),
+        "order": order.tolist(),
+        "communities": {
+            "ids": labels.tolist(),
+            "offsets": offsets.tolist(),
+            "sizes": sizes.tolist(),
+            "start_angles": np.round(community_start, 5).tolist(),
+            "end_angles": np.round(community_start + sizes * step, 5).tolist(),
+        },
+        "links": {
+            "source": edges[:, 0].tolist(),
+            "target": edges[:, 1].tolist(),
+            "link_offsets": link_offsets.tolist(),
+            "control_points": np.round(points, 4).reshape(-1).tolist(),
+        },
+        "beta": beta,
+    }
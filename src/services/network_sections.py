@@ -0,0 +1,121 @@
+from bisect import bisect_right
+
+from src.cache import (
+    CACHE_TTL_SECONDS,
+    cache_json_sections,
+    get_cached_json,
+    get_cached_sections,
+    refresh_sections_ttl,
+)
+
+# A hierarchical network is cached as a small head (year range, community
+# summary, block boundaries) plus node and link sections per block of
+# communities, so a request reads only the sections it needs. Communities
+# are packed in order into blocks of about NETWORK_BLOCK_NODES nodes; a
+# community is never split, so large ones get a block of their own.
+NETWORK_PARTS = ("summary", "nodes", "links")
+NETWORK_BLOCK_NODES = 500
+
+
+def split_network(data: dict):
+    """
+    Split a hierarchical network payload into (head, sections). Nodes and
+    links must be grouped by (source) community, as the builder emits them.
+    """
+    block_starts = []
+    filled = NETWORK_BLOCK_NODES
+    for community in data["communities"]:
+        if filled >= NETWORK_BLOCK_NODES:
+            block_starts.append(community["id"])
+            filled = 0
+        filled += community["size"]
+
+    sections = {}
+    for part, community_field in (("nodes", "community"), ("links", "source_community")):
+        for block in range(len(block_starts)):
+            sections[f"{part}:{block}"] = []
+        for item in data[part]:
+            sections[f"{part}:{bisect_right(block_starts, item[community_field]) - 1}"].append(item)
+
+    head = {
+        "communities": data["communities"],
+        "total_communities": data["total_communities"],
+        "year_range": data["year_range"],
+        "block_starts": block_starts,
+    }
+    return head, sections
+
+
+def assemble_network(head: dict, sections: dict, parts=NETWORK_PARTS, community: int | None = None):
+    """
+    Build a response from the head and the node/link sections read for it.
+    With `community`, nodes are those of the community and links those
+    leaving it.
+    """
+    result = {}
+    for part, community_field in (("nodes", "community"), ("links", "source_community")):
+        if part not in parts:
+            continue
+        items = [item for name, block in sections.items() if name.startswith(f"{part}:") for item in block]
+        if community is not None:
+            items = [item for item in items if item[community_field] == community]
+        result[part] = items
+
+    if "summary" in parts:
+        result["communities"] = head["communities"] if community is None else [head["communities"][community]]
+    result["total_communities"] = head["total_communities"]
+    result["year_range"] = head["year_range"]
+    if community is not None:
+        result["community"] = community
+    return result
+
+
+def _section_names(head: dict, parts, community: int | None):
+    """Sections holding the requested parts (all blocks, or the community's block)."""
+    if community is None:
+        blocks = range(len(head["block_starts"]))
+    else:
+        blocks = [bisect_right(head["block_starts"], community) - 1]
+    return [f"{part}:{block}" for part in ("nodes", "links") if part in parts for block in blocks]
+
+
+async def cache_network(key: str, data: dict, ttl: int | None = None):
+    """Cache a hierarchical network payload as a head and per-block sections."""
+    head, sections = split_network(data)
+    await cache_json_sections(key, head, sections, ttl=ttl)
+
+
+async def get_cached_network(key: str, parts=NETWORK_PARTS, community: int | None = None):
+    """
+    Read the requested parts of a cached hierarchical network, or None if
+    it (or one of the needed sections) is not cached.
+
+    Raises:
+        ValueError: If `community` is not a community of the network
+    """
+    head = await get_cached_json(key)
+    if not head:
+        return None
+    if "block_starts" not in head:
+        # Whole payload cached before networks were split into sections
+        head, sections = split_network(head)
+    else:
+        sections = None
+
+    if community is not None and not 0 <= community < head["total_communities"]:
+        raise ValueError(f"Unknown community {community}; the network has {head['total_communities']}")
+
+    names = _section_names(head, parts, community)
+    if sections is None:
+        values = await get_cached_sections(key, head, names)
+        if any(value is None for value in values):
+            return None
+        sections = dict(zip(names, values))
+    else:
+        sections = {name: sections[name] for name in names}
+    return assemble_network(head, sections, parts, community)
+
+
+async def refresh_network_ttl(key: str, ttl: int = CACHE_TTL_SECONDS):
+    """Extend the expiry of a cached network and all its sections. Returns False if any is gone."""
+    return await refresh_sections_ttl(key, ttl)
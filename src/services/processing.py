@@ -1,17 +1,43 @@
+import asyncio
+from typing import Callable
+
 import networkx as nx
+import numpy as np
+from src.cohorts import DEFAULT_COHORT, cohort_filter
 from src.database import get_db
+from src.snapshot import Snapshot, build_snapshot_arrays, get_snapshot
+from src.timing import StageTimer, profile_thread, span, timed
+from src.services.analytics import build_analytics_cube
+from src.services.centrality import METRIC_NAMES, centrality_table, rank_metrics
+from src.services.flows import build_citation_flows
+
+METRICS_TOP_LIMIT = 200
+
+# Progress stages reported by compute_hierarchical_citation_network and
+# compute_centrality_metrics
+HIERARCHICAL_STAGES = ("load", "build", "filter", "communities", "serialize")
+METRICS_STAGES = ("load", "centrality")
+
+# Lower edges of the patent count histogram bins; the last bin is open-ended
+DEFAULT_PATENT_BINS = [0, 1, 2, 3, 5, 10, 20]
 
 
-async def compute_citation_network():
+@timed("compute.citation_network")
+async def compute_citation_network(cohort: str = DEFAULT_COHORT):
     """
     Build citation network for papers (2020-2022).
     Filter to nodes with citation_count > 5 OR in_degree > 1.
     """
     db = await get_db()
+    in_cohort = await cohort_filter(db, cohort)
+    papers_sql, papers_params = in_cohort.papers("p")
+    citing_sql, citing_params = in_cohort.papers("p1")
+    cited_sql, cited_params = in_cohort.papers("p2")
 
     # Get papers from 2020-2022
     papers_cursor = await db.execute(
-        "SELECT paper_id, title, citation_count FROM papers WHERE year >= 2020 AND year <= 2022"
+        "SELECT paper_id, title, citation_count FROM papers p WHERE year >= 2020 AND year <= 2022" + papers_sql,
+        papers_params,
     )
     papers = await papers_cursor.fetchall()
 
@@ -24,12 +50,19 @@ async def compute_citation_network():
         JOIN papers p2 ON pr.reference_id = p2.paper_id
         WHERE p1.year >= 2020 AND p1.year <= 2022
         AND p2.year >= 2020 AND p2.year <= 2022
-        """
+        """ + citing_sql + cited_sql,
+        citing_params + cited_params,
     )
     links = await links_cursor.fetchall()
 
     await db.close()
 
+    # Graph work is CPU-bound; run it off the event loop
+    return await asyncio.to_thread(profile_thread(_build_citation_network), papers, links)
+
+
+def _build_citation_network(papers, links):
+    """Build the filtered citation network payload from fetched rows."""
     # Build directed graph
     G = nx.DiGraph()
 
@@ -93,12 +126,16 @@ async def compute_citation_network():
     }
 
 
-async def compute_collaboration_network():
+@timed("compute.collaboration_network")
+async def compute_collaboration_network(cohort: str = DEFAULT_COHORT):
     """
     Build collaboration network for papers (2020-2022).
     Filter to nodes with degree > 2.
     """
     db = await get_db()
+    in_cohort = await cohort_filter(db, cohort)
+    papers_sql, papers_params = in_cohort.papers("p")
+    authors_sql, authors_params = in_cohort.authors("paa")
 
     # Get paper-author affiliations for 2020-2022 papers
     cursor = await db.execute(
@@ -107,12 +144,19 @@ async def compute_collaboration_network():
         FROM paper_author_affiliations paa
         JOIN papers p ON paa.paper_id = p.paper_id
         WHERE p.year >= 2020 AND p.year <= 2022
-        """
+        """ + papers_sql + authors_sql,
+        papers_params + authors_params,
     )
     affiliations = await cursor.fetchall()
 
     await db.close()
 
+    # Graph work is CPU-bound; run it off the event loop
+    return await asyncio.to_thread(profile_thread(_build_collaboration_network), affiliations)
+
+
+def _build_collaboration_network(affiliations):
+    """Build the filtered collaboration network payload from fetched rows."""
     # Build undirected graph
     G = nx.Graph()
 
@@ -168,16 +212,22 @@ async def compute_collaboration_network():
     }
 
 
-async def compute_community_network():
+@timed("compute.community_network")
+async def compute_community_network(cohort: str = DEFAULT_COHORT):
     """
     Run Louvain community detection on full citation graph.
     Return hierarchical JSON for D3.js.
     """
     db = await get_db()
+    in_cohort = await cohort_filter(db, cohort)
+    papers_sql, papers_params = in_cohort.papers("p")
+    citing_sql, citing_params = in_cohort.papers("p1")
+    cited_sql, cited_params = in_cohort.papers("p2")
 
     # Get papers from 2020-2022
     papers_cursor = await db.execute(
-        "SELECT paper_id, title FROM papers WHERE year >= 2020 AND year <= 2022"
+        "SELECT paper_id, title FROM papers p WHERE year >= 2020 AND year <= 2022" + papers_sql,
+        papers_params,
     )
     papers = await papers_cursor.fetchall()
 
@@ -190,12 +240,19 @@ async def compute_community_network():
         JOIN papers p2 ON pr.reference_id = p2.paper_id
         WHERE p1.year >= 2020 AND p1.year <= 2022
         AND p2.year >= 2020 AND p2.year <= 2022
-        """
+        """ + citing_sql + cited_sql,
+        citing_params + cited_params,
     )
     links = await links_cursor.fetchall()
 
     await db.close()
 
+    # Graph work is CPU-bound; run it off the event loop
+    return await asyncio.to_thread(profile_thread(_build_community_network), papers, links)
+
+
+def _build_community_network(papers, links):
+    """Build the community hierarchy payload from fetched rows."""
     # Build directed graph (convert to undirected for community detection)
     G = nx.DiGraph()
 
@@ -233,20 +290,24 @@ async def compute_community_network():
     }
 
 
-async def compute_papers_by_year():
+@timed("compute.papers_by_year")
+async def compute_papers_by_year(cohort: str = DEFAULT_COHORT):
     """
     Count papers by year (2013-2022).
     """
     db = await get_db()
+    papers_sql, papers_params = (await cohort_filter(db, cohort)).papers("p")
 
     cursor = await db.execute(
         """
         SELECT year, COUNT(paper_id) as count
-        FROM papers
+        FROM papers p
         WHERE year >= 2013 AND year <= 2022
+        """ + papers_sql + """
         GROUP BY year
         ORDER BY year
-        """
+        """,
+        papers_params,
     )
     rows = await cursor.fetchall()
 
@@ -255,15 +316,79 @@ async def compute_papers_by_year():
     return [{"year": row["year"], "count": row["count"]} for row in rows]
 
 
-async def compute_patents_for_year(year: int):
+@timed("compute.analytics_cube")
+async def compute_analytics_cube(cohort: str = DEFAULT_COHORT):
+    """
+    Build the year x field x metric aggregate cube (2013-2022) used by
+    the generic timeline aggregation endpoint.
+    """
+    db = await get_db()
+    in_cohort = await cohort_filter(db, cohort)
+    papers_sql, papers_params = in_cohort.papers("p")
+    authors_sql, authors_params = in_cohort.authors("paa")
+    fields_sql, fields_params = in_cohort.fields("pf")
+
+    papers_cursor = await db.execute(
+        """
+        SELECT p.paper_id, p.year,
+               COALESCE(p.citation_count, 0) AS citation_count,
+               COALESCE(p.patent_count, 0) AS patent_count,
+               COUNT(DISTINCT paa.author_id) AS author_count
+        FROM papers p
+        LEFT JOIN paper_author_affiliations paa ON paa.paper_id = p.paper_id""" + authors_sql + """
+        WHERE p.year >= 2013 AND p.year <= 2022""" + papers_sql + """
+        GROUP BY p.paper_id
+        """,
+        authors_params + papers_params,
+    )
+    papers = await papers_cursor.fetchall()
+
+    fields_cursor = await db.execute(
+        "SELECT paper_id, field_id FROM paper_fields pf WHERE 1" + fields_sql, fields_params
+    )
+    paper_fields = await fields_cursor.fetchall()
+
+    await db.close()
+
+    papers_array = np.array([tuple(row) for row in papers], dtype=np.int64)
+    fields_array = np.array([tuple(row) for row in paper_fields], dtype=np.int64)
+    field_ids = np.unique(fields_array.reshape(-1, 2)[:, 1]).tolist()
+
+    return build_analytics_cube(papers_array, fields_array, field_ids)
+
+
+@timed("compute.citation_flows")
+async def compute_citation_flows(cohort: str = DEFAULT_COHORT):
+    """
+    Build the year x source x target citation flow tensors between fields
+    and between citation communities (2013-2022) for the /flows endpoint.
+    """
+    db = await get_db()
+    cursor = await db.execute("SELECT field_id, field_name FROM fields")
+    field_names = {row["field_id"]: row["field_name"] for row in await cursor.fetchall()}
+    await db.close()
+
+    # The snapshot holds the default cohort; other cohorts get the same arrays in memory
+    snapshot = get_snapshot() if cohort == DEFAULT_COHORT else None
+    if snapshot is None:
+        with span("sql"):
+            snapshot = Snapshot.from_arrays(await build_snapshot_arrays(cohort))
+
+    # Louvain is CPU-bound; run it off the event loop
+    return await asyncio.to_thread(profile_thread(build_citation_flows), snapshot, field_names)
+
+
+@timed("compute.patents_for_year")
+async def compute_patents_for_year(year: int, cohort: str = DEFAULT_COHORT):
     """
     Get patent counts for specific year.
     """
     db = await get_db()
+    papers_sql, papers_params = (await cohort_filter(db, cohort)).papers("p")
 
     cursor = await db.execute(
-        "SELECT patent_count FROM papers WHERE year = ? AND patent_count IS NOT NULL",
-        (year,)
+        "SELECT patent_count FROM papers p WHERE year = ? AND patent_count IS NOT NULL" + papers_sql,
+        (year, *papers_params)
     )
     rows = await cursor.fetchall()
 
@@ -272,21 +397,115 @@ async def compute_patents_for_year(year: int):
     return [row["patent_count"] for row in rows]
 
 
-async def compute_hierarchical_citation_network(year_start: int = 2018, year_end: int = 2022):
+def summarize_patent_counts(counts: list[int], bins: list[int] = DEFAULT_PATENT_BINS):
     """
-    Build citation network with hierarchical structure for edge bundling.
-    Returns data optimized for radial layout with community-based hierarchy.
-    
+    Bin patent counts into a histogram and compute summary statistics.
+
     Args:
-        year_start: Starting year for the network (inclusive)
-        year_end: Ending year for the network (inclusive)
+        counts: Patent count per paper
+        bins: Increasing lower bin edges; the last bin is open-ended
+    """
+    values = np.asarray(counts, dtype=np.int64)
+    edges = np.asarray(bins, dtype=np.int64)
+    bin_index = np.searchsorted(edges, values, side="right") - 1
+    # Values below the first edge fall outside every bin
+    histogram = np.bincount(bin_index[bin_index >= 0], minlength=len(edges))
+
+    if len(values):
+        p50, p90, p99 = np.percentile(values, [50, 90, 99]).tolist()
+        stats = {
+            "papers": int(len(values)),
+            "papers_with_patents": int(np.count_nonzero(values)),
+            "total": int(values.sum()),
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "max": int(values.max()),
+        }
+    else:
+        stats = {
+            "papers": 0, "papers_with_patents": 0, "total": 0, "mean": 0.0,
+            "std": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0,
+        }
+
+    return {
+        "bins": edges.tolist(),
+        "histogram": histogram.tolist(),
+        "stats": stats,
+    }
+
+
+@timed("compute.patent_summary_for_year")
+async def compute_patent_summary_for_year(
+    year: int, bins: list[int] = DEFAULT_PATENT_BINS, cohort: str = DEFAULT_COHORT
+):
+    """
+    Get the patent count histogram and summary statistics for a specific year.
     """
+    counts = await compute_patents_for_year(year, cohort)
+    return {"year": year, **summarize_patent_counts(counts, bins)}
+
+
+def _snapshot_citation_rows(snapshot, year_start: int, year_end: int):
+    """
+    Read papers and in-range citation links for a year range from the
+    memory-mapped snapshot, in the same shape as the SQLite rows.
+    """
+    mask = snapshot.year_mask(year_start, year_end)
+    papers = [
+        {
+            "paper_id": paper_id,
+            "title": snapshot.title(i),
+            "citation_count": citation_count,
+            "year": year,
+        }
+        for i, paper_id, citation_count, year in zip(
+            np.flatnonzero(mask).tolist(),
+            snapshot.paper_ids[mask].tolist(),
+            snapshot.citation_counts[mask].tolist(),
+            snapshot.years[mask].tolist(),
+        )
+    ]
+
+    citing, cited = snapshot.citation_links(mask)
+    links = [
+        {"paper_id": paper_id, "reference_id": reference_id}
+        for paper_id, reference_id in zip(
+            snapshot.paper_ids[citing].tolist(), snapshot.paper_ids[cited].tolist()
+        )
+    ]
+    return papers, links
+
+
+async def _fetch_citation_rows(year_start: int, year_end: int, cohort: str = DEFAULT_COHORT):
+    """
+    Fetch papers and in-range citation links for a year range, from the
+    snapshot when one has been built (it holds the default cohort),
+    otherwise from SQLite.
+    """
+    snapshot = get_snapshot() if cohort == DEFAULT_COHORT else None
+    if snapshot is not None:
+        with span("snapshot"):
+            return _snapshot_citation_rows(snapshot, year_start, year_end)
+
+    with span("sql"):
+        return await _query_citation_rows(year_start, year_end, cohort)
+
+
+async def _query_citation_rows(year_start: int, year_end: int, cohort: str = DEFAULT_COHORT):
+    """Query papers and in-range citation links for a year range from SQLite."""
     db = await get_db()
+    in_cohort = await cohort_filter(db, cohort)
+    papers_sql, papers_params = in_cohort.papers("p")
+    citing_sql, citing_params = in_cohort.papers("p1")
+    cited_sql, cited_params = in_cohort.papers("p2")
 
     # Get papers for the specified year range
     papers_cursor = await db.execute(
-        "SELECT paper_id, title, citation_count, year FROM papers WHERE year >= ? AND year <= ?",
-        (year_start, year_end)
+        "SELECT paper_id, title, citation_count, year FROM papers p WHERE year >= ? AND year <= ?" + papers_sql,
+        (year_start, year_end, *papers_params)
     )
     papers = await papers_cursor.fetchall()
 
@@ -299,14 +518,20 @@ async def compute_hierarchical_citation_network(year_start: int = 2018, year_end
         JOIN papers p2 ON pr.reference_id = p2.paper_id
         WHERE p1.year >= ? AND p1.year <= ?
         AND p2.year >= ? AND p2.year <= ?
-        """,
-        (year_start, year_end, year_start, year_end)
+        """ + citing_sql + cited_sql,
+        (year_start, year_end, year_start, year_end, *citing_params, *cited_params)
     )
     links = await links_cursor.fetchall()
 
     await db.close()
 
-    # Build directed graph
+    return papers, links
+
+
+def _build_citation_graph(papers, links):
+    """
+    Build a DiGraph from paper and citation link rows.
+    """
     G = nx.DiGraph()
 
     # Add nodes with attributes
@@ -322,6 +547,114 @@ async def compute_hierarchical_citation_network(year_start: int = 2018, year_end
         if link["paper_id"] in G and link["reference_id"] in G:
             G.add_edge(link["paper_id"], link["reference_id"])
 
+    return G
+
+
+@timed("compute.centrality_metrics")
+async def compute_centrality_metrics(
+    year_start: int = 2018,
+    year_end: int = 2022,
+    cohort: str = DEFAULT_COHORT,
+    progress: Callable[[str], None] | None = None,
+):
+    """
+    Compute PageRank, HITS and sampled betweenness on the citation graph
+    of a year range.
+
+    Returns column arrays for every paper in the range plus a ranked
+    top list per metric, so ranking at request time is a slice.
+
+    Args:
+        progress: Called with each stage name in METRICS_STAGES as it starts
+    """
+    if progress:
+        progress("load")
+    papers, links = await _fetch_citation_rows(year_start, year_end, cohort)
+
+    if progress:
+        progress("centrality")
+    # Graph work is CPU-bound; run it off the event loop
+    return await asyncio.to_thread(
+        profile_thread(_build_centrality_metrics), papers, links, year_start, year_end,
+    )
+
+
+def _build_centrality_metrics(papers, links, year_start, year_end):
+    """Build the centrality payload from fetched rows."""
+    G = _build_citation_graph(papers, links)
+    with span("centrality"):
+        table = centrality_table(G)
+
+    rankings = rank_metrics(table, METRICS_TOP_LIMIT)
+    top = {}
+    for metric in METRIC_NAMES:
+        top[metric] = []
+        for i in rankings[metric]:
+            node = G.nodes[int(table["paper_ids"][i])]
+            top[metric].append({
+                "id": table["paper_ids"][i],
+                "name": node["title"][:50] if node.get("title") else table["paper_ids"][i],
+                "citation_count": node.get("citation_count", 0),
+                "year": node.get("year", 0),
+                "score": table[metric][i],
+            })
+
+    return {
+        **table,
+        "top": top,
+        "year_range": {"start": year_start, "end": year_end},
+    }
+
+
+@timed("compute.hierarchical_citation_network")
+async def compute_hierarchical_citation_network(
+    year_start: int = 2018,
+    year_end: int = 2022,
+    metrics: dict | None = None,
+    progress: Callable[[str], None] | None = None,
+    cohort: str = DEFAULT_COHORT,
+):
+    """
+    Build citation network with hierarchical structure for edge bundling.
+    Returns data optimized for radial layout with community-based hierarchy.
+    
+    Args:
+        year_start: Starting year for the network (inclusive)
+        year_end: Ending year for the network (inclusive)
+        metrics: Output of compute_centrality_metrics for the same range,
+            added to each node. Left out when not supplied; centrality is
+            costly and /metrics/top computes it on its own.
+        progress: Called with each stage name in HIERARCHICAL_STAGES as it starts
+        cohort: Cohort whose papers form the network
+    """
+    timer = StageTimer("hierarchical")
+
+    def report(stage: str):
+        timer(stage)
+        if progress:
+            progress(stage)
+
+    report("load")
+    papers, links = await _fetch_citation_rows(year_start, year_end, cohort)
+
+    # Graph work is CPU-bound; run it off the event loop so cached requests keep being served
+    result = await asyncio.to_thread(
+        profile_thread(_build_hierarchical_citation_network),
+        papers, links, year_start, year_end, metrics, report,
+    )
+    timer.stop()
+    return result
+
+
+def _build_hierarchical_citation_network(papers, links, year_start, year_end, metrics, report):
+    """Build the hierarchical citation network payload from fetched rows."""
+    report("build")
+    G = _build_citation_graph(papers, links)
+
+    # Centrality is measured on the full range graph, before filtering
+    metric_index = {paper_id: i for i, paper_id in enumerate(metrics["paper_ids"])} if metrics else None
+
+    report("filter")
     # Filter: keep nodes with citation_count > 5 OR in_degree > 1
     filtered_nodes = set()
     for node in G.nodes():
@@ -333,10 +666,12 @@ async def compute_hierarchical_citation_network(year_start: int = 2018, year_end
     # Create subgraph
     G_filtered = G.subgraph(filtered_nodes)
 
+    report("communities")
     # Run community detection on filtered graph
     G_undirected = G_filtered.to_undirected()
     communities = nx.algorithms.community.louvain_communities(G_undirected)
     
+    report("serialize")
     # Sort communities by size for consistent ordering
     communities = sorted(communities, key=len, reverse=True)
     
@@ -347,22 +682,28 @@ async def compute_hierarchical_citation_network(year_start: int = 2018, year_end
             node_to_community[node] = community_id
 
     # Build hierarchical structure for edge bundling
-    # Format: nodes with hierarchical path info
+    # Format: nodes with hierarchical path info. Nodes and links are grouped
+    # by (source) community so the cached per-community sections
+    # (network_sections.py) concatenate back to the same payload.
     nodes = []
-    for node in G_filtered.nodes():
+    for node in sorted(G_filtered.nodes(), key=lambda node: node_to_community.get(node, 0)):
         community_id = node_to_community.get(node, 0)
-        nodes.append({
+        entry = {
             "id": str(node),
             "name": G_filtered.nodes[node]["title"][:50] if G_filtered.nodes[node].get("title") else str(node),
             "community": community_id,
             "citation_count": G_filtered.nodes[node].get("citation_count", 0),
             "degree": G_filtered.degree(node),
-            "year": G_filtered.nodes[node].get("year", 0)
-        })
+            "year": G_filtered.nodes[node].get("year", 0),
+        }
+        if metric_index is not None:
+            i = metric_index.get(str(node))
+            entry.update({metric: metrics[metric][i] if i is not None else 0.0 for metric in METRIC_NAMES})
+        nodes.append(entry)
 
     # Build links
     links_out = []
-    for u, v in G_filtered.edges():
+    for u, v in sorted(G_filtered.edges(), key=lambda edge: node_to_community.get(edge[0], 0)):
         links_out.append({
             "source": str(u),
             "target": str(v),
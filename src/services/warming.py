@@ -0,0 +1,192 @@
+import asyncio
+import re
+from functools import partial
+
+from src.cache import (
+    CACHE_TTL_SECONDS,
+    access_counts,
+    acquire_lock,
+    cache_exists_many,
+    cache_json,
+    decay_access_stats,
+    lock_held,
+    release_lock,
+    top_accessed_keys,
+)
+from src.cohorts import cohort_ids, cohort_key, split_cohort_key
+
+WARM_TOP_N = 20
+WARM_INTERVAL_SECONDS = 300
+# Access counts are multiplied by this every cycle so popularity tracks recent use
+ACCESS_DECAY = 0.9
+
+HIERARCHICAL_KEY_PREFIX = "net:hierarchical-citation:"
+HIERARCHICAL_KEY_PATTERN = re.compile(r"^net:hierarchical-citation:(\d{4})-(\d{4})$")
+
+
+def parse_range_key(key: str):
+    """Return (year_start, year_end) for a per-range network key, else None."""
+    match = HIERARCHICAL_KEY_PATTERN.match(key)
+    if not match:
+        return None
+    year_start, year_end = int(match.group(1)), int(match.group(2))
+    if not (2013 <= year_start <= year_end <= 2022):
+        return None
+    return year_start, year_end
+
+
+async def warm_hot_ranges(top_n: int = WARM_TOP_N):
+    """
+    Keep the most-requested hierarchical network ranges of every cohort
+    cached: extend the TTL of those still present and recompute those that
+    expired or were evicted, through the job queue so they share its
+    concurrency limit.
+    """
+    from src.services.jobs import JobQueueFullError, submit_network_job
+    from src.services.network_sections import refresh_network_ttl
+
+    hot = []
+    for key, _ in await top_accessed_keys("", None):
+        cohort, plain_key = split_cohort_key(key)
+        year_range = parse_range_key(plain_key)
+        if year_range is not None:
+            hot.append((key, cohort, year_range))
+        if len(hot) == top_n:
+            break
+
+    jobs = {}
+    for key, cohort, year_range in hot:
+        if await refresh_network_ttl(key):
+            continue
+
+        try:
+            jobs[key] = submit_network_job(*year_range, cohort)
+        except JobQueueFullError:
+            # Leave the rest for the next cycle rather than crowd out requests
+            break
+        print(f"Warming {key}...")
+
+    for job in jobs.values():
+        await job.done.wait()
+    return [key for key, job in jobs.items() if job.status == "done"]
+
+
+async def run_cache_warmer(interval: int = WARM_INTERVAL_SECONDS):
+    """Background loop that re-warms popular ranges and decays access counts."""
+    while True:
+        try:
+            warmed = await warm_hot_ranges()
+            if warmed:
+                print(f"Cache warmer recomputed {len(warmed)} ranges")
+            await decay_access_stats(ACCESS_DECAY)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Cache warmer cycle failed: {e}")
+        await asyncio.sleep(interval)
+
+
+# Keys every route expects. Missing ones are rebuilt at startup.
+DEFAULT_RANGE = (2020, 2022)
+HEAL_LOCK_TTL_SECONDS = 1800
+
+HEAL_LOCK = "cache-heal"
+
+_heal_state = {"current": None}
+
+
+async def required_cache_keys():
+    """
+    Map each required cache key, for every cohort, to (builder, ttl, store).
+    Builders are zero-argument coroutine functions returning the value that
+    `store` caches.
+    """
+    from src.services import processing
+    from src.services.jobs import build_network
+    from src.services.network_sections import cache_network
+
+    keys = {}
+    for cohort in await cohort_ids():
+        def key(name: str):
+            return cohort_key(name, cohort)
+
+        keys.update({
+            key("data:timeline"): (partial(processing.compute_papers_by_year, cohort), None, cache_json),
+            key("data:analytics-cube"): (partial(processing.compute_analytics_cube, cohort), None, cache_json),
+            key("data:citation-flows"): (partial(processing.compute_citation_flows, cohort), None, cache_json),
+            key("net:citation"): (partial(processing.compute_citation_network, cohort), None, cache_json),
+            key("net:collaboration"): (partial(processing.compute_collaboration_network, cohort), None, cache_json),
+            key("net:citation-community"): (partial(processing.compute_community_network, cohort), None, cache_json),
+            key(f"{HIERARCHICAL_KEY_PREFIX}{DEFAULT_RANGE[0]}-{DEFAULT_RANGE[1]}"): (
+                partial(build_network, *DEFAULT_RANGE, cohort),
+                CACHE_TTL_SECONDS,
+                cache_network,
+            ),
+        })
+        for year in range(2013, 2023):
+            keys[key(f"data:patents:{year}")] = (
+                partial(processing.compute_patents_for_year, year, cohort), None, cache_json,
+            )
+            keys[key(f"data:patents-summary:{year}")] = (
+                partial(processing.compute_patent_summary_for_year, year, cohort=cohort), None, cache_json,
+            )
+    return keys
+
+
+async def cache_readiness():
+    """Report how many required keys are cached and which are missing."""
+    keys = list(await required_cache_keys())
+    present = await cache_exists_many(keys)
+    healing = await lock_held(HEAL_LOCK)
+    missing = [key for key, exists in zip(keys, present) if not exists]
+    return {
+        "status": "ready" if not missing else "warming" if healing else "degraded",
+        "warm": len(keys) - len(missing),
+        "total": len(keys),
+        "warm_fraction": round((len(keys) - len(missing)) / len(keys), 3),
+        "missing": missing,
+        "rebuilding": _heal_state["current"],
+    }
+
+
+async def is_rebuilding(key: str):
+    """True if a worker is currently rebuilding missing required keys, including this one."""
+    return key in await required_cache_keys() and await lock_held(HEAL_LOCK)
+
+
+async def heal_missing_keys():
+    """
+    Recompute required keys missing from the cache (e.g. after Redis was
+    flushed), most-requested first. Only one worker process heals at a time.
+    """
+    keys = await required_cache_keys()
+    present = await cache_exists_many(list(keys))
+    missing = [key for key, exists in zip(keys, present) if not exists]
+    if not missing:
+        return []
+
+    token = await acquire_lock(HEAL_LOCK, HEAL_LOCK_TTL_SECONDS)
+    if not token:
+        print("Another worker is rebuilding missing cache keys")
+        return []
+
+    counts = await access_counts(missing)
+    missing = [key for _, key in sorted(zip(counts, missing), key=lambda pair: -pair[0])]
+    print(f"Rebuilding {len(missing)} missing cache keys in the background...")
+
+    rebuilt = []
+    try:
+        for key in missing:
+            _heal_state["current"] = key
+            builder, ttl, store = keys[key]
+            try:
+                await store(key, await builder(), ttl=ttl)
+                rebuilt.append(key)
+                print(f"  Rebuilt {key}")
+            except Exception as e:
+                print(f"  Failed to rebuild {key}: {e}")
+    finally:
+        _heal_state["current"] = None
+        await release_lock(HEAL_LOCK, token)
+
+    return rebuilt
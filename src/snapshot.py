@@ -0,0 +1,291 @@
+import json
+import mmap
+import os
+import time
+
+import numpy as np
+from src.cohorts import DEFAULT_COHORT, cohort_filter
+from src.database import DB_PATH, get_db
+
+# Read-only binary snapshot of the paper graph, written by
+# src/scripts/build_snapshot.py and memory-mapped by every worker so the OS
+# page cache holds a single shared copy.
+#
+# Layout: MAGIC, uint32 header length, JSON header, then each array at an
+# ALIGNMENT-byte boundary. The header records version, dtype, shape and offset
+# of every array, and the fingerprint of the database it was built from; a
+# snapshot whose database has changed since is ignored.
+SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH", "data/snapshot.bin")
+SNAPSHOT_VERSION = 2
+MAGIC = b"SCISNAP\0"
+ALIGNMENT = 64
+
+# Arrays are indexed by paper position (papers sorted by paper_id) unless noted:
+#   paper_ids, years, citation_counts, patent_counts
+#   title_offsets / title_bytes         UTF-8 titles, offsets has n_papers + 1 entries
+#   ref_indptr / ref_indices            CSR of references (citing -> cited position)
+#   author_indptr / author_indices      CSR of paper -> author position
+#   author_ids                          sorted author ids
+#   author_paper_indptr / author_paper_indices   CSR of author position -> paper position
+#   field_ids                           field id of each bit in field_bits
+#   field_bits                          (n_papers, n_words) uint64 bitsets
+SNAPSHOT_ARRAYS = (
+    "paper_ids", "years", "citation_counts", "patent_counts",
+    "title_offsets", "title_bytes",
+    "ref_indptr", "ref_indices",
+    "author_indptr", "author_indices", "author_ids",
+    "author_paper_indptr", "author_paper_indices",
+    "field_ids", "field_bits",
+)
+
+
+def _csr(rows: np.ndarray, cols: np.ndarray, n_rows: int):
+    """Build (indptr, indices) from parallel row/column position arrays."""
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32)
+
+
+def _positions(ids: np.ndarray, sorted_ids: np.ndarray):
+    """Positions of `ids` in `sorted_ids`, and a mask of which ids were found."""
+    pos = np.searchsorted(sorted_ids, ids)
+    pos = np.minimum(pos, max(len(sorted_ids) - 1, 0))
+    found = sorted_ids[pos] == ids if len(sorted_ids) else np.zeros(len(ids), dtype=bool)
+    return pos, found
+
+
+async def build_snapshot_arrays(cohort: str = DEFAULT_COHORT):
+    """Read a cohort (the default one for the snapshot file) of the SQLite database into the snapshot arrays."""
+    db = await get_db()
+    in_cohort = await cohort_filter(db, cohort)
+    papers_sql, papers_params = in_cohort.papers("p")
+    authors_sql, authors_params = in_cohort.authors("paa")
+    fields_sql, fields_params = in_cohort.fields("pf")
+
+    cursor = await db.execute(
+        "SELECT paper_id, year, COALESCE(citation_count, 0), COALESCE(patent_count, 0), title "
+        "FROM papers p WHERE 1" + papers_sql + " ORDER BY paper_id",
+        papers_params,
+    )
+    papers = await cursor.fetchall()
+    cursor = await db.execute("SELECT paper_id, reference_id FROM paper_references")
+    references = np.array([tuple(row) for row in await cursor.fetchall()], dtype=np.int64).reshape(-1, 2)
+    cursor = await db.execute(
+        "SELECT DISTINCT paper_id, author_id FROM paper_author_affiliations paa WHERE 1" + authors_sql,
+        authors_params,
+    )
+    authorships = np.array([tuple(row) for row in await cursor.fetchall()], dtype=np.int64).reshape(-1, 2)
+    cursor = await db.execute(
+        "SELECT DISTINCT paper_id, field_id FROM paper_fields pf WHERE 1" + fields_sql, fields_params
+    )
+    paper_fields = np.array([tuple(row) for row in await cursor.fetchall()], dtype=np.int64).reshape(-1, 2)
+
+    await db.close()
+
+    n = len(papers)
+    paper_ids = np.array([row[0] for row in papers], dtype=np.int64)
+    titles = [(row[4] or "").encode("utf-8") for row in papers]
+    title_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(title) for title in titles], out=title_offsets[1:])
+
+    # References between papers in the dataset
+    citing, found_citing = _positions(references[:, 0], paper_ids)
+    cited, found_cited = _positions(references[:, 1], paper_ids)
+    keep = found_citing & found_cited
+    ref_indptr, ref_indices = _csr(citing[keep], cited[keep], n)
+
+    # Paper <-> author incidence in both directions
+    author_ids = np.unique(authorships[:, 1])
+    paper_pos, found = _positions(authorships[:, 0], paper_ids)
+    author_pos = np.searchsorted(author_ids, authorships[:, 1])
+    author_indptr, author_indices = _csr(paper_pos[found], author_pos[found], n)
+    author_paper_indptr, author_paper_indices = _csr(author_pos[found], paper_pos[found], len(author_ids))
+
+    # One bit per field
+    field_ids = np.unique(paper_fields[:, 1])
+    n_words = max(1, -(-len(field_ids) // 64))
+    field_bits = np.zeros((n, n_words), dtype=np.uint64)
+    paper_pos, found = _positions(paper_fields[:, 0], paper_ids)
+    bit = np.searchsorted(field_ids, paper_fields[found, 1])
+    np.bitwise_or.at(
+        field_bits,
+        (paper_pos[found], bit // 64),
+        np.left_shift(np.uint64(1), (bit % 64).astype(np.uint64)),
+    )
+
+    return {
+        "paper_ids": paper_ids,
+        "years": np.array([row[1] or 0 for row in papers], dtype=np.int16),
+        "citation_counts": np.array([row[2] for row in papers], dtype=np.int32),
+        "patent_counts": np.array([row[3] for row in papers], dtype=np.int32),
+        "title_offsets": title_offsets,
+        "title_bytes": np.frombuffer(b"".join(titles), dtype=np.uint8),
+        "ref_indptr": ref_indptr,
+        "ref_indices": ref_indices,
+        "author_indptr": author_indptr,
+        "author_indices": author_indices,
+        "author_ids": author_ids,
+        "author_paper_indptr": author_paper_indptr,
+        "author_paper_indices": author_paper_indices,
+        "field_ids": field_ids,
+        "field_bits": field_bits,
+    }
+
+
+def db_fingerprint(path: str = DB_PATH):
+    """
+    Size, modification time and SQLite file change counter of a database
+    file, or None if it does not exist.
+    """
+    try:
+        stat = os.stat(path)
+        with open(path, "rb") as f:
+            header = f.read(28)
+    except FileNotFoundError:
+        return None
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        # Bytes 24-27 of the SQLite header count committed transactions
+        "change_counter": int.from_bytes(header[24:28], "big") if len(header) == 28 else None,
+    }
+
+
+def write_snapshot(arrays: dict[str, np.ndarray], path: str = SNAPSHOT_PATH, fingerprint: dict | None = None):
+    """
+    Write arrays to a snapshot file. The file is written next to `path` and
+    renamed into place, so workers never map a partially written snapshot.
+
+    Args:
+        fingerprint: db_fingerprint() of the database the arrays were read
+            from, taken before reading; the current one when not given
+    """
+    entries = {}
+    offset = 0
+    for name in SNAPSHOT_ARRAYS:
+        array = np.ascontiguousarray(arrays[name])
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.time(),
+        "source": DB_PATH,
+        "source_fingerprint": fingerprint or db_fingerprint(),
+        "arrays": entries,
+    }).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 4 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint32(len(header)).tobytes())
+        f.write(header)
+        for name in SNAPSHOT_ARRAYS:
+            f.seek(data_start + entries[name]["offset"])
+            f.write(np.ascontiguousarray(arrays[name]).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return data_start + offset
+
+
+class Snapshot:
+    """
+    Read-only view of a snapshot file. Arrays are numpy views over a shared
+    memory map, so opening is O(1) and pages are loaded lazily on first use.
+
+    Raises:
+        ValueError: If the file is not a snapshot or has another version
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        header_length = int(np.frombuffer(self._mmap, dtype=np.uint32, count=1, offset=len(MAGIC))[0])
+        header_start = len(MAGIC) + 4
+        self.header = json.loads(self._mmap[header_start:header_start + header_length])
+        if self.header["version"] != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"{path} has snapshot version {self.header['version']}, expected {SNAPSHOT_VERSION}"
+            )
+
+        data_start = -(-(header_start + header_length) // ALIGNMENT) * ALIGNMENT
+        for name, entry in self.header["arrays"].items():
+            dtype = np.dtype(entry["dtype"])
+            count = int(np.prod(entry["shape"], dtype=np.int64))
+            array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=data_start + entry["offset"])
+            setattr(self, name, array.reshape(entry["shape"]))
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]):
+        """In-memory snapshot over the output of build_snapshot_arrays, without a file."""
+        snapshot = cls.__new__(cls)
+        snapshot.path = None
+        snapshot.header = {"version": SNAPSHOT_VERSION, "source": DB_PATH, "source_fingerprint": db_fingerprint()}
+        for name in SNAPSHOT_ARRAYS:
+            setattr(snapshot, name, arrays[name])
+        return snapshot
+
+    @property
+    def n_papers(self):
+        return len(self.paper_ids)
+
+    def positions(self, paper_ids):
+        """Positions of paper ids in the snapshot arrays (-1 where unknown)."""
+        pos, found = _positions(np.asarray(paper_ids, dtype=np.int64), self.paper_ids)
+        return np.where(found, pos, -1)
+
+    def title(self, i: int):
+        return bytes(self.title_bytes[self.title_offsets[i]:self.title_offsets[i + 1]]).decode("utf-8")
+
+    def year_mask(self, year_start: int, year_end: int):
+        return (self.years >= year_start) & (self.years <= year_end)
+
+    def field_mask(self, field_id: int):
+        """Boolean mask of papers tagged with a field."""
+        bit = np.searchsorted(self.field_ids, field_id)
+        if bit >= len(self.field_ids) or self.field_ids[bit] != field_id:
+            return np.zeros(self.n_papers, dtype=bool)
+        return (self.field_bits[:, bit // 64] >> np.uint64(bit % 64)) & np.uint64(1) == 1
+
+    def citation_links(self, mask: np.ndarray):
+        """(citing, cited) position arrays for references between papers in `mask`."""
+        citing = np.repeat(np.arange(self.n_papers, dtype=np.int32), np.diff(self.ref_indptr))
+        keep = mask[citing] & mask[self.ref_indices]
+        return citing[keep], self.ref_indices[keep]
+
+    def paper_authors(self, i: int):
+        """Author ids of the paper at position i."""
+        return self.author_ids[self.author_indices[self.author_indptr[i]:self.author_indptr[i + 1]]]
+
+
+_snapshot = None
+_snapshot_checked = False
+
+
+def get_snapshot():
+    """
+    Get the memory-mapped snapshot, or None if no usable snapshot file
+    exists or it was built from another state of the database (callers
+    then fall back to SQLite).
+    """
+    global _snapshot, _snapshot_checked
+    if not _snapshot_checked:
+        _snapshot_checked = True
+        if os.path.exists(SNAPSHOT_PATH):
+            try:
+                snapshot = Snapshot(SNAPSHOT_PATH)
+            except (ValueError, KeyError, OSError) as e:
+                print(f"Ignoring snapshot {SNAPSHOT_PATH}: {e}")
+            else:
+                if snapshot.header.get("source_fingerprint") == db_fingerprint():
+                    _snapshot = snapshot
+                else:
+                    print(f"Ignoring snapshot {SNAPSHOT_PATH}: {DB_PATH} changed since it was built; "
+                          "rebuild it with src/scripts/build_snapshot.py")
+    return _snapshot
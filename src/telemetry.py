@@ -0,0 +1,289 @@
+import asyncio
+import fcntl
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+
+from src.timing import add_span_observer
+
+# Each worker process keeps its metrics in memory and periodically writes
+# them to METRICS_DIR/{pid}.json; /metrics merges the files of all workers.
+# Files not updated within METRICS_STALE_SECONDS belong to workers that
+# exited: their counters and histograms are added to RETIRED_FILE, so merged
+# totals never go down, and the file is deleted.
+METRICS_DIR = os.environ.get("METRICS_DIR", os.path.join(tempfile.gettempdir(), "sciscinet-metrics"))
+METRICS_FLUSH_SECONDS = 5
+METRICS_STALE_SECONDS = 300
+RETIRED_FILE = "retired.json"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+_lock = threading.Lock()
+
+
+class Metric:
+    """A named metric with labelled series, updated in-process."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.series: dict[tuple, float | list] = {}
+        REGISTRY.append(self)
+
+    def dump(self):
+        return [[list(labels), value] for labels, value in self.series.items()]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with _lock:
+            self.series[labels] = self.series.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self.function = None
+
+    def set(self, value: float, *labels: str):
+        with _lock:
+            self.series[labels] = value
+
+    def set_function(self, function):
+        """Read the (unlabelled) value from `function` whenever metrics are dumped."""
+        self.function = function
+
+    def dump(self):
+        if self.function is not None:
+            self.series[()] = self.function()
+        return super().dump()
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram; each series is [bucket counts..., sum, count]."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str):
+        with _lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+
+REGISTRY: list[Metric] = []
+
+REQUEST_LATENCY = Histogram(
+    "sciscinet_http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route", "status"),
+)
+RESPONSE_SIZE = Histogram(
+    "sciscinet_http_response_size_bytes", "HTTP response body size by route.",
+    ("route",), buckets=SIZE_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "sciscinet_cache_lookups_total", "Cache reads by key family and result (hit or miss).",
+    ("family", "result"),
+)
+CACHE_LATENCY = Histogram(
+    "sciscinet_cache_backend_duration_seconds", "Cache backend round-trip time by operation.",
+    ("operation",),
+)
+COMPUTE_DURATION = Histogram(
+    "sciscinet_compute_duration_seconds", "Duration of compute_* functions, cached or on-demand.",
+    ("function",),
+)
+SQL_DURATION = Histogram(
+    "sciscinet_sqlite_query_duration_seconds", "SQLite query time for citation rows.",
+)
+JOB_QUEUE_DEPTH = Gauge("sciscinet_job_queue_depth", "Background jobs queued or running.")
+JOBS_RUNNING = Gauge("sciscinet_jobs_running", "Background jobs currently running.")
+WORKERS = Gauge("sciscinet_workers", "Worker processes reporting metrics.")
+
+
+def key_family(key: str):
+    """
+    Group cache keys for labelling: the first two segments, stopping at a
+    segment that varies per request (years, job ids), e.g.
+    "net:hierarchical-citation:2020-2022" -> "net:hierarchical-citation".
+    """
+    family = []
+    for segment in key.split(":")[:2]:
+        if any(c.isdigit() for c in segment):
+            break
+        family.append(segment)
+    return ":".join(family)
+
+
+def record_cache_lookups(keys: list[str], values: list):
+    for key, value in zip(keys, values):
+        CACHE_LOOKUPS.inc(key_family(key), "hit" if value is not None else "miss")
+
+
+def record_request(method: str, route: str, status: int, duration_s: float, size: int | None):
+    REQUEST_LATENCY.observe(duration_s, method, route, str(status))
+    if size is not None:
+        RESPONSE_SIZE.observe(size, route)
+
+
+def _observe_span(name: str, duration_ms: float):
+    if name.startswith("compute."):
+        COMPUTE_DURATION.observe(duration_ms / 1000, name.removeprefix("compute."))
+    elif name in ("cache.get", "cache.set"):
+        CACHE_LATENCY.observe(duration_ms / 1000, name.removeprefix("cache."))
+    elif name == "sql":
+        SQL_DURATION.observe(duration_ms / 1000)
+
+
+add_span_observer(_observe_span)
+
+
+def dump():
+    """This worker's metrics as JSON-serializable data."""
+    with _lock:
+        return {metric.name: metric.dump() for metric in REGISTRY}
+
+
+def flush():
+    """Write this worker's metrics to METRICS_DIR."""
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(dump(), f)
+    os.replace(tmp_path, path)
+
+
+async def run_metrics_flusher(interval: int = METRICS_FLUSH_SECONDS):
+    """Background loop writing this worker's metrics for /metrics to merge."""
+    while True:
+        try:
+            await asyncio.to_thread(flush)
+        except Exception as e:
+            print(f"Metrics flush failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def _merge(dumps: list[dict]):
+    """Sum series across workers (gauges too, e.g. total queue depth)."""
+    merged = {metric.name: {} for metric in REGISTRY}
+    for data in dumps:
+        for name, series in data.items():
+            if name not in merged:
+                continue
+            for labels, value in series:
+                labels = tuple(labels)
+                current = merged[name].get(labels)
+                if current is None:
+                    merged[name][labels] = value
+                elif isinstance(value, list):
+                    merged[name][labels] = [a + b for a, b in zip(current, value)]
+                else:
+                    merged[name][labels] = current + value
+    return merged
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render(merged: dict):
+    """Render merged metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for labels, value in sorted(merged[metric.name].items()):
+            if isinstance(metric, Histogram):
+                for bound, count in zip(metric.buckets, value):
+                    label_text = _format_labels(metric.labelnames, labels, [("le", f"{bound:g}")])
+                    lines.append(f"{metric.name}_bucket{label_text} {count}")
+                label_text = _format_labels(metric.labelnames, labels, [("le", "+Inf")])
+                lines.append(f"{metric.name}_bucket{label_text} {value[-1]}")
+                label_text = _format_labels(metric.labelnames, labels)
+                lines.append(f"{metric.name}_sum{label_text} {value[-2]}")
+                lines.append(f"{metric.name}_count{label_text} {value[-1]}")
+            else:
+                lines.append(f"{metric.name}{_format_labels(metric.labelnames, labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _retire(path: str):
+    """Add a dead worker's counters and histograms to RETIRED_FILE, then delete its file."""
+    claimed = f"{path}.retiring"
+    try:
+        # Only one worker wins the rename, so a file is never retired twice
+        os.rename(path, claimed)
+    except FileNotFoundError:
+        return
+    retired_path = os.path.join(METRICS_DIR, RETIRED_FILE)
+    with open(f"{retired_path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        dumps = [_load(retired_path), _load(claimed)]
+        monotonic = {metric.name for metric in REGISTRY if not isinstance(metric, Gauge)}
+        merged = _merge([{name: series for name, series in data.items() if name in monotonic} for data in dumps])
+        tmp_path = f"{retired_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({name: [[list(labels), value] for labels, value in series.items()]
+                       for name, series in merged.items()}, f)
+        os.replace(tmp_path, retired_path)
+    os.remove(claimed)
+
+
+def _load(path: str):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}  # Missing, or removed or being replaced meanwhile
+
+
+def collect():
+    """
+    Merge the metrics of every live worker (including this one) and of
+    retired workers, and render them.
+    """
+    flush()
+    cutoff = time.time() - METRICS_STALE_SECONDS
+    dumps = []
+    for path in glob.glob(os.path.join(METRICS_DIR, "[0-9]*.json")):
+        try:
+            stale = os.path.getmtime(path) < cutoff
+        except OSError:
+            continue
+        if stale:
+            _retire(path)
+        elif data := _load(path):
+            dumps.append(data)
+    workers = len(dumps)
+    dumps.append(_load(os.path.join(METRICS_DIR, RETIRED_FILE)))
+    merged = _merge(dumps)
+    merged[WORKERS.name] = {(): workers}
+    return render(merged)
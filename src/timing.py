@@ -0,0 +1,174 @@
+import cProfile
+import functools
+import json
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Requests slower than this are logged with their spans as a JSON line
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", 500))
+
+# Per-request cProfile capture is enabled by sending this token in the
+# X-Profile header; unset disables profiling entirely
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "data/profiles")
+
+# (name, duration_ms) spans recorded by the current request or job
+_spans: ContextVar[list | None] = ContextVar("timing_spans", default=None)
+_profile: ContextVar["RequestProfile | None"] = ContextVar("timing_profile", default=None)
+
+# Called with (name, duration_ms) for every span, inside a request or not,
+# possibly from a worker thread
+_observers = []
+
+
+def add_span_observer(observer):
+    _observers.append(observer)
+
+
+def start_spans():
+    """Start collecting spans in the current context and return the list they go to."""
+    spans = []
+    _spans.set(spans)
+    return spans
+
+
+def record_span(name: str, duration_ms: float):
+    spans = _spans.get()
+    if spans is not None:
+        spans.append((name, duration_ms))
+    for observer in _observers:
+        observer(name, duration_ms)
+
+
+@contextmanager
+def span(name: str):
+    """Time a block, for the current request or job's spans and any span observers."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, (time.perf_counter() - start) * 1000)
+
+
+def timed(name: str):
+    """Decorator recording a span around each call of an async function."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class StageTimer:
+    """
+    Records consecutive stages as spans: each call ends the previous stage
+    and starts the next. Safe to call from a worker thread, since
+    asyncio.to_thread carries the request's span list along.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.stage = None
+        self.started = None
+
+    def __call__(self, stage: str | None):
+        now = time.perf_counter()
+        if self.stage is not None:
+            record_span(f"{self.prefix}.{self.stage}", (now - self.started) * 1000)
+        self.stage = stage
+        self.started = now
+
+    def stop(self):
+        self(None)
+
+
+def summarize(spans: list[tuple[str, float]]):
+    """Total milliseconds per span name, in first-seen order."""
+    totals = {}
+    for name, duration_ms in spans:
+        totals[name] = totals.get(name, 0.0) + duration_ms
+    return {name: round(duration_ms, 3) for name, duration_ms in totals.items()}
+
+
+def server_timing(spans: list[tuple[str, float]], total_ms: float):
+    """Format spans as a Server-Timing header value."""
+    entries = [f"{name};dur={duration_ms:.1f}" for name, duration_ms in summarize(spans).items()]
+    entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+
+def log_timing(event: str, duration_ms: float, spans: list[tuple[str, float]], **fields):
+    """Print one structured (JSON) timing log line."""
+    print(json.dumps({
+        "event": event,
+        "duration_ms": round(duration_ms, 3),
+        **fields,
+        "spans": summarize(spans),
+    }), flush=True)
+
+
+class RequestProfile:
+    """
+    cProfile capture for one request. The profiler runs on the event loop
+    thread, so it also sees other requests the worker serves meanwhile;
+    work handed to threads is captured via profile_thread.
+    """
+
+    _active = False
+
+    def __init__(self):
+        self.profiles = [cProfile.Profile()]
+        self._token = None
+
+    @classmethod
+    def start(cls):
+        """Begin profiling, or return None if another request is being profiled."""
+        if cls._active:
+            return None
+        cls._active = True
+        profile = cls()
+        profile._token = _profile.set(profile)
+        profile.profiles[0].enable()
+        return profile
+
+    def stop(self):
+        self.profiles[0].disable()
+        _profile.reset(self._token)
+        RequestProfile._active = False
+
+    def save(self, label: str):
+        """Write combined stats to PROFILE_DIR and return the file path."""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stats = pstats.Stats(self.profiles[0])
+        for profile in self.profiles[1:]:
+            stats.add(profile)
+        safe_label = "".join(c if c.isalnum() else "_" for c in label).strip("_")
+        path = os.path.join(PROFILE_DIR, f"{int(time.time() * 1000)}-{safe_label}.prof")
+        stats.dump_stats(path)
+        return path
+
+
+def profile_thread(func):
+    """Wrap a function passed to asyncio.to_thread so a profiled request also profiles it."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _profile.get()
+        if profile is None:
+            return func(*args, **kwargs)
+        thread_profile = cProfile.Profile()
+        try:
+            thread_profile.enable()
+        except ValueError:
+            # Python 3.12+ profiles all threads from the request's profiler
+            return func(*args, **kwargs)
+        profile.profiles.append(thread_profile)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            thread_profile.disable()
+    return wrapper
@@ -26,6 +26,42 @@ async def run_all_tests():
         print(f"Redis test failed: {e}")
         results.append(("Redis", False))
 
+    # Test 1b: Cache backends (no external services)
+    print("\n" + "=" * 60)
+    print("TEST 1b: Cache Backends")
+    print("=" * 60)
+    try:
+        from test_cache_backends import test_cache_backends
+        result = await test_cache_backends()
+        results.append(("Cache backends", result))
+    except Exception as e:
+        print(f"Cache backends test failed: {e}")
+        results.append(("Cache backends", False))
+
+    # Test 1c: Job manager (no external services)
+    print("\n" + "=" * 60)
+    print("TEST 1c: Job Manager")
+    print("=" * 60)
+    try:
+        from test_jobs import test_job_manager
+        result = await test_job_manager()
+        results.append(("Job manager", result))
+    except Exception as e:
+        print(f"Job manager test failed: {e}")
+        results.append(("Job manager", False))
+
+    # Test 1d: Preprocessing pipeline (no external services)
+    print("\n" + "=" * 60)
+    print("TEST 1d: Preprocessing Pipeline")
+    print("=" * 60)
+    try:
+        from test_preprocessing import test_preprocessing
+        result = await test_preprocessing()
+        results.append(("Preprocessing", result))
+    except Exception as e:
+        print(f"Preprocessing test failed: {e}")
+        results.append(("Preprocessing", False))
+
     # Test 2: Database
     print("\n" + "=" * 60)
     print("TEST 2: Database Connection")
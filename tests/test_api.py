@@ -41,6 +41,11 @@ async def test_api_endpoints():
             data = response.json()
             print(f"   Patent counts for 2020: {len(data)} papers")
 
+            response = await client.get(f"{BASE_URL}/api/v1/data/patents-by-year/batch?years=2018,2019,2020")
+            assert response.status_code == 200
+            data = response.json()
+            print(f"   Batch histograms: {[year['stats']['papers'] for year in data['years']]} papers")
+
             # Test citation network
             print("\n4. Testing citation network endpoint...")
             response = await client.get(f"{BASE_URL}/api/v1/network/citation")
@@ -65,13 +70,76 @@ async def test_api_endpoints():
             print(f"   Root: {data['name']}")
             print(f"   Communities: {len(data['children'])}")
 
+            # Test centrality metrics
+            print("\n7. Testing metrics/top endpoint...")
+            response = await client.get(f"{BASE_URL}/api/v1/metrics/top?metric=pagerank&limit=5")
+            assert response.status_code == 200
+            data = response.json()
+            print(f"   Top papers: {len(data['papers'])}")
+
+            # Test background network job
+            print("\n8. Testing jobs/network endpoint...")
+            response = await client.post(f"{BASE_URL}/api/v1/jobs/network?year_start=2021&year_end=2022")
+            assert response.status_code in (200, 202)
+            data = response.json()
+            print(f"   Job: {data['id']} ({data['status']})")
+            if data["id"]:
+                response = await client.get(f"{BASE_URL}/api/v1/jobs/{data['id']}")
+                assert response.status_code == 200
+                print(f"   Stage: {response.json()['stage']}")
+
             # Test scalability solution
-            print("\n7. Testing scalability-solution endpoint...")
+            print("\n9. Testing scalability-solution endpoint...")
             response = await client.get(f"{BASE_URL}/api/v1/scalability-solution")
             assert response.status_code == 200
             data = response.json()
             print(f"   Solution: {data['solution_paragraph'][:100]}...")
 
+            # Test Prometheus metrics
+            print("\n10. Testing metrics endpoint...")
+            response = await client.get(f"{BASE_URL}/metrics")
+            assert response.status_code == 200
+            assert "sciscinet_http_request_duration_seconds_bucket" in response.text
+            print(f"   Series: {sum(1 for line in response.text.splitlines() if not line.startswith('#'))}")
+            print(f"   Server-Timing: {response.headers.get('server-timing')}")
+
+            # Test cohorts
+            print("\n11. Testing cohorts endpoint...")
+            response = await client.get(f"{BASE_URL}/api/v1/cohorts")
+            assert response.status_code == 200
+            data = response.json()
+            assert any(cohort["id"] == data["default"] for cohort in data["cohorts"])
+            print(f"   Cohorts: {[cohort['id'] for cohort in data['cohorts']]}")
+            response = await client.get(f"{BASE_URL}/api/v1/timeline/papers-by-year?cohort=no-such-cohort")
+            assert response.status_code == 404
+
+            # Test batched resources
+            print("\n12. Testing batch endpoint...")
+            response = await client.get(
+                f"{BASE_URL}/api/v1/batch", params={"resources": "timeline,patents:2020,patents-summary:2020"}
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert list(data["results"]) == ["timeline", "patents:2020", "patents-summary:2020"], data["errors"]
+            print(f"   Resources: {list(data['results'])}")
+            response = await client.get(f"{BASE_URL}/api/v1/batch", params={"resources": "patents:1999"})
+            assert response.status_code == 400
+
+            # Test force layout on the hierarchical network
+            print("\n13. Testing hierarchical-citation layout=force...")
+            url = f"{BASE_URL}/api/v1/network/hierarchical-citation"
+            params = {"year_start": 2016, "year_end": 2017, "layout": "force"}
+            for parts in ("nodes", "links", "summary,nodes"):
+                response = await client.get(url, params={**params, "parts": parts})
+                assert response.status_code == 400, (parts, response.status_code)
+            response = await client.get(url, params={**params, "community": 0})
+            assert response.status_code == 400
+            response = await client.get(url, params={**params, "parts": "nodes,links"}, timeout=600)
+            assert response.status_code == 200
+            data = response.json()
+            assert all("x" in node and "y" in node for node in data["nodes"])
+            print(f"   Positioned nodes: {len(data['nodes'])}")
+
             print("\n" + "=" * 60)
             print("All API endpoint tests PASSED!")
             print("=" * 60)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test the in-process and disk cache backends.
+These need no external services; the Redis backend is covered by test_redis.py.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+
+async def check_backend(backend):
+    """Run the same operations against a backend and check the results."""
+    await backend.set("test:a", '{"x": 1}')
+    await backend.set("test:b", "[1, 2]", ttl=60)
+    await backend.set("other:c", "3", ttl=1)
+
+    values = await backend.get_many(["test:a", "test:b", "test:missing"], track=True)
+    assert values == ['{"x": 1}', "[1, 2]", None], values
+    print(f"    get_many: PASSED")
+
+    assert await backend.exists_many(["test:a", "test:missing"]) == [True, False]
+    assert sorted(await backend.scan("test:*")) == ["test:a", "test:b"]
+    print(f"    exists/scan: PASSED")
+
+    await asyncio.sleep(1.1)
+    assert await backend.exists_many(["other:c"]) == [False]
+    assert await backend.expire("test:b", 60) is True
+    assert await backend.expire("other:c", 60) is False
+    print(f"    ttl/expire: PASSED")
+
+    await backend.set_many({"test:s1": "1", "test:s2": "2"}, ttl=60)
+    assert await backend.get_many(["test:s1", "test:s2"]) == ["1", "2"]
+    assert await backend.expire_many(["test:s1", "test:missing"], 60) == [True, False]
+    await backend.delete(["test:s1", "test:s2"])
+    print(f"    set_many/expire_many: PASSED")
+
+    assert await backend.set_if_absent("lock:test", "1", ttl=60) is True
+    assert await backend.set_if_absent("lock:test", "1", ttl=60) is False
+    assert await backend.compare_and_set("lock:test", "2", "3") is False
+    assert await backend.compare_and_set("lock:test", "1", "3") is True
+    assert await backend.get_many(["lock:test"]) == ["3"]
+    assert await backend.delete_if_equal("lock:test", "1") is False
+    assert await backend.delete_if_equal("lock:test", "3") is True
+    assert await backend.exists_many(["lock:test"]) == [False]
+    await backend.set("lock:test", "1")
+    assert await backend.delete(["lock:test", "test:missing"]) == 1
+    print(f"    lock/delete: PASSED")
+
+    await backend.get_many(["test:a"], track=True)
+    # Misses are counted too, so keys rebuilt by the healer keep their popularity
+    assert await backend.access_counts(["test:a", "test:b", "test:missing", "test:never"]) == [2.0, 1.0, 1.0, 0.0]
+    ranked = await backend.ranked_access()
+    assert ranked[0] == ("test:a", 2.0), ranked
+    await backend.decay_access(0.5, floor=0.5)
+    assert await backend.access_counts(["test:a", "test:b"]) == [1.0, 0.0]
+    print(f"    access stats: PASSED")
+
+    # Only keys with a TTL are evicted, least-read first
+    await backend.set("test:big", "x" * 100, ttl=60)
+    await backend.configure("50b", "volatile-lfu")
+    assert await backend.exists_many(["test:a", "test:b", "test:big"]) == [True, False, False]
+    print(f"    eviction: PASSED")
+
+    await backend.close()
+
+
+async def test_cache_backends():
+    """Test memory and disk cache backends."""
+    print("Testing cache backends...")
+
+    try:
+        from src.cache_backends import DiskBackend, MemoryBackend
+
+        print("  Memory backend:")
+        await check_backend(MemoryBackend())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            print("  Disk backend:")
+            await check_backend(DiskBackend(os.path.join(tmp, "cache.db")))
+
+        # A network split into per-community sections reassembles unchanged
+        print("  Network sections:")
+        from src.services.network_sections import assemble_network, split_network
+        sizes = [700, 300, 200, 100]
+        nodes = [{"id": f"{c}-{i}", "community": c} for c, size in enumerate(sizes) for i in range(size)]
+        links = [{"source": node["id"], "target": "0-0", "source_community": node["community"], "target_community": 0}
+                 for node in nodes]
+        network = {
+            "nodes": nodes,
+            "links": links,
+            "communities": [{"id": c, "size": size, "nodes": []} for c, size in enumerate(sizes)],
+            "total_communities": len(sizes),
+            "year_range": {"start": 2020, "end": 2022},
+        }
+        head, sections = split_network(network)
+        assert head["block_starts"] == [0, 1, 3], head["block_starts"]
+        assert assemble_network(head, sections) == network
+        community = assemble_network(head, {"nodes:1": sections["nodes:1"]}, ["nodes"], community=2)
+        assert len(community["nodes"]) == 200 and "links" not in community
+        print(f"    split/assemble: PASSED")
+
+        print("\nCache backends test completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\nCache backends test FAILED: {e!r}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    success = asyncio.run(test_cache_backends())
+    sys.exit(0 if success else 1)
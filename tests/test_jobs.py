@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test the background job manager: deduplication, admission limit and the
+job state mirrored to the cache. Uses the in-process cache backend.
+"""
+import asyncio
+import sys
+
+
+async def test_job_manager():
+    """Test JobManager against the in-memory cache backend."""
+    print("Testing job manager...")
+
+    import src.cache as cache
+    from src.cache_backends import MemoryBackend
+
+    backend = cache._backend
+    cache._backend = MemoryBackend()
+    try:
+        from src.services.jobs import JobManager, JobQueueFullError
+
+        manager = JobManager(max_queued=2, max_concurrent=1)
+        release = asyncio.Event()
+
+        def submit(key: str):
+            async def compute(progress):
+                progress("compute")
+                await release.wait()
+                return {"key": key}
+
+            return manager.submit(
+                cache_key=key,
+                kind="test",
+                params={"key": key},
+                stages=("compute",),
+                result_url=f"/result/{key}",
+                compute=compute,
+            )
+
+        # Jobs for the same cache key are deduplicated
+        first = submit("test:a")
+        assert submit("test:a") is first
+        assert manager.depth == 1
+        print("  dedup by cache_key: PASSED")
+
+        # Queued + running jobs are capped at max_queued
+        submit("test:b")
+        try:
+            submit("test:c")
+            raise AssertionError("third job was admitted")
+        except JobQueueFullError:
+            pass
+        print("  queue limit: PASSED")
+
+        release.set()
+        await first.done.wait()
+        assert first.status == "done", first.error
+        assert await cache.get_cached_json("test:a") == {"key": "test:a"}
+
+        # The final state is persisted under job:{id}, readable by any worker
+        await asyncio.sleep(0.1)
+        state = await cache.get_cached_json(f"job:{first.id}")
+        assert state["status"] == "done" and state["result_url"] == "/result/test:a", state
+        assert await manager.get(first.id) == first.to_dict()
+        print("  persisted state: PASSED")
+
+        print("\nJob manager test completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\nJob manager test FAILED: {e!r}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        cache._backend = backend
+
+
+if __name__ == "__main__":
+    success = asyncio.run(test_job_manager())
+    sys.exit(0 if success else 1)
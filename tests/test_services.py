@@ -18,6 +18,9 @@ async def test_processing_services():
             compute_community_network,
             compute_papers_by_year,
             compute_patents_for_year,
+            compute_centrality_metrics,
+            compute_analytics_cube,
+            compute_citation_flows,
         )
 
         # Test papers by year
@@ -55,6 +58,84 @@ async def test_processing_services():
         if community_data['children']:
             print(f"   Sample community: {community_data['children'][0]['name']}")
 
+        # Test centrality metrics
+        print("\n6. Testing compute_centrality_metrics...")
+        metrics_data = await compute_centrality_metrics(2020, 2022)
+        print(f"   Papers scored: {len(metrics_data['paper_ids'])}")
+        print(f"   PageRank sum: {sum(metrics_data['pagerank']):.4f}")
+        if metrics_data['top']['pagerank']:
+            print(f"   Top by PageRank: {metrics_data['top']['pagerank'][0]}")
+
+        # Test analytics cube
+        print("\n7. Testing compute_analytics_cube...")
+        cube_data = await compute_analytics_cube()
+        print(f"   Cube shape: {len(cube_data['years'])} years x {len(cube_data['fields'])} fields")
+        print(f"   Papers per year: {[row[0] for row in cube_data['count']]}")
+
+        # Test snapshot round trip (written to a temporary file)
+        print("\n8. Testing snapshot build and mmap...")
+        import os
+        import tempfile
+        from src.snapshot import Snapshot, build_snapshot_arrays, db_fingerprint, write_snapshot
+        arrays = await build_snapshot_arrays()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "snapshot.bin")
+            write_snapshot(arrays, path)
+            snapshot = Snapshot(path)
+            assert (snapshot.paper_ids == arrays["paper_ids"]).all()
+            assert (snapshot.ref_indices == arrays["ref_indices"]).all()
+            assert snapshot.header["source_fingerprint"] == db_fingerprint()
+            print(f"   {snapshot.n_papers} papers, {len(snapshot.ref_indices)} references, "
+                  f"{len(snapshot.author_ids)} authors, {len(snapshot.field_ids)} fields")
+            del snapshot
+
+        # Test author profiles over an in-memory snapshot of the same arrays
+        print("\n9. Testing author profile and collaborators...")
+        import numpy as np
+        from src.services.authors import author_profile, top_collaborators
+        index = Snapshot.from_arrays(arrays)
+        author_id = int(index.author_ids[np.argmax(np.diff(index.author_paper_indptr))])
+        profile = author_profile(index, author_id)
+        collaborators = top_collaborators(index, author_id, 2013, 2022, 5)
+        assert profile["papers"] == collaborators["papers"]
+        assert profile["collaborators"] == collaborators["total_collaborators"]
+        assert author_profile(index, -1) is None
+        print(f"   Author {author_id}: {profile['papers']} papers, {profile['citations']} citations, "
+              f"h-index {profile['h_index']}")
+        print(f"   Top collaborators: {collaborators['collaborators'][:3]}")
+
+        # Test citation flows: each year's community matrix sums to that year's citations
+        print("\n10. Testing compute_citation_flows...")
+        from src.services.flows import CitationFlows
+        flows_data = await compute_citation_flows()
+        flows = CitationFlows(flows_data)
+        community = flows.matrix("community", 2013, 2022, by_year=True)
+        assert [sum(map(sum, matrix)) for matrix in community["matrices"]] == flows_data["citations"]
+        field = flows.matrix("field", 2020, 2022)
+        print(f"   {len(field['groups'])} fields, {field['total']} field-pair citations in 2020-2022")
+        print(f"   {len(community['groups'])} community groups, {community['total']} citations")
+
+        # Test force layout: seeded, so the same network gets the same coordinates
+        print("\n11. Testing force layout...")
+        from src.services.layout import network_layout
+        from src.services.processing import compute_hierarchical_citation_network
+        network = await compute_hierarchical_citation_network(2020, 2022)
+        layout = network_layout(network)
+        assert layout == network_layout(network)
+        assert len(layout["x"]) == len(layout["y"]) == len(network["nodes"])
+        assert layout["ids"] == [node["id"] for node in network["nodes"]]
+        print(f"   {len(layout['ids'])} node positions")
+
+        # Test edge bundling: each link's control points are sliced by link_offsets
+        print("\n12. Testing edge bundling geometry...")
+        from src.services.layout import edge_bundling_geometry
+        bundling = edge_bundling_geometry(network)
+        offsets = bundling["links"]["link_offsets"]
+        assert len(offsets) == len(bundling["links"]["source"]) + 1 == len(network["links"]) + 1
+        assert offsets[-1] * 2 == len(bundling["links"]["control_points"])
+        assert len(bundling["angles"]) == len(network["nodes"])
+        print(f"   {len(offsets) - 1} links, {offsets[-1]} control points")
+
         print("\nProcessing services test completed successfully!")
         return True
 